@@ -0,0 +1,4 @@
+import sys
+from .cli.comandos import main
+
+sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Fachada asyncio sobre as DAOs e os relatórios: cada chamada roda num executor dedicado
+(threads "segu-aio"), sem bloquear o event loop.
+
+    from seguradora import aio
+    ap = await aio.apolices.obter("AP-12-000001237")
+    paginas = await asyncio.gather(aio.clientes.listar_pagina(), aio.seguros.listar_pagina())
+    dados = await aio.painel("2024-01", "2024-12")   # os quatro relatórios ao mesmo tempo
+
+O pool do SQLite é dimensionado e aquecido para o número de workers (SEGU_AIO_WORKERS,
+padrão 4) na criação do executor, então cada thread pega uma conexão já aberta e
+ociosa. Com WAL, leituras em conexões diferentes não se bloqueiam e o sqlite3 solta o
+GIL durante a consulta: o painel custa o relatório mais lento, não a soma.
+
+    python -m seguradora.aio    compara o painel sequencial com o concorrente
+"""
+import asyncio
+import atexit
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from . import db
+from .dao import clientes as _clientes, seguros as _seguros, apolices as _apolices, sinistros as _sinistros
+from .services import relatorios as _relatorios
+
+WORKERS = int(os.environ.get("SEGU_AIO_WORKERS", "4"))
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+def _aquecer(n: int):
+    """Abre n conexões e devolve todas ao pool, para a primeira rodada não pagar _connect."""
+    conns = [db.get_pool().acquire() for _ in range(n)]
+    for conn in conns:
+        db.get_pool().release(conn)
+
+def executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                if db.POOL_SIZE < WORKERS:
+                    db.POOL_SIZE = WORKERS
+                    db.close_pool()
+                _aquecer(WORKERS)
+                _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="segu-aio")
+                atexit.register(fechar)
+    return _executor
+
+def fechar():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+async def rodar(fn, *args, **kwargs):
+    """Executa uma função bloqueante qualquer no executor da fachada."""
+    return await asyncio.get_running_loop().run_in_executor(executor(), functools.partial(fn, *args, **kwargs))
+
+def _assincrona(fn):
+    @functools.wraps(fn)
+    async def chamada(*args, **kwargs):
+        return await rodar(fn, *args, **kwargs)
+    return chamada
+
+def _fachada(modulo, *nomes) -> SimpleNamespace:
+    return SimpleNamespace(**{n: _assincrona(getattr(modulo, n)) for n in nomes})
+
+clientes = _fachada(_clientes, "listar", "listar_pagina", "obter_por_cpf", "buscar_por_cpf", "buscar_por_nome")
+seguros = _fachada(_seguros, "listar", "listar_pagina", "obter")
+apolices = _fachada(_apolices, "listar", "listar_pagina", "obter", "buscar_por_numero")
+sinistros = _fachada(_sinistros, "listar", "listar_pagina", "listar_por_data")
+relatorios = _fachada(_relatorios, "receita_mensal_prevista", "top_clientes_por_valor_segurado",
+                      "sinistros_por_status", "sinistros_por_periodo")
+
+async def painel(ym_ini: str | None = None, ym_fim: str | None = None, top: int = 5) -> dict:
+    """
+    Os quatro relatórios em paralelo. Sem período, sinistros_por_periodo não roda
+    (o valor fica None). Uma falha em qualquer um propaga, como no asyncio.gather.
+    """
+    tarefas = {
+        "receita_mensal": relatorios.receita_mensal_prevista(),
+        "top_clientes": relatorios.top_clientes_por_valor_segurado(top),
+        "sinistros_status": relatorios.sinistros_por_status(),
+    }
+    if ym_ini and ym_fim:
+        tarefas["sinistros_periodo"] = relatorios.sinistros_por_periodo(ym_ini, ym_fim)
+    resultados = await asyncio.gather(*tarefas.values())
+    saida = dict(zip(tarefas, resultados))
+    saida.setdefault("sinistros_periodo", None)
+    return saida
+
+def _main():
+    import time
+    db.init_schema()
+
+    def sequencial():
+        _relatorios.receita_mensal_prevista()
+        _relatorios.top_clientes_por_valor_segurado()
+        _relatorios.sinistros_por_status()
+        _relatorios.sinistros_por_periodo("2000-01", "2099-12")
+
+    async def concorrente(vezes):
+        for _ in range(vezes):
+            await painel("2000-01", "2099-12")
+
+    vezes = 20
+    sequencial()
+    t = time.perf_counter()
+    for _ in range(vezes):
+        sequencial()
+    t_seq = (time.perf_counter() - t) / vezes
+    asyncio.run(concorrente(1))
+    t = time.perf_counter()
+    asyncio.run(concorrente(vezes))
+    t_conc = (time.perf_counter() - t) / vezes
+    print(f"painel sequencial {t_seq * 1000:.1f} ms | concorrente ({WORKERS} workers) {t_conc * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,327 @@
+"""
+API HTTP/JSON local sobre as DAOs e os relatórios, só com a stdlib (http.server).
+
+    python -m seguradora.api [--host 127.0.0.1] [--porta 8080] [--workers 8] [--fila 64]
+
+Cada conexão aceita entra numa fila limitada (--fila) atendida por --workers threads
+fixas; com a fila cheia, a conexão recebe 503 na hora em vez de ganhar mais uma thread.
+HTTP/1.1 com keep-alive: a conexão fica com o worker enquanto mandar requisições, até
+SEGU_API_OCIOSO_S (padrão 5) segundos parada. Cada requisição empresta uma conexão do
+pool do SQLite só durante a chamada à DAO (db.get_conn); o pool é dimensionado para
+o número de workers.
+
+Autenticação: POST /token {"username", "senha"} devolve {"token"} (services/auth.emitir_token);
+as demais rotas pedem "Authorization: Bearer <token>". Como no menu, perfis que não são
+admin só acessam /relatorios; o resto responde 403 (OperacaoNaoPermitida).
+
+    GET  /saude
+    POST /token
+    GET  /clientes?cursor=&limite=              /clientes/busca?cpf=|nome=     /clientes/<cpf>
+    GET  /seguros?cursor=&limite=&tipo=         /seguros/<id>
+    GET  /apolices?cursor=&limite=&status=&tipo=   /apolices/busca?numero=     /apolices/<numero>
+    POST /apolices {"seguro_ids": [...]}        POST /apolices/cancelar {"numeros": [...]}
+    GET  /sinistros?cursor=&limite=&status=&apolice_numero=    POST /sinistros {"apolice_numero", "descricao", "data"}
+    GET  /relatorios/<receita|top-clientes|sinistros-status|sinistros-periodo>?de=&ate=&por=&limite=
+
+Listagens devolvem {"itens": [...], "proximo": cursor | null}; o próximo cursor volta em
+?cursor= como JSON (o de clientes é composto). Carga: python -m seguradora.tools.carga_api
+"""
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from . import db
+from .core.exceptions import AppError, OperacaoNaoPermitida
+from .dao import clientes as cli_dao, seguros as se_dao, apolices as ap_dao, sinistros as si_dao
+from .dao import auditoria as aud
+from .services import auth, relatorios
+
+logger = logging.getLogger("seguradora")
+
+WORKERS = int(os.environ.get("SEGU_API_WORKERS", "8"))
+FILA = int(os.environ.get("SEGU_API_FILA", "64"))
+OCIOSO_S = float(os.environ.get("SEGU_API_OCIOSO_S", "5"))
+CORPO_MAX = 8 << 20
+LIMITE_MAX = 1000
+
+_CORPO_503 = b'{"erro": "servidor cheio"}'
+_RESPOSTA_503 = (b"HTTP/1.1 503 Service Unavailable\r\nContent-Type: application/json\r\n"
+                 b"Content-Length: %d\r\nConnection: close\r\nRetry-After: 1\r\n\r\n%s"
+                 % (len(_CORPO_503), _CORPO_503))
+
+class _NaoAutenticado(AppError):
+    pass
+
+class _Requisicao:
+    __slots__ = ("params", "corpo", "args", "sessao")
+
+    def __init__(self, params, corpo, args, sessao):
+        self.params, self.corpo, self.args, self.sessao = params, corpo, args, sessao
+
+# -------------------- rotas --------------------
+
+def _itens(rows) -> list:
+    return [dict(r) for r in rows]
+
+def _lista(corpo, chave: str, tipo: type) -> list:
+    """corpo[chave] como lista de `tipo`; qualquer outra coisa é 400 antes de chegar à DAO."""
+    valores = corpo.get(chave) if isinstance(corpo, dict) else None
+    if not isinstance(valores, list) or not all(type(v) is tipo for v in valores):
+        raise ValueError(f"{chave} deve ser uma lista de {'inteiros' if tipo is int else 'textos'}")
+    return valores
+
+def _pagina(dao, *filtros):
+    def listar(req):
+        limite = max(1, min(int(req.params.get("limite", 50)), LIMITE_MAX))
+        cursor = json.loads(req.params["cursor"]) if "cursor" in req.params else None
+        rows, proximo = dao.listar_pagina(cursor=cursor, limite=limite,
+                                          **{f: req.params[f] for f in filtros if f in req.params})
+        return {"itens": _itens(rows), "proximo": proximo}
+    return listar
+
+def _saude(req):
+    return {"ok": True, "pool": db.get_pool().stats()}
+
+def _token(req):
+    try:
+        return {"token": auth.emitir_token(str(req.corpo["username"]), str(req.corpo["senha"]))}
+    except AppError as e:
+        raise _NaoAutenticado(str(e), user_message=e.user_message) from None
+
+def _cliente(req):
+    c = cli_dao.obter_por_cpf(req.args[0])
+    return dict(c) if c else None
+
+def _buscar_clientes(req):
+    if "cpf" in req.params:
+        return {"itens": _itens(cli_dao.buscar_por_cpf(req.params["cpf"]))}
+    return {"itens": _itens(cli_dao.buscar_por_nome(req.params.get("nome", "")))}
+
+def _seguro(req):
+    s = se_dao.obter(int(req.args[0]))
+    return dict(s) if s else None
+
+def _apolice(req):
+    a = ap_dao.obter(req.args[0])
+    return dict(a) if a else None
+
+def _buscar_apolices(req):
+    return {"itens": _itens(ap_dao.buscar_por_numero(req.params.get("numero", "")))}
+
+def _emitir(req):
+    res = ap_dao.emitir_apolices(_lista(req.corpo, "seguro_ids", int))
+    aud.registrar_lote(req.sessao["username"], "emitir", "apolice",
+                       ((numero or sid, numero is not None, None if numero else st) for sid, st, numero in res))
+    return {"resultados": [{"seguro_id": sid, "resultado": st, "numero": numero} for sid, st, numero in res]}
+
+def _cancelar(req):
+    res = ap_dao.cancelar_apolices(_lista(req.corpo, "numeros", str))
+    aud.registrar_lote(req.sessao["username"], "cancelar", "apolice",
+                       ((n, st == ap_dao.CANCELADA, None if st == ap_dao.CANCELADA else st) for n, st in res))
+    return {"resultados": [{"numero": n, "resultado": st} for n, st in res]}
+
+def _registrar_sinistro(req):
+    numero = str(req.corpo["apolice_numero"]).strip()
+    sid = si_dao.registrar(numero, str(req.corpo.get("descricao", "")), str(req.corpo["data"]).strip())
+    aud.registrar(req.sessao["username"], "registrar", "sinistro", sid or numero, bool(sid),
+                  None if sid else "apólice inválida")
+    if not sid:
+        raise AppError("Apólice inválida.", user_message="Apólice inexistente ou cancelada.")
+    return 201, {"id": sid}
+
+def _relatorio(req):
+    nome, p = req.args[0], req.params
+    if nome == "receita":
+        rows = relatorios.receita_mensal_prevista()
+    elif nome == "top-clientes":
+        rows = relatorios.top_clientes_por_valor_segurado(int(p.get("limite", 5)))
+    elif nome == "sinistros-status":
+        rows = relatorios.sinistros_por_status()
+    elif nome == "sinistros-periodo":
+        rows = relatorios.sinistros_por_periodo(p["de"], p["ate"], por=p.get("por", "registro"))
+    else:
+        return None
+    return {"itens": _itens(rows)}
+
+# (método, caminho, função, só admin); a primeira que casar atende
+ROTAS = [
+    ("GET", r"/saude", _saude, False),
+    ("POST", r"/token", _token, False),
+    ("GET", r"/clientes", _pagina(cli_dao), True),
+    ("GET", r"/clientes/busca", _buscar_clientes, True),
+    ("GET", r"/clientes/([^/]+)", _cliente, True),
+    ("GET", r"/seguros", _pagina(se_dao, "tipo", "titular"), True),
+    ("GET", r"/seguros/(\d+)", _seguro, True),
+    ("GET", r"/apolices", _pagina(ap_dao, "status", "tipo", "titular"), True),
+    ("POST", r"/apolices", _emitir, True),
+    ("POST", r"/apolices/cancelar", _cancelar, True),
+    ("GET", r"/apolices/busca", _buscar_apolices, True),
+    ("GET", r"/apolices/([^/]+)", _apolice, True),
+    ("GET", r"/sinistros", _pagina(si_dao, "status", "apolice_numero"), True),
+    ("POST", r"/sinistros", _registrar_sinistro, True),
+    ("GET", r"/relatorios/([a-z-]+)", _relatorio, False),
+]
+ROTAS = [(m, re.compile(c), fn, admin) for m, c, fn, admin in ROTAS]
+_PUBLICAS = (_saude, _token)
+
+# -------------------- HTTP --------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (exige Content-Length em toda resposta)
+    server_version = "seguradora"
+    timeout = OCIOSO_S
+    # cabeçalho e corpo saem em dois send(); com Nagle + ACK atrasado do cliente isso
+    # vira ~40 ms por resposta em keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._despachar("GET")
+
+    def do_POST(self):
+        self._despachar("POST")
+
+    def log_message(self, fmt, *args):
+        logger.debug(f"api {self.address_string()} {fmt % args}")
+
+    def _corpo(self):
+        try:
+            tamanho = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            tamanho = -1
+        if not 0 <= tamanho <= CORPO_MAX:
+            # sem ler o corpo, a conexão perde o alinhamento: responde 400 e fecha
+            self.close_connection = True
+            raise ValueError("Content-Length inválido ou grande demais")
+        return json.loads(self.rfile.read(tamanho) or b"{}") if tamanho else {}
+
+    def _sessao(self) -> dict:
+        cabecalho = self.headers.get("Authorization", "")
+        if not cabecalho.startswith("Bearer "):
+            raise _NaoAutenticado("Sem token.", user_message="Envie Authorization: Bearer <token> (POST /token).")
+        try:
+            return auth.validar_token(cabecalho[7:])
+        except AppError as e:
+            raise _NaoAutenticado(str(e), user_message=e.user_message) from None
+
+    def _despachar(self, metodo: str):
+        url = urlsplit(self.path)
+        caminho = unquote(url.path.rstrip("/")) or "/"
+        status, dados = 200, None
+        try:
+            corpo = self._corpo() if metodo == "POST" else None  # lido antes de tudo: mantém a conexão alinhada
+            for m, padrao, fn, so_admin in ROTAS:
+                achou = padrao.fullmatch(caminho) if m == metodo else None
+                if achou:
+                    break
+            else:
+                return self._responder(404, {"erro": "rota inexistente"})
+            sessao = None if fn in _PUBLICAS else self._sessao()
+            if so_admin and sessao["perfil"] != "admin":
+                raise OperacaoNaoPermitida()
+            dados = fn(_Requisicao(dict(parse_qsl(url.query)), corpo, achou.groups(), sessao))
+            if isinstance(dados, tuple):
+                status, dados = dados
+            if dados is None:
+                status, dados = 404, {"erro": "não encontrado"}
+        except _NaoAutenticado as e:
+            status, dados = 401, {"erro": e.user_message}
+        except OperacaoNaoPermitida as e:
+            status, dados = 403, {"erro": e.user_message}
+        except AppError as e:
+            status, dados = 400, {"erro": e.user_message}
+        except (KeyError, TypeError, ValueError) as e:
+            status, dados = 400, {"erro": f"requisição inválida: {e}"}
+        except Exception as e:
+            logger.exception(f"api {metodo} {caminho}: {e}")
+            status, dados = 500, {"erro": "erro interno"}
+        self._responder(status, dados)
+
+    def _responder(self, status: int, dados):
+        corpo = json.dumps(dados, ensure_ascii=False, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(corpo)
+
+class Servidor(HTTPServer):
+    """HTTPServer com um pool fixo de workers e fila de conexões limitada."""
+    def __init__(self, endereco, workers: int = WORKERS, fila: int = FILA):
+        super().__init__(endereco, _Handler)
+        self._fila = queue.Queue(maxsize=max(1, fila))
+        self._workers = [threading.Thread(target=self._trabalhar, name=f"api-worker-{i}", daemon=True)
+                         for i in range(max(1, workers))]
+        for t in self._workers:
+            t.start()
+        self.recusadas = 0
+
+    def process_request(self, request, client_address):
+        try:
+            self._fila.put_nowait((request, client_address))
+        except queue.Full:
+            self.recusadas += 1
+            try:
+                request.sendall(_RESPOSTA_503)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+
+    def _trabalhar(self):
+        while True:
+            item = self._fila.get()
+            if item is None:
+                return
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def handle_error(self, request, client_address):
+        logger.exception(f"api: erro na conexão de {client_address[0]}")
+
+    def server_close(self):
+        super().server_close()
+        for _ in self._workers:
+            self._fila.put(None)
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(prog="python -m seguradora.api")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--porta", type=int, default=8080, help="0 = porta livre qualquer")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--fila", type=int, default=FILA, help="conexões aceitas esperando worker")
+    args = ap.parse_args(argv)
+
+    from .core.logging_conf import setup_logging
+    setup_logging()
+    db.init_schema()
+    if db.POOL_SIZE < args.workers:
+        db.POOL_SIZE = args.workers  # uma conexão ociosa por worker: nada de abrir/fechar por requisição
+        db.close_pool()
+
+    servidor = Servidor((args.host, args.porta), args.workers, args.fila)
+    host, porta = servidor.server_address[:2]
+    print(f"ouvindo em http://{host}:{porta}", flush=True)  # a primeira linha é lida pelo carga_api
+    logger.info(f"api em http://{host}:{porta} workers={args.workers} fila={args.fila}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        aud.flush()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,31 +1,22 @@
+import logging
 from seguradora.db import init_schema
 from seguradora.core.logging_conf import setup_logging
-from seguradora.services.auth import autenticar, criar_usuario
-from seguradora.cli.menu import loop_principal
 
-logger = setup_logging()
-
-def seed_admin():
-    """
-    Cria admin padrão se ainda não existir.
-    """
-    try:
-        criar_usuario("admin", "admin123", perfil="admin")
-        logger.info("Admin criado: admin / admin123")
-    except Exception:
-        # Se já existe, seguimos
-        pass
+# CLI, DAOs e relatórios são importados só depois do login (ver tools/bench_startup.py)
+logger = logging.getLogger("seguradora")
 
 def main():
-    init_schema()
-    seed_admin()
+    setup_logging()
+    init_schema()  # migrações pendentes (inclui o admin padrão); O(1) com o banco em dia
 
     print("=== LOGIN ===")
     user = input("Usuário: ").strip()
     pwd = input("Senha: ").strip()
     try:
+        from seguradora.services.auth import autenticar
         sessao = autenticar(user, pwd)
         print(f"{sessao.get('username')} | Perfil: {sessao.get('perfil')} | Ativo")
+        from seguradora.cli.menu import loop_principal
         loop_principal(sessao)
     except Exception as e:
         # Mensagem amigável
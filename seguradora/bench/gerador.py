@@ -0,0 +1,130 @@
+"""
+Gerador determinístico de carteira sintética: mesma semente + mesmo N = mesmo banco.
+
+Distribuições (por cliente):
+  seguros   1 (60%), 2 (30%) ou 3 (10%); Automóvel 50%, Residencial 30%, Vida 20%
+  apólices  90% dos seguros têm uma; 12% canceladas; emitidas nos últimos 24 meses
+  sinistros 10% das apólices têm 1 (70%), 2 (20%) ou 3 (10%); 65% fechados
+
+Grava direto com executemany em blocos de clientes (um commit por bloco), com os
+triggers ligados, então FTS e agregados ficam consistentes como numa carga real.
+"""
+import random
+from datetime import datetime, timedelta
+from ..db import get_conn
+from ..core import validators as val
+from ..dao import numeracao
+from ..dao.apolices import calcular_valor_mensal
+
+NOMES = ("Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela",
+         "João", "Júlia", "Lucas", "Mariana", "Nicolas", "Otávio", "Paula", "Rafael", "Sofia",
+         "Thiago", "Vitória", "José", "Letícia", "Mateus", "Beatriz")
+SOBRENOMES = ("Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira",
+              "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Araújo", "Conceição",
+              "Rocha", "Almeida", "Nascimento", "Barbosa")
+MODELOS = ("Gol", "Onix", "HB20", "Corolla", "Civic", "Kwid", "Compass", "Strada", "T-Cross", "Argo")
+RUAS = ("Rua das Flores", "Av. Paulista", "Rua Augusta", "Av. Brasil", "Rua XV de Novembro",
+        "Av. Atlântica", "Rua da Consolação", "Av. Afonso Pena")
+DESCRICOES = ("Colisão traseira", "Roubo do veículo", "Alagamento", "Incêndio na cozinha",
+              "Vidro quebrado", "Furto de objetos", "Danos elétricos", "Óbito do segurado")
+
+TIPOS = ("Automóvel", "Residencial", "Vida")
+_PESO_TIPOS = (50, 30, 20)
+_FAIXA_VALOR = {"Automóvel": (20_000, 150_000), "Residencial": (150_000, 1_200_000), "Vida": (50_000, 500_000)}
+
+def cpf_valido(n: int) -> str:
+    """CPF válido e único para cada n (base de 9 dígitos + dígitos verificadores)."""
+    base = [int(c) for c in f"{(n * 7919 + 100_000_000) % 1_000_000_000:09d}"]
+    for tam in (9, 10):
+        s = sum(d * p for d, p in zip(base, range(tam + 1, 1, -1)))
+        base.append((s * 10 % 11) % 10)
+    return "".join(map(str, base))
+
+def _proximos_ids(conn) -> dict:
+    return {t: conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {t}").fetchone()[0] + 1
+            for t in ("clientes", "seguros", "apolices", "sinistros")}
+
+def gerar(n_clientes: int, seed: int = 42, bloco: int = 10_000, agora: datetime | None = None,
+          progresso=None) -> dict:
+    """Insere n_clientes e a carteira derivada no banco atual; retorna as contagens."""
+    rng = random.Random(seed)
+    agora = agora or datetime(2025, 1, 1)
+    inicio = agora - timedelta(days=730)
+    total = {"clientes": 0, "seguros": 0, "apolices": 0, "sinistros": 0}
+
+    with get_conn() as conn:
+        ids = _proximos_ids(conn)
+
+    for ini in range(0, n_clientes, bloco):
+        clientes, seguros, apolices, sinistros = [], [], [], []
+        for _ in range(ini, min(ini + bloco, n_clientes)):
+            cid = ids["clientes"]; ids["clientes"] += 1
+            nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+            nasc = datetime(1940, 1, 1) + timedelta(days=rng.randrange(0, 365 * 65))
+            clientes.append((cid, nome, cpf_valido(cid), nasc.strftime("%d/%m/%Y"),
+                             f"{rng.choice(RUAS)}, {rng.randrange(1, 3000)}",
+                             f"11 9{rng.randrange(10_000_000, 99_999_999)}",
+                             f"cliente{cid}@exemplo.com.br"))
+
+            for _ in range(rng.choices((1, 2, 3), (60, 30, 10))[0]):
+                sid = ids["seguros"]; ids["seguros"] += 1
+                tipo = rng.choices(TIPOS, _PESO_TIPOS)[0]
+                valor = round(rng.uniform(*_FAIXA_VALOR[tipo]), 2)
+                modelo = ano = placa = endereco = benef = None
+                if tipo == "Automóvel":
+                    modelo, ano = rng.choice(MODELOS), rng.randrange(2005, 2025)
+                    placa = f"{''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3))}{rng.randrange(1000, 9999)}"
+                elif tipo == "Residencial":
+                    endereco = f"{rng.choice(RUAS)}, {rng.randrange(1, 3000)}"
+                else:
+                    benef = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}"
+                seguros.append((sid, tipo, nome, valor, modelo, ano, placa, endereco, benef, cid))
+
+                if rng.random() >= 0.9:
+                    continue
+                aid = ids["apolices"]; ids["apolices"] += 1
+                emitida = inicio + timedelta(seconds=rng.randrange(0, 730 * 86400))
+                status = "Cancelada" if rng.random() < 0.12 else "Ativa"
+                numero = len(apolices)  # índice; vira número de verdade na reserva do bloco
+                apolices.append([aid, numero, sid, tipo, nome, calcular_valor_mensal(valor), status,
+                                 emitida.strftime("%Y-%m-%d %H:%M:%S"), cid])
+
+                if rng.random() >= 0.1:
+                    continue
+                for _ in range(rng.choices((1, 2, 3), (70, 20, 10))[0]):
+                    ocorrido = emitida + timedelta(seconds=rng.randrange(0, max(1, int((agora - emitida).total_seconds()))))
+                    registrado = min(agora, ocorrido + timedelta(days=rng.randrange(0, 15)))
+                    sinistros.append([numero, rng.choice(DESCRICOES), ocorrido.strftime("%d/%m/%Y"),
+                                      "Fechado" if rng.random() < 0.65 else "Aberto",
+                                      registrado.strftime("%Y-%m-%d %H:%M:%S")])
+
+        invalidos = [c[2] for c, ok in zip(clientes, val.validar_cpfs(c[2] for c in clientes)) if not ok]
+        if invalidos:
+            raise AssertionError(f"gerador produziu CPF inválido: {invalidos[:3]}")
+
+        with get_conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            numeros = numeracao.numeros_apolice(conn, (a[2] for a in apolices))
+            for a, numero in zip(apolices, numeros):
+                a[1] = numero
+            for s in sinistros:
+                s[0] = numeros[s[0]]
+            conn.executemany(
+                "INSERT INTO clientes (id, nome, cpf, data_nascimento, endereco, telefone, email) "
+                "VALUES (?,?,?,?,?,?,?)", clientes)
+            conn.executemany(
+                "INSERT INTO seguros (id, tipo, titular, valor_base, modelo, ano, placa, endereco_imovel, "
+                "beneficiarios, cliente_id) VALUES (?,?,?,?,?,?,?,?,?,?)", seguros)
+            conn.executemany(
+                "INSERT INTO apolices (id, numero, seguro_id, tipo, titular, valor_mensal, status, criado_em, "
+                "cliente_id) VALUES (?,?,?,?,?,?,?,?,?)", apolices)
+            conn.executemany(
+                "INSERT INTO sinistros (apolice_numero, descricao, data, status, criado_em) VALUES (?,?,?,?,?)",
+                sinistros)
+        total["clientes"] += len(clientes)
+        total["seguros"] += len(seguros)
+        total["apolices"] += len(apolices)
+        total["sinistros"] += len(sinistros)
+        if progresso:
+            progresso(total)
+    return total
@@ -0,0 +1,378 @@
+"""
+Mede cada função das DAOs, os relatórios e a exportação em bancos sintéticos de
+tamanhos crescentes e emite JSON para acompanhar regressões.
+
+Para cada tamanho (nº de clientes; ver gerador.py para o resto da carteira) cria um
+banco novo, gera os dados e roda os casos na ordem: leituras, escritas, exclusões.
+Operações pontuais rodam `repeticoes` vezes com chaves sorteadas (média/p50/p95);
+varreduras (listar, iterar, relatórios, exportação) rodam poucas vezes.
+
+"expoente" compara tamanhos consecutivos pela mediana: log(t2/t1) / log(n2/n1). ~0 = custo
+constante, ~1 = linear no tamanho; uma operação pontual com expoente alto é onde
+a escala quebrou (falta de índice, varredura escondida).
+"""
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from .. import db
+from ..core import cache
+from . import gerador
+
+# (nome, tipo, função(ctx, i)); tipo "ponto" repete com chaves sorteadas, "varredura" roda VARREDURAS vezes
+CASOS = []
+VARREDURAS = 3
+
+def caso(nome: str, tipo: str = "ponto"):
+    def registrar(fn):
+        CASOS.append((nome, tipo, fn))
+        return fn
+    return registrar
+
+# -------------------- leituras --------------------
+
+def _dao():
+    from ..dao import clientes, seguros, apolices, sinistros
+    return clientes, seguros, apolices, sinistros
+
+@caso("clientes.listar", "varredura")
+def _(ctx, i):
+    _dao()[0].listar()
+
+@caso("clientes.listar_pagina")
+def _(ctx, i):
+    _dao()[0].listar_pagina(cursor=ctx.escolher("cursores_clientes"), limite=50)
+
+@caso("clientes.iterar", "varredura")
+def _(ctx, i):
+    for _ in _dao()[0].iterar(lote=1000):
+        pass
+
+@caso("clientes.buscar_por_cpf")
+def _(ctx, i):
+    _dao()[0].buscar_por_cpf(ctx.escolher("cpfs")[:6])
+
+@caso("clientes.buscar_por_nome")
+def _(ctx, i):
+    _dao()[0].buscar_por_nome(ctx.escolher("nomes"))
+
+@caso("clientes.obter_por_cpf")
+def _(ctx, i):
+    _dao()[0].obter_por_cpf(ctx.escolher("cpfs"))
+
+@caso("seguros.listar", "varredura")
+def _(ctx, i):
+    _dao()[1].listar()
+
+@caso("seguros.listar_pagina")
+def _(ctx, i):
+    _dao()[1].listar_pagina(cursor=ctx.escolher("seguro_ids"), limite=50, tipo=ctx.rng.choice(gerador.TIPOS))
+
+@caso("seguros.iterar", "varredura")
+def _(ctx, i):
+    for _ in _dao()[1].iterar(lote=1000):
+        pass
+
+@caso("seguros.obter")
+def _(ctx, i):
+    _dao()[1].obter(ctx.escolher("seguro_ids"))
+
+@caso("apolices.listar", "varredura")
+def _(ctx, i):
+    _dao()[2].listar()
+
+@caso("apolices.listar_pagina")
+def _(ctx, i):
+    _dao()[2].listar_pagina(cursor=ctx.escolher("apolice_ids"), limite=50, status="Ativa")
+
+@caso("apolices.iterar", "varredura")
+def _(ctx, i):
+    for _ in _dao()[2].iterar(lote=1000):
+        pass
+
+@caso("apolices.buscar_por_numero")
+def _(ctx, i):
+    _dao()[2].buscar_por_numero(ctx.escolher("numeros")[:8])
+
+@caso("apolices.obter")
+def _(ctx, i):
+    _dao()[2].obter(ctx.escolher("numeros"))
+
+@caso("sinistros.listar", "varredura")
+def _(ctx, i):
+    _dao()[3].listar()
+
+@caso("sinistros.listar_pagina")
+def _(ctx, i):
+    _dao()[3].listar_pagina(limite=50, apolice_numero=ctx.escolher("numeros_com_sinistro"))
+
+@caso("sinistros.iterar", "varredura")
+def _(ctx, i):
+    for _ in _dao()[3].iterar(lote=1000):
+        pass
+
+@caso("sinistros.listar_por_data")
+def _(ctx, i):
+    mes = ctx.rng.randrange(1, 13)
+    _dao()[3].listar_por_data(f"01/{mes:02d}/2024", f"28/{mes:02d}/2024", limite=50)
+
+@caso("auth.listar_usuarios", "varredura")
+def _(ctx, i):
+    from ..services import auth
+    auth.listar_usuarios()
+
+@caso("auth.autenticar")
+def _(ctx, i):
+    from ..services import auth
+    auth.invalidar_cache()  # mede o login completo (busca + KDF), não só o hit de cache
+    auth.autenticar("bench", "senha-bench")
+
+# -------------------- relatórios e exportação --------------------
+
+@caso("relatorios.receita_mensal_prevista", "varredura")
+def _(ctx, i):
+    from ..services import relatorios
+    relatorios.receita_mensal_prevista()
+
+@caso("relatorios.top_clientes_por_valor_segurado", "varredura")
+def _(ctx, i):
+    from ..services import relatorios
+    relatorios.top_clientes_por_valor_segurado()
+
+@caso("relatorios.sinistros_por_status", "varredura")
+def _(ctx, i):
+    from ..services import relatorios
+    relatorios.sinistros_por_status()
+
+@caso("relatorios.sinistros_por_periodo", "varredura")
+def _(ctx, i):
+    from ..services import relatorios
+    relatorios.sinistros_por_periodo("2023-01", "2024-12")
+
+@caso("relatorios.export_csv", "varredura")
+def _(ctx, i):
+    from ..services import relatorios
+    relatorios.export_csv(f"bench_apolices_{i}", _dao()[2].iterar(lote=5000))
+
+@caso("relatorios.export_json", "varredura")
+def _(ctx, i):
+    from ..services import relatorios
+    relatorios.export_json(f"bench_apolices_{i}", _dao()[2].iterar(lote=5000))
+
+# -------------------- escritas --------------------
+
+@caso("clientes.criar_cliente")
+def _(ctx, i):
+    ctx.novos_cpfs.append(gerador.cpf_valido(900_000_000 + ctx.n_novos()))
+    _dao()[0].criar_cliente({"nome": f"Bench {i}", "cpf": ctx.novos_cpfs[-1], "data_nascimento": "01/01/1990"})
+
+@caso("clientes.atualizar_contato")
+def _(ctx, i):
+    _dao()[0].atualizar_contato(ctx.escolher("cpfs"), f"11 9{i:08d}", None)
+
+@caso("seguros.criar_seguro_automovel")
+def _(ctx, i):
+    ctx.novos_seguros.append(_dao()[1].criar_seguro_automovel(ctx.escolher("nomes_completos"), 50_000, "Gol", 2020, "BEN1234"))
+
+@caso("seguros.criar_seguro_residencial")
+def _(ctx, i):
+    ctx.novos_seguros.append(_dao()[1].criar_seguro_residencial(ctx.escolher("nomes_completos"), 300_000, "Rua X, 1"))
+
+@caso("seguros.criar_seguro_vida")
+def _(ctx, i):
+    ctx.novos_seguros.append(_dao()[1].criar_seguro_vida(ctx.escolher("nomes_completos"), 100_000, "Fulano"))
+
+@caso("seguros.editar_seguro")
+def _(ctx, i):
+    _dao()[1].editar_seguro(ctx.escolher("seguro_ids"), valor_base=10_000 + i)
+
+@caso("apolices.emitir_apolice")
+def _(ctx, i):
+    ctx.novas_apolices.append(_dao()[2].emitir_apolice(ctx.escolher("seguro_ids")))
+
+@caso("apolices.editar")
+def _(ctx, i):
+    _dao()[2].editar(ctx.escolher("numeros"), valor_mensal=100 + i)
+
+@caso("apolices.cancelar")
+def _(ctx, i):
+    _dao()[2].cancelar(ctx.novas_apolices.pop())
+
+@caso("sinistros.registrar")
+def _(ctx, i):
+    _dao()[3].registrar(ctx.escolher("numeros"), "Bench", "15/06/2024")
+
+@caso("sinistros.editar")
+def _(ctx, i):
+    _dao()[3].editar(ctx.escolher("sinistro_ids"), descricao=f"Bench {i}")
+
+@caso("sinistros.fechar")
+def _(ctx, i):
+    _dao()[3].fechar(ctx.escolher("numeros_com_sinistro"))
+
+@caso("auth.criar_usuario")
+def _(ctx, i):
+    from ..services import auth
+    auth.criar_usuario(f"bench_{i}_{ctx.rng.randrange(1 << 30)}", "senha-bench")
+
+# -------------------- exclusões --------------------
+
+@caso("seguros.deletar_seguro")
+def _(ctx, i):
+    _dao()[1].deletar_seguro(ctx.novos_seguros.pop())
+
+@caso("clientes.deletar_por_cpf")
+def _(ctx, i):
+    _dao()[0].deletar_por_cpf(ctx.escolher("cpfs"), force=True)
+
+# -------------------- execução --------------------
+
+class Contexto:
+    """Amostras de chaves existentes, sorteadas com semente fixa."""
+    def __init__(self, seed: int, amostra: int = 2000):
+        self.rng = random.Random(seed)
+        self.novos_cpfs, self.novos_seguros, self.novas_apolices = [], [], []
+        self._amostras = {}
+        with db.get_conn() as conn:
+            def col(sql):
+                return [r[0] for r in conn.execute(sql, (amostra,))]
+            self._amostras = {
+                "cpfs": col("SELECT cpf FROM clientes ORDER BY random() LIMIT ?"),
+                "nomes": col("SELECT substr(nome, 1, instr(nome, ' ') - 1) FROM clientes ORDER BY random() LIMIT ?"),
+                "nomes_completos": col("SELECT nome FROM clientes ORDER BY random() LIMIT ?"),
+                "cursores_clientes": [tuple(r) for r in conn.execute(
+                    "SELECT nome, id FROM clientes ORDER BY random() LIMIT ?", (amostra,))],
+                "seguro_ids": col("SELECT id FROM seguros ORDER BY random() LIMIT ?"),
+                "apolice_ids": col("SELECT id FROM apolices ORDER BY random() LIMIT ?"),
+                "numeros": col("SELECT numero FROM apolices WHERE status='Ativa' ORDER BY random() LIMIT ?"),
+                "numeros_com_sinistro": col("SELECT DISTINCT apolice_numero FROM sinistros ORDER BY random() LIMIT ?"),
+                "sinistro_ids": col("SELECT id FROM sinistros ORDER BY random() LIMIT ?"),
+            }
+        self._n_novos = 0
+
+    def escolher(self, amostra: str):
+        return self.rng.choice(self._amostras[amostra])
+
+    def n_novos(self) -> int:
+        self._n_novos += 1
+        return self._n_novos
+
+def _medir(nome, fn, ctx, vezes):
+    tempos = []
+    for i in range(vezes):
+        t = time.perf_counter()
+        fn(ctx, i)
+        tempos.append(time.perf_counter() - t)
+    tempos.sort()
+    return {
+        "operacao": nome, "repeticoes": vezes,
+        "media_ms": round(statistics.fmean(tempos) * 1000, 4),
+        "p50_ms": round(tempos[len(tempos) // 2] * 1000, 4),
+        "p95_ms": round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))] * 1000, 4),
+        "max_ms": round(tempos[-1] * 1000, 4),
+        "total_s": round(sum(tempos), 4),
+    }
+
+def _usar_banco(path: str):
+    os.environ["SEGU_DB"] = path
+    db.DB_PATH = path  # get_pool() troca o pool quando o caminho muda
+    cache.limpar()
+
+def rodar_tamanho(n: int, diretorio: Path, seed: int, repeticoes: int, filtro: str | None = None,
+                  log=print) -> list[dict]:
+    path = diretorio / f"bench_{n}.db"
+    for sufixo in ("", "-wal", "-shm"):
+        Path(f"{path}{sufixo}").unlink(missing_ok=True)
+    _usar_banco(str(path))
+    db.init_schema()
+
+    t = time.perf_counter()
+    contagens = gerador.gerar(n, seed=seed)
+    dt = time.perf_counter() - t
+    linhas = sum(contagens.values())
+    log(f"[{n:,}] gerado em {dt:.1f}s ({linhas / dt:,.0f} linhas/s): {contagens}")
+    resultados = [{"tamanho": n, "operacao": "gerador.gerar", "repeticoes": 1, "total_s": round(dt, 3),
+                   "linhas": linhas, "linhas_por_s": round(linhas / dt), **{f"qtd_{k}": v for k, v in contagens.items()}}]
+
+    from ..services import auth, relatorios
+    relatorios.EXPORT_DIR = diretorio / "exports"
+    auth.criar_usuario("bench", "senha-bench")
+    ctx = Contexto(seed)
+    for nome, tipo, fn in CASOS:
+        if filtro and filtro not in nome:
+            continue
+        vezes = VARREDURAS if tipo == "varredura" else repeticoes
+        if nome == "auth.autenticar":
+            vezes = min(vezes, 10)  # dominado pelo KDF, de propósito lento
+        fn(ctx, vezes)  # aquecimento (cache de statements, páginas do SQLite)
+        r = _medir(nome, fn, ctx, vezes)
+        r["tamanho"] = n
+        r["tipo"] = tipo
+        resultados.append(r)
+        log(f"[{n:,}] {nome:<42} média {r['media_ms']:10.3f} ms  p95 {r['p95_ms']:10.3f} ms")
+    db.close_pool()
+    return resultados
+
+def escala(resultados: list[dict]) -> list[dict]:
+    """Expoente de crescimento de cada operação entre tamanhos consecutivos."""
+    por_op = {}
+    for r in resultados:
+        if "media_ms" in r:
+            # mediana, não média: um checkpoint do WAL numa repetição distorce a média de 200
+            por_op.setdefault(r["operacao"], []).append((r["tamanho"], r["p50_ms"], r.get("tipo")))
+    saida = []
+    for op, pontos in por_op.items():
+        pontos.sort()
+        for (n1, t1, tipo), (n2, t2, _) in zip(pontos, pontos[1:]):
+            if t1 > 0 and t2 > 0 and n2 > n1:
+                e = math.log(t2 / t1) / math.log(n2 / n1)
+                saida.append({"operacao": op, "de": n1, "para": n2, "expoente": round(e, 2),
+                              "alerta": tipo == "ponto" and e > 0.5})
+    return saida
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(prog="python -m seguradora.bench")
+    ap.add_argument("--tamanhos", default="10000,100000",
+                    help="nº de clientes por rodada, separados por vírgula (ex.: 10000,100000,1000000)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--repeticoes", type=int, default=200, help="repetições de cada operação pontual")
+    ap.add_argument("--dir", default="bench_dados", help="onde ficam os bancos e exportações gerados")
+    ap.add_argument("--saida", default="bench_resultados.json")
+    ap.add_argument("--filtro", help="só operações cujo nome contém este texto")
+    args = ap.parse_args(argv)
+
+    tamanhos = [int(t) for t in args.tamanhos.split(",") if t.strip()]
+    diretorio = Path(args.dir)
+    diretorio.mkdir(parents=True, exist_ok=True)
+
+    def log(msg):
+        print(msg, file=sys.stderr, flush=True)
+
+    resultados = []
+    for n in tamanhos:
+        resultados.extend(rodar_tamanho(n, diretorio, args.seed, args.repeticoes, args.filtro, log))
+
+    relatorio = {
+        "meta": {
+            "quando": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version, "plataforma": platform.platform(),
+            "perfil_db": db.get_profile().get("nome"), "cache": cache.ATIVO,
+            "seed": args.seed, "tamanhos": tamanhos, "repeticoes": args.repeticoes,
+        },
+        "resultados": resultados,
+        "escala": escala(resultados),
+    }
+    Path(args.saida).write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+    for e in relatorio["escala"]:
+        if e["alerta"]:
+            log(f"não escala: {e['operacao']} {e['de']:,} -> {e['para']:,} (expoente {e['expoente']})")
+    log(f"resultados em {args.saida}")
+    return 0
@@ -0,0 +1,322 @@
+"""
+Importação em lote de clientes, seguros e apólices a partir de CSV ou JSONL.
+
+    python -m seguradora.bulk import clientes carteira.csv
+    python -m seguradora.bulk import apolices apolices.jsonl --lote 10000 --perfil bulk
+
+O arquivo é lido em streaming; cada lote é validado de uma vez, gravado com
+executemany numa única transação e o progresso (registros consumidos) é salvo
+na mesma transação em import_checkpoints. Se a importação cair, rodar o mesmo
+comando continua do último lote confirmado (--reiniciar começa do zero).
+Registros recusados vão para <arquivo>.rejeitos.csv com o motivo.
+
+Campos aceitos (cabeçalho do CSV / chaves do JSON):
+  clientes: nome, cpf, data_nascimento (DD/MM/AAAA), endereco, telefone, email
+  seguros:  tipo, titular, valor_base, modelo, ano, placa, endereco_imovel, beneficiarios
+  apolices: seguro_id [, numero, valor_mensal, status]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+from .db import get_conn, com_retry, init_schema
+from .core import cache, validators as val
+from .dao import apolices as ap_dao, numeracao
+from .dao import seguros as se_dao
+
+LOTE_PADRAO = 5000
+_MAX_PARAMS = 900  # abaixo do limite de variáveis por statement de SQLites antigos
+
+# -------------------- leitura --------------------
+
+def _ler(f, formato: str):
+    """Gera (nº do registro, dict); registros ilegíveis vêm com a chave '_erro'."""
+    if formato == "csv":
+        for n, r in enumerate(csv.DictReader(f), start=1):
+            yield n, r
+        return
+    n = 0
+    for linha in f:
+        if not linha.strip():
+            continue
+        n += 1
+        try:
+            r = json.loads(linha)
+            yield n, r if isinstance(r, dict) else {"_erro": "registro JSON não é objeto"}
+        except json.JSONDecodeError as e:
+            yield n, {"_erro": f"JSON inválido: {e.msg}", "_bruto": linha.rstrip("\n")}
+
+def _txt(r: dict, k: str):
+    v = r.get(k)
+    if v is None:
+        return None
+    v = str(v).strip()
+    return v or None
+
+def _existentes(conn, tabela: str, coluna: str, valores) -> set:
+    valores = list({v for v in valores if v is not None})
+    achados = set()
+    for i in range(0, len(valores), _MAX_PARAMS):
+        parte = valores[i:i + _MAX_PARAMS]
+        marcas = ",".join("?" * len(parte))
+        achados.update(r[0] for r in conn.execute(
+            f"SELECT {coluna} FROM {tabela} WHERE {coluna} IN ({marcas})", parte))
+    return achados
+
+# -------------------- lotes por entidade --------------------
+# Cada função recebe [(nº, registro)] já dentro da transação e retorna (inseridos, rejeitos).
+
+def _lote_clientes(conn, itens):
+    cpfs = [val.limpar_cpf(_txt(r, "cpf") or "") for _, r in itens]
+    datas = [_txt(r, "data_nascimento") or "" for _, r in itens]
+    cpf_ok = val.validar_cpfs(cpfs)
+    data_ok = val.validar_datas_ddmmaa(datas)
+    ja_cadastrados = _existentes(conn, "clientes", "cpf", cpfs)
+
+    linhas, rejeitos, vistos = [], [], set()
+    for (n, r), cpf, data, ok_cpf, ok_data in zip(itens, cpfs, datas, cpf_ok, data_ok):
+        nome = _txt(r, "nome")
+        if not nome:
+            motivo = "nome obrigatório"
+        elif not ok_cpf:
+            motivo = "CPF inválido"
+        elif not ok_data:
+            motivo = "data_nascimento inválida (use DD/MM/AAAA)"
+        elif cpf in ja_cadastrados or cpf in vistos:
+            motivo = "CPF já cadastrado"
+        else:
+            motivo = None
+        if motivo:
+            rejeitos.append((n, motivo, r)); continue
+        vistos.add(cpf)
+        linhas.append((nome, cpf, data, _txt(r, "endereco"), _txt(r, "telefone"), _txt(r, "email")))
+
+    conn.executemany(
+        "INSERT INTO clientes (nome, cpf, data_nascimento, endereco, telefone, email) "
+        "VALUES (?,?,?,?,?,?)", linhas)
+    return len(linhas), rejeitos
+
+_TIPOS = {"automóvel": "Automóvel", "automovel": "Automóvel", "residencial": "Residencial", "vida": "Vida"}
+_OBRIGATORIOS = {"Automóvel": ("modelo", "ano", "placa"), "Residencial": ("endereco_imovel",),
+                 "Vida": ("beneficiarios",)}
+
+def _lote_seguros(conn, itens):
+    linhas, rejeitos = [], []
+    for n, r in itens:
+        tipo = _TIPOS.get((_txt(r, "tipo") or "").lower())
+        titular = _txt(r, "titular")
+        try:
+            valor = float(_txt(r, "valor_base") or "nan")
+            ano = int(_txt(r, "ano")) if _txt(r, "ano") else None
+        except ValueError:
+            valor, ano = float("nan"), None
+        motivo = None
+        if not tipo:
+            motivo = "tipo deve ser Automóvel, Residencial ou Vida"
+        elif not titular:
+            motivo = "titular obrigatório"
+        elif not valor > 0:
+            motivo = "valor_base inválido"
+        else:
+            faltando = [k for k in _OBRIGATORIOS[tipo] if not _txt(r, k)]
+            if faltando:
+                motivo = f"campos obrigatórios para {tipo}: {', '.join(faltando)}"
+            elif tipo == "Automóvel" and ano is None:
+                motivo = "ano inválido"
+        if motivo:
+            rejeitos.append((n, motivo, r)); continue
+        linhas.append((tipo, titular, valor, _txt(r, "modelo"), ano, _txt(r, "placa"),
+                       _txt(r, "endereco_imovel"), _txt(r, "beneficiarios"), titular))
+
+    conn.executemany(
+        "INSERT INTO seguros (tipo,titular,valor_base,modelo,ano,placa,endereco_imovel,beneficiarios,cliente_id) "
+        f"VALUES (?,?,?,?,?,?,?,?,{se_dao.CLIENTE_POR_NOME})", linhas)
+    return len(linhas), rejeitos
+
+def _lote_apolices(conn, itens):
+    ids = []
+    for _, r in itens:
+        try:
+            ids.append(int(_txt(r, "seguro_id")))
+        except (TypeError, ValueError):
+            ids.append(None)
+    seguros = {}
+    validos = [i for i in ids if i is not None]
+    for i in range(0, len(validos), _MAX_PARAMS):
+        parte = validos[i:i + _MAX_PARAMS]
+        for s in conn.execute(
+            f"SELECT id, tipo, titular, valor_base, cliente_id FROM seguros WHERE id IN ({','.join('?' * len(parte))})", parte
+        ):
+            seguros[s["id"]] = s
+    numeros_informados = [_txt(r, "numero") for _, r in itens]
+    ja_emitidos = _existentes(conn, "apolices", "numero", numeros_informados)
+
+    linhas, rejeitos, vistos = [], [], set()
+    for (n, r), sid, numero in zip(itens, ids, numeros_informados):
+        status = _txt(r, "status") or "Ativa"
+        seg = seguros.get(sid)
+        motivo = None
+        if sid is None:
+            motivo = "seguro_id inválido"
+        elif seg is None:
+            motivo = "seguro inexistente"
+        elif status not in ("Ativa", "Cancelada"):
+            motivo = "status deve ser Ativa ou Cancelada"
+        elif numero and not numeracao.numero_aceito(numero):
+            motivo = "número de apólice inválido (dígito verificador)"
+        elif numero and (numero in ja_emitidos or numero in vistos):
+            motivo = "número de apólice já existe"
+        if not motivo:
+            try:
+                valor_mensal = float(_txt(r, "valor_mensal")) if _txt(r, "valor_mensal") \
+                    else ap_dao.calcular_valor_mensal(seg["valor_base"])
+            except ValueError:
+                motivo = "valor_mensal inválido"
+        if motivo:
+            rejeitos.append((n, motivo, r)); continue
+        if numero:
+            vistos.add(numero)
+        linhas.append([numero, sid, seg["tipo"], seg["titular"], valor_mensal, status, seg["cliente_id"]])
+
+    # sem número informado: uma reserva de sequência para o lote inteiro
+    sem_numero = [l for l in linhas if not l[0]]
+    for l, numero in zip(sem_numero, numeracao.numeros_apolice(conn, (l[1] for l in sem_numero))):
+        l[0] = numero
+    conn.executemany(
+        "INSERT INTO apolices (numero,seguro_id,tipo,titular,valor_mensal,status,cliente_id) "
+        "VALUES (?,?,?,?,?,?,?)", linhas)
+    return len(linhas), rejeitos
+
+ENTIDADES = {"clientes": _lote_clientes, "seguros": _lote_seguros, "apolices": _lote_apolices}
+# lotes só inserem, mas podem tornar falso um "não existe" em cache
+_CACHES = {"clientes": "cliente", "seguros": "seguro", "apolices": "apolice"}
+
+# -------------------- checkpoint --------------------
+
+def _carregar_checkpoint(chave: str) -> dict:
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT registros, inseridos, rejeitados, concluido FROM import_checkpoints WHERE chave=?", (chave,)
+        ).fetchone()
+    if not row:
+        return {"registros": 0, "inseridos": 0, "rejeitados": 0, "concluido": 0}
+    return dict(row)
+
+def _salvar_checkpoint(conn, chave: str, estado: dict):
+    conn.execute(
+        "INSERT INTO import_checkpoints (chave, registros, inseridos, rejeitados, concluido, atualizado_em) "
+        "VALUES (?,?,?,?,?, CURRENT_TIMESTAMP) "
+        "ON CONFLICT(chave) DO UPDATE SET registros=excluded.registros, inseridos=excluded.inseridos, "
+        "rejeitados=excluded.rejeitados, concluido=excluded.concluido, atualizado_em=excluded.atualizado_em",
+        (chave, estado["registros"], estado["inseridos"], estado["rejeitados"], estado["concluido"])
+    )
+
+@com_retry
+def _gravar_lote(processar, itens, chave: str, estado: dict):
+    """Lote + checkpoint na mesma transação: ou os dois ficam, ou nenhum."""
+    bons = [(n, r) for n, r in itens if "_erro" not in r]
+    rejeitos = [(n, r["_erro"], r) for n, r in itens if "_erro" in r]
+    novo = dict(estado)
+    with get_conn() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        inseridos, rej = processar(conn, bons)
+        rejeitos.extend(rej)
+        novo["registros"] += len(itens)
+        novo["inseridos"] += inseridos
+        novo["rejeitados"] += len(rejeitos)
+        _salvar_checkpoint(conn, chave, novo)
+    return novo, sorted(rejeitos, key=lambda x: x[0])
+
+# -------------------- API --------------------
+
+def importar(entidade: str, arquivo: str, formato: str | None = None, lote: int = LOTE_PADRAO,
+             rejeitos: str | None = None, reiniciar: bool = False, progresso=None) -> dict:
+    if entidade not in ENTIDADES:
+        raise ValueError(f"entidade deve ser uma de: {', '.join(ENTIDADES)}")
+    path = Path(arquivo)
+    formato = formato or ("jsonl" if path.suffix.lower() in (".jsonl", ".ndjson", ".json") else "csv")
+    chave = f"{entidade}:{path.resolve()}"
+    rej_path = Path(rejeitos) if rejeitos else path.with_name(path.name + ".rejeitos.csv")
+
+    init_schema()
+    estado = {"registros": 0, "inseridos": 0, "rejeitados": 0, "concluido": 0} \
+        if reiniciar else _carregar_checkpoint(chave)
+    if estado["concluido"]:
+        return dict(estado, retomado=False, rejeitos_arquivo=str(rej_path))
+    retomado = estado["registros"] > 0
+
+    processar = ENTIDADES[entidade]
+    t0 = time.perf_counter()
+    inicio = estado["registros"]
+    with path.open(encoding="utf-8", newline="") as f, \
+         rej_path.open("a" if retomado else "w", encoding="utf-8", newline="") as rf:
+        w = csv.writer(rf)
+        if not retomado:
+            w.writerow(["registro", "motivo", "dados"])
+        registros = islice(_ler(f, formato), estado["registros"], None)
+        while True:
+            itens = list(islice(registros, lote))
+            if not itens:
+                break
+            estado, rej = _gravar_lote(processar, itens, chave, estado)
+            cache.cache(_CACHES[entidade]).invalidar()
+            for n, motivo, r in rej:
+                dados = r["_bruto"] if "_bruto" in r else json.dumps(r, ensure_ascii=False, default=str)
+                w.writerow([n, motivo, dados])
+            rf.flush()
+            if progresso:
+                dt = time.perf_counter() - t0
+                progresso(estado, (estado["registros"] - inicio) / dt if dt else 0.0)
+
+    estado["concluido"] = 1
+    with get_conn() as conn:
+        _salvar_checkpoint(conn, chave, estado)
+    return dict(estado, retomado=retomado, rejeitos_arquivo=str(rej_path),
+                segundos=round(time.perf_counter() - t0, 3))
+
+def _progresso_stderr(estado, taxa):
+    sys.stderr.write(f"\r{estado['registros']} registros | {estado['inseridos']} inseridos | "
+                     f"{estado['rejeitados']} rejeitados | {taxa:,.0f} reg/s")
+    sys.stderr.flush()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m seguradora.bulk", description="Importação em lote.")
+    sub = ap.add_subparsers(dest="comando", required=True)
+    imp = sub.add_parser("import", help="importa um arquivo CSV/JSONL")
+    imp.add_argument("entidade", choices=list(ENTIDADES))
+    imp.add_argument("arquivo")
+    imp.add_argument("--formato", choices=("csv", "jsonl"))
+    imp.add_argument("--lote", type=int, default=LOTE_PADRAO, help=f"registros por transação (padrão {LOTE_PADRAO})")
+    imp.add_argument("--rejeitos", help="arquivo de rejeitos (padrão <arquivo>.rejeitos.csv)")
+    imp.add_argument("--reiniciar", action="store_true", help="ignora o checkpoint e começa do início")
+    imp.add_argument("--perfil", help="perfil do banco (ex.: bulk); o mesmo que SEGU_DB_PROFILE")
+    imp.add_argument("--usuario", default="bulk", help="username gravado na auditoria")
+    imp.add_argument("-q", "--quiet", action="store_true", help="sem progresso")
+    args = ap.parse_args(argv)
+
+    if args.perfil:
+        os.environ["SEGU_DB_PROFILE"] = args.perfil
+    init_schema()
+
+    from .dao import auditoria as aud
+    try:
+        r = importar(args.entidade, args.arquivo, formato=args.formato, lote=max(1, args.lote),
+                     rejeitos=args.rejeitos, reiniciar=args.reiniciar,
+                     progresso=None if args.quiet else _progresso_stderr)
+    except Exception as e:
+        aud.registrar(args.usuario, "importar", args.entidade, args.arquivo, False, str(e))
+        raise
+    if not args.quiet:
+        sys.stderr.write("\n")
+    aud.registrar(args.usuario, "importar", args.entidade, args.arquivo, True,
+                  f"inseridos={r['inseridos']} rejeitados={r['rejeitados']}")
+    print(json.dumps(r, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+"""
+Modo não interativo: python -m seguradora <subcomando> [opções]
+
+    listar {clientes,seguros,apolices,sinistros,usuarios} [--status S] [--tipo T] [--formato jsonl|csv]
+    emitir [SEGURO_ID ...]          sem IDs, lê da entrada: JSON, JSON Lines, CSV com seguro_id ou um por linha
+    cancelar [NUMERO ...]           idem, com a coluna numero
+    registrar-sinistro [--apolice N --descricao D --data DD/MM/AAAA]
+                                    sem --apolice, lê registros (apolice_numero, descricao, data) da entrada
+    relatorio {receita,top-clientes,sinistros-status,sinistros-periodo} [--de YYYY-MM --ate YYYY-MM]
+    relatorio {projecao-premios [--meses N],sinistralidade,distribuicao-valores}
+    export TABELA [--formato csv|jsonl|parquet|arrow] [--compressao gzip|zstd] [--nome N]
+    token                           autentica e imprime um token de sessão
+    batch ARQUIVO|-                 um comando por linha, no mesmo processo: um login, uma
+                                    checagem de schema e as conexões do pool reaproveitadas;
+                                    linha que falha vira {"linha": N, "resultado": "erro", ...}
+
+Autenticação (uma vez por invocação): --token / SEGU_TOKEN, ou --usuario / SEGU_USUARIO com a
+senha em SEGU_SENHA (sem ela, é pedida no terminal). Saída em JSON Lines no stdout, um objeto
+por item; logs e erros no stderr. Código de saída: 0 ok, 1 erro de negócio ou de autenticação
+(no batch: alguma linha falhou), 2 uso incorreto. Sem subcomando, abre o menu interativo.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import shlex
+import sys
+
+from ..core.exceptions import AppError, OperacaoNaoPermitida
+
+# DAOs e serviços são importados dentro de cada comando: `token` ou `relatorio` não
+# pagam o import do que não usam (ver tools/bench_startup.py)
+logger = logging.getLogger("seguradora")
+
+ENTIDADES = ("clientes", "seguros", "apolices", "sinistros", "usuarios")
+RELATORIOS = ("receita", "top-clientes", "sinistros-status", "sinistros-periodo",
+              "projecao-premios", "sinistralidade", "distribuicao-valores")  # os três últimos: analytics (numpy)
+SO_ADMIN = ("listar", "emitir", "cancelar", "registrar-sinistro", "export")  # como no menu: comum/cliente só têm relatórios
+
+# -------------------- entrada e saída --------------------
+
+def _emitir(obj):
+    sys.stdout.write(json.dumps(obj, ensure_ascii=False, default=str) + "\n")
+
+def _json(texto: str, linha0: int):
+    try:
+        return json.loads(texto)
+    except json.JSONDecodeError as e:
+        raise AppError(f"Entrada JSON inválida: {e}",
+                       user_message=f"Entrada JSON inválida na linha {linha0 + e.lineno}.")
+
+def _ler_entrada(campo: str | None = None) -> list:
+    """
+    Itens da entrada padrão. Com `campo`, devolve só esse valor de cada item (aceita
+    também um valor por linha); sem ele, devolve dicts (JSON/JSONL/CSV com cabeçalho).
+    """
+    texto = sys.stdin.read().lstrip("\ufeff").strip()
+    if not texto:
+        return []
+    if texto[0] == "[":
+        itens = _json(texto, 0)
+    elif texto[0] == "{":
+        itens = [_json(l, n) for n, l in enumerate(texto.splitlines()) if l.strip()]
+    else:
+        linhas = texto.splitlines()
+        cabecalho = [c.strip().strip('"') for c in linhas[0].split(",")]
+        if campo is None or campo in cabecalho:
+            itens = list(csv.DictReader(linhas))
+        else:
+            itens = [l.strip() for l in linhas if l.strip() and not l.startswith("#")]
+    if campo is None:
+        return itens
+    return [i.get(campo) if isinstance(i, dict) else i for i in itens]
+
+# -------------------- comandos --------------------
+
+def _listar(args, sessao):
+    if args.entidade == "usuarios":
+        from ..services import auth
+        rows = auth.listar_usuarios()
+    else:
+        from ..dao import clientes, seguros, apolices, sinistros
+        filtros = {"clientes": {}, "seguros": {"tipo": args.tipo},
+                   "apolices": {"status": args.status, "tipo": args.tipo},
+                   "sinistros": {"status": args.status}}[args.entidade]
+        dao = {"clientes": clientes, "seguros": seguros, "apolices": apolices, "sinistros": sinistros}[args.entidade]
+        rows = dao.iterar(lote=1000, **filtros)
+    if args.formato == "csv":
+        w = None
+        for r in rows:
+            if w is None:
+                w = csv.writer(sys.stdout)
+                w.writerow(r.keys())
+            w.writerow(r)
+    else:
+        for r in rows:
+            _emitir(dict(r))
+
+def _emitir_apolices(args, sessao):
+    from ..dao import apolices, auditoria
+    bruto = args.seguro_ids or _ler_entrada("seguro_id")
+    ids, invalidos = [], []
+    for v in bruto:
+        try:
+            ids.append(int(v))
+        except (TypeError, ValueError):
+            invalidos.append(v)
+    for v in invalidos:
+        _emitir({"seguro_id": v, "resultado": "invalido", "numero": None})
+    res = apolices.emitir_apolices(ids)
+    auditoria.registrar_lote(sessao["username"], "emitir", "apolice",
+                             ((numero or sid, numero is not None, None if numero else st) for sid, st, numero in res))
+    for sid, st, numero in res:
+        _emitir({"seguro_id": sid, "resultado": st, "numero": numero})
+    logger.info(f"comando emitir itens={len(res)} emitidas={sum(1 for r in res if r[2])}")
+
+def _cancelar(args, sessao):
+    from ..dao import apolices, auditoria
+    numeros = [n for n in (args.numeros or _ler_entrada("numero")) if n]
+    res = apolices.cancelar_apolices(numeros)
+    auditoria.registrar_lote(sessao["username"], "cancelar", "apolice",
+                             ((n, st == apolices.CANCELADA, None if st == apolices.CANCELADA else st) for n, st in res))
+    for n, st in res:
+        _emitir({"numero": n, "resultado": st})
+    logger.info(f"comando cancelar itens={len(res)}")
+
+def _registrar_sinistro(args, sessao):
+    from ..dao import sinistros, auditoria
+    if args.apolice:
+        itens = [{"apolice_numero": args.apolice, "descricao": args.descricao, "data": args.data}]
+    else:
+        itens = _ler_entrada()
+    auditados = []
+    for item in itens:
+        numero = (item.get("apolice_numero") or "").strip()
+        try:
+            sid = sinistros.registrar(numero, item.get("descricao") or "", (item.get("data") or "").strip())
+        except AppError as e:
+            _emitir({"apolice_numero": numero, "resultado": "erro", "mensagem": e.user_message})
+            auditados.append((numero, False, e.user_message))
+            continue
+        if sid:
+            _emitir({"apolice_numero": numero, "resultado": "registrado", "id": sid})
+            auditados.append((sid, True, None))
+        else:
+            _emitir({"apolice_numero": numero, "resultado": "apolice_invalida"})
+            auditados.append((numero, False, "apólice inválida"))
+    auditoria.registrar_lote(sessao["username"], "registrar", "sinistro", auditados)
+
+def _relatorio(args, sessao):
+    from ..services import relatorios
+    if args.nome == "receita":
+        rows = relatorios.receita_mensal_prevista()
+    elif args.nome == "top-clientes":
+        rows = relatorios.top_clientes_por_valor_segurado(args.limite, workers=args.workers)
+    elif args.nome == "sinistros-status":
+        rows = relatorios.sinistros_por_status()
+    elif args.nome in ("projecao-premios", "sinistralidade", "distribuicao-valores"):
+        from ..services.relatorios import analytics
+        rows = {"projecao-premios": lambda: analytics.projecao_premios(args.meses),
+                "sinistralidade": analytics.sinistralidade_por_tipo,
+                "distribuicao-valores": analytics.distribuicao_valores}[args.nome]()
+    else:
+        if not (args.de and args.ate):
+            raise AppError("Período ausente.", user_message="Informe --de e --ate (YYYY-MM).")
+        rows = relatorios.sinistros_por_periodo(args.de, args.ate, por=args.por)
+    for r in rows:
+        _emitir(dict(r))
+
+def _export(args, sessao):
+    from ..services import relatorios
+    _emitir({"arquivo": str(relatorios.export_tabela(args.tabela, args.formato, args.compressao, args.nome))})
+
+def _token(args, sessao):
+    _emitir({"token": sessao["token"], "username": sessao["username"], "perfil": sessao["perfil"]})
+
+COMANDOS = {
+    "listar": _listar, "emitir": _emitir_apolices, "cancelar": _cancelar,
+    "registrar-sinistro": _registrar_sinistro, "relatorio": _relatorio, "export": _export,
+    "token": _token,
+}
+
+# -------------------- sessão e despacho --------------------
+
+def _parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m seguradora", description="Operações sem o menu interativo.")
+    ap.add_argument("--usuario", default=os.environ.get("SEGU_USUARIO"), help="login (senha em SEGU_SENHA)")
+    ap.add_argument("--token", default=os.environ.get("SEGU_TOKEN"), help="token de `python -m seguradora token`")
+    sub = ap.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("listar", help="lista uma entidade inteira (JSON Lines ou CSV)")
+    p.add_argument("entidade", choices=ENTIDADES)
+    p.add_argument("--status")
+    p.add_argument("--tipo")
+    p.add_argument("--formato", choices=("jsonl", "csv"), default="jsonl")
+
+    p = sub.add_parser("emitir", help="emite apólices para seguros (em lote)")
+    p.add_argument("seguro_ids", nargs="*")
+
+    p = sub.add_parser("cancelar", help="cancela apólices (em lote)")
+    p.add_argument("numeros", nargs="*")
+
+    p = sub.add_parser("registrar-sinistro", help="registra sinistros")
+    p.add_argument("--apolice")
+    p.add_argument("--descricao", default="")
+    p.add_argument("--data", default="", help="DD/MM/AAAA")
+
+    p = sub.add_parser("relatorio", help="roda um dos relatórios")
+    p.add_argument("nome", choices=RELATORIOS)
+    p.add_argument("--de", help="YYYY-MM (sinistros-periodo)")
+    p.add_argument("--ate", help="YYYY-MM (sinistros-periodo)")
+    p.add_argument("--por", choices=("registro", "ocorrencia"), default="registro")
+    p.add_argument("--limite", type=int, default=5, help="top-clientes")
+    p.add_argument("--workers", type=int, help="top-clientes: processos do cálculo particionado")
+    p.add_argument("--meses", type=int, default=12, help="projecao-premios")
+
+    p = sub.add_parser("export", help="exporta uma tabela inteira para exports/")
+    p.add_argument("tabela")
+    p.add_argument("--formato", choices=("csv", "jsonl", "parquet", "arrow"), default="csv")
+    p.add_argument("--compressao", choices=("gzip", "zstd"))
+    p.add_argument("--nome")
+
+    sub.add_parser("token", help="autentica e imprime um token de sessão")
+
+    p = sub.add_parser("batch", help="executa um arquivo de comandos (um por linha; - = stdin)")
+    p.add_argument("arquivo")
+    return ap
+
+def _sessao(args) -> dict:
+    from ..services import auth
+    if args.token and args.comando != "token":
+        return auth.validar_token(args.token)
+    if not args.usuario:
+        raise AppError("Sem credenciais.", user_message="Informe --token (ou SEGU_TOKEN) ou --usuario (ou SEGU_USUARIO).")
+    senha = os.environ.get("SEGU_SENHA")
+    if senha is None:
+        import getpass
+        senha = getpass.getpass(f"Senha de {args.usuario}: ")
+    token = auth.emitir_token(args.usuario, senha)
+    return {**auth.validar_token(token), "token": token}
+
+def _executar(args, sessao):
+    if args.comando in SO_ADMIN and sessao["perfil"] != "admin":
+        raise OperacaoNaoPermitida()
+    COMANDOS[args.comando](args, sessao)
+
+def _falha_batch(n: int, mensagem: str):
+    """A falha vai no stderr e também no stdout, como resultado da linha."""
+    print(f"linha {n}: {mensagem}", file=sys.stderr)
+    _emitir({"linha": n, "resultado": "erro", "mensagem": mensagem})
+
+def _batch(ap, arquivo: str, sessao) -> int:
+    f = sys.stdin if arquivo == "-" else open(arquivo, encoding="utf-8")
+    falhas = 0
+    try:
+        for n, linha in enumerate(f, start=1):
+            linha = linha.strip()
+            if not linha or linha.startswith("#"):
+                continue
+            try:
+                args = ap.parse_args(shlex.split(linha))
+            except SystemExit:  # argparse já explicou o erro no stderr
+                _falha_batch(n, "uso incorreto")
+                falhas += 1
+                continue
+            except ValueError as e:  # shlex: aspas sem fechar
+                _falha_batch(n, f"linha mal formada ({e})")
+                falhas += 1
+                continue
+            if args.comando in ("batch", "token"):
+                _falha_batch(n, f"'{args.comando}' não é permitido dentro do batch")
+                falhas += 1
+                continue
+            try:
+                _executar(args, sessao)
+            except AppError as e:
+                _falha_batch(n, e.user_message)
+                logger.error(f"batch linha {n} ({args.comando}): {e}")
+                falhas += 1
+            except BrokenPipeError:
+                raise
+            except Exception:  # uma linha com defeito não derruba o resto do arquivo
+                _falha_batch(n, "erro inesperado (detalhes no log)")
+                logger.exception(f"batch linha {n} ({args.comando})")
+                falhas += 1
+            sys.stdout.flush()
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    return 1 if falhas else 0
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        from ..app import main as interativo
+        interativo()
+        return 0
+    ap = _parser()
+    args = ap.parse_args(argv)
+
+    from ..core.logging_conf import setup_logging
+    from ..db import init_schema
+    setup_logging()
+    init_schema()
+    try:
+        sessao = _sessao(args)
+        if args.comando == "batch":
+            return _batch(ap, args.arquivo, sessao)
+        _executar(args, sessao)
+        return 0
+    except AppError as e:
+        print(e.user_message, file=sys.stderr)
+        logger.error(f"comando {args.comando}: {e}")
+        return 1
+    except BrokenPipeError:  # saída fechada antes do fim (ex.: | head)
+        sys.stdout = None
+        return 0
+    except Exception:
+        print("Algo deu errado. Detalhes no log.", file=sys.stderr)
+        logger.exception(f"comando {args.comando}")
+        return 1
+    finally:
+        if "seguradora.dao.auditoria" in sys.modules:
+            sys.modules["seguradora.dao.auditoria"].flush()
@@ -1,12 +1,36 @@
+import logging
 from ..core.exceptions import AppError, OperacaoNaoPermitida
-from ..core.logging_conf import setup_logging
-from ..services import auth, relatorios
+from ..services import auth
 from ..dao import clientes as cli_dao, seguros as se_dao, apolices as ap_dao, sinistros as si_dao
 from ..dao import auditoria as aud
-from .prompts import yesno, ask, buscar_por_cpf, buscar_por_numero_apolice
+from .prompts import yesno, ask, paginar, buscar_por_cpf, buscar_por_numero_apolice, ler_lote
+from collections import Counter
 from datetime import datetime
 
-logger = setup_logging()
+logger = logging.getLogger("seguradora")
+
+LIMITE_BUSCA = 20
+TAMANHO_PAGINA = 20
+
+# formatadores recebem os registros tipados das DAOs (dao/registros.py): acesso por atributo
+def _fmt_cliente(r):
+    return f"{r.nome} | CPF: {r.cpf} | Email: {r.email or '-'} | Tel: {r.telefone or '-'}"
+
+def _fmt_seguro(r):
+    extra = ""
+    if r.tipo == "Automóvel":
+        extra = f"{r.modelo or ''} {r.ano or ''} ({r.placa or ''})"
+    elif r.tipo == "Residencial":
+        extra = r.endereco_imovel or ""
+    elif r.tipo == "Vida":
+        extra = f"Benef: {r.beneficiarios or ''}"
+    return f"#{r.id} {r.tipo} | Titular: {r.titular} | Valor base: R${r.valor_base:.2f} {extra}"
+
+def _fmt_apolice(a):
+    return f"Nº {a.numero} | {a.tipo} | Titular: {a.titular} | Mensal: R${a.valor_mensal:.2f} | {a.status}"
+
+def _fmt_sinistro(s):
+    return f"ID {s.id} | Apólice {s.apolice_numero} | {s.data} | {s.status} | {s.descricao}"
 
 def _audit(usuario, op, entidade, entidade_id, ok, detalhes=None):
     aud.registrar(usuario["username"], op, entidade, entidade_id, ok, detalhes)
@@ -15,7 +39,8 @@ def _guard(perfil_ativo, precisa_admin=False):
     if precisa_admin and perfil_ativo != "admin":
         raise OperacaoNaoPermitida()
 
-def _submenu_relatorios():
+def _submenu_relatorios(perfil: str):
+    from ..services import relatorios  # só quem abre o submenu paga o import
     last = []
     while True:
         print("\n— Relatórios —")
@@ -24,6 +49,9 @@ def _submenu_relatorios():
         print("[3] Sinistros por status")
         print("[4] Sinistros por período (YYYY-MM a YYYY-MM)")
         print("[5] Exportar último resultado (CSV)")
+        print("[6] Sinistros por período da ocorrência (data do sinistro)")
+        if perfil == "admin":  # tabelas inteiras (clientes, auditoria): só admin
+            print("[7] Exportar tabela completa (CSV/JSONL/Parquet/Arrow)")
         print("[0] Voltar")
         sub = input("Escolha: ").strip()
 
@@ -67,6 +95,26 @@ def _submenu_relatorios():
                     caminho = relatorios.export_csv(f"rel_{datetime.now().strftime('%Y%m%d_%H%M%S')}", rows)
                     print(f"Exportado: {caminho}")
 
+            elif sub == "6":
+                ini = input("De (YYYY-MM): ").strip()
+                fim = input("Até (YYYY-MM): ").strip()
+                rows = relatorios.sinistros_por_periodo(ini, fim, por="ocorrencia")
+                last = rows
+                for r in rows:
+                    print(f"{r['ym']}: {r['qtd']} sinistro(s)")
+                if yesno("Exportar agora para CSV?"):
+                    caminho = relatorios.export_csv(f"rel_{datetime.now().strftime('%Y%m%d_%H%M%S')}", rows)
+                    print(f"Exportado: {caminho}")
+
+            elif perfil == "admin" and sub == "7":
+                tabela = ask(f"Tabela ({'/'.join(relatorios.TABELAS_EXPORTAVEIS)}): ")
+                formato = ask("Formato (csv/jsonl/parquet/arrow) [csv]: ", required=False) or "csv"
+                compressao = None
+                if formato in ("csv", "jsonl"):
+                    compressao = ask("Compressão (gzip/zstd) [enter = nenhuma]: ", required=False) or None
+                caminho = relatorios.export_tabela(tabela, formato, compressao)
+                print(f"Exportado: {caminho}")
+
             elif sub == "5":
                 if last:
                     caminho = relatorios.export_csv(f"rel_{datetime.now().strftime('%Y%m%d_%H%M%S')}", last)
@@ -84,12 +132,57 @@ def _submenu_relatorios():
             print("Algo deu errado ao gerar/exportar relatório.")
             logger.exception(f"erro inesperado relatorio: {e}")
 
+def _apolices_lote_flow(usuario):
+    print("\n— Apólices em lote —")
+    print("[1] Emitir (IDs de seguro)   [2] Cancelar (números, ou IDs de apólice no intervalo)")
+    acao = ask("Escolha: ")
+    if acao not in ("1", "2"):
+        print("Opção inválida."); return
+    try:
+        origem, valores = ler_lote(ask("Intervalo de IDs (ex.: 100-250) ou caminho do arquivo (um por linha): "))
+    except OSError as e:
+        print(f"Não foi possível ler o arquivo: {e.strerror}"); return
+
+    invalidos = []
+    if acao == "1":
+        if origem == "intervalo":
+            itens = list(range(valores[0], valores[1] + 1))
+        else:
+            itens = [int(v) for v in valores if v.isdigit()]
+            invalidos = [v for v in valores if not v.isdigit()]
+    else:
+        itens = ap_dao.numeros_por_ids(*valores) if origem == "intervalo" else valores
+    if invalidos:
+        print(f"{len(invalidos)} linha(s) ignorada(s) por não serem IDs: {', '.join(invalidos[:5])}")
+    if not itens:
+        print("Nada a processar."); return
+    verbo = "Emitir" if acao == "1" else "Cancelar"
+    if not yesno(f"{verbo} {len(itens):,} apólice(s)?"):
+        print("Operação abortada."); return
+
+    if acao == "1":
+        res = ap_dao.emitir_apolices(itens)
+        aud.registrar_lote(usuario["username"], "emitir", "apolice",
+                           ((numero or sid, st == ap_dao.EMITIDA, None if numero else st) for sid, st, numero in res))
+        chaves = [(sid, st) for sid, st, _ in res]
+    else:
+        res = ap_dao.cancelar_apolices(itens)
+        aud.registrar_lote(usuario["username"], "cancelar", "apolice",
+                           ((n, st == ap_dao.CANCELADA, None if st == ap_dao.CANCELADA else st) for n, st in res))
+        chaves = res
+    contagem = Counter(st for _, st in chaves)
+    print(" | ".join(f"{st}: {qtd:,}" for st, qtd in contagem.items()))
+    falhas = [str(k) for k, st in chaves if st not in (ap_dao.EMITIDA, ap_dao.CANCELADA)]
+    if falhas:
+        print(f"Sem efeito: {', '.join(falhas[:20])}{' ...' if len(falhas) > 20 else ''}")
+    logger.info(f"apólices em lote acao={verbo.lower()} itens={len(itens)} {dict(contagem)}")
+
 def _listar_usuarios_flow(usuario):
     rows = auth.listar_usuarios()
     print("\n— Usuários —")
     for r in rows:
-        ativo = "Ativo" if r["ativo"] in (1,"1",True) else "Inativo"
-        print(f"{r['username']} | Perfil: {r['perfil']} | {ativo}")
+        ativo = "Ativo" if r.ativo in (1,"1",True) else "Inativo"
+        print(f"{r.username} | Perfil: {r.perfil} | {ativo}")
 
 def _cadastrar_usuario_cliente_flow(usuario):
     print("\n— Cadastrar Usuário (cliente) —")
@@ -149,6 +242,14 @@ def _excluir_usuario_flow(usuario):
         _audit(usuario, "excluir", "usuario", username, False, "erro inesperado")
 
 def loop_principal(sessao):
+    try:
+        _loop_principal(sessao)
+    finally:
+        # auditoria é gravada em lote por uma thread; garante que nada fica na fila
+        # ao sair do menu, inclusive quando ele termina por exceção
+        aud.flush()
+
+def _loop_principal(sessao):
     perfil = sessao["perfil"]
     usuario = {"username": sessao["username"], "perfil": perfil}
 
@@ -160,85 +261,58 @@ def loop_principal(sessao):
             print("[9] Editar Cliente                   [10] Cancelar Apólice                [11] Fechar Sinistro                 [12] Relatórios")
             print("[13] Excluir Cliente                 [14] Cadastrar Usuário (cliente)     [15] Listar Usuários                 [16] Editar Usuário")
             print("[17] Excluir Usuário                 [18] Editar Seguro                    [19] Excluir Seguro                  [20] Editar Apólice")
-            print("[21] Editar Sinistro                 [0] Sair")
+            print("[21] Editar Sinistro                 [22] Apólices em Lote                [0] Sair")
         else:
             print("[12] Relatórios                      [0] Sair")
 
         op = input("Escolha uma opção: ").strip()
 
-        # atalhos de busca rápida
+        # atalhos de busca rápida (consultas indexadas, limitadas a LIMITE_BUSCA resultados)
         ol = op.lower()
         if ol.startswith("cpf:"):
-            chave = op[4:].strip()
-            rows = cli_dao.listar()
-            achou = False
+            rows = cli_dao.buscar_por_cpf(op[4:].strip(), limite=LIMITE_BUSCA)
             for r in rows:
-                if chave in r["cpf"]:
-                    print(f"{r['nome']} | CPF: {r['cpf']} | Email: {r['email'] or '-'} | Tel: {r['telefone'] or '-'}")
-                    achou = True
-            if not achou:
+                print(_fmt_cliente(r))
+            if not rows:
                 print("Nenhum cliente encontrado para esse CPF.")
             continue
 
         if ol.startswith("apolice:") or ol.startswith("apólice:"):
-            chave = op.split(":",1)[1].strip()
-            rows = ap_dao.listar()
-            achou = False
+            rows = ap_dao.buscar_por_numero(op.split(":",1)[1].strip(), limite=LIMITE_BUSCA)
             for a in rows:
-                if chave in a["numero"]:
-                    print(f"Nº {a['numero']} | {a['tipo']} | Titular: {a['titular']} | Mensal: R${a['valor_mensal']:.2f} | {a['status']}")
-                    achou = True
-            if not achou:
+                print(_fmt_apolice(a))
+            if not rows:
                 print("Nenhuma apólice encontrada para esse número.")
             continue
 
         if ol.startswith("nome:"):
-            chave = op[5:].strip().lower()
-            rows = cli_dao.listar()
-            achou = False
+            rows = cli_dao.buscar_por_nome(op[5:].strip(), limite=LIMITE_BUSCA)
             for r in rows:
-                if chave in r["nome"].lower():
-                    print(f"{r['nome']} | CPF: {r['cpf']} | Email: {r['email'] or '-'} | Tel: {r['telefone'] or '-'}")
-                    achou = True
-            if not achou:
+                print(_fmt_cliente(r))
+            if not rows:
                 print("Nenhum cliente encontrado para esse nome.")
             continue
 
         try:
             # VISÃO COMUM (consultas/relatórios)
             if op == "1":
-                rows = cli_dao.listar()
                 print("\n— Clientes —")
-                for r in rows:
-                    print(f"{r['nome']} | CPF: {r['cpf']} | Email: {r['email'] or '-'} | Tel: {r['telefone'] or '-'}")
+                paginar(cli_dao.listar_pagina, _fmt_cliente, TAMANHO_PAGINA)
 
             elif op == "2":
-                rows = se_dao.listar()
                 print("\n— Seguros —")
-                for r in rows:
-                    extra = ""
-                    if r["tipo"] == "Automóvel":
-                        extra = f"{r['modelo'] or ''} {r['ano'] or ''} ({r['placa'] or ''})"
-                    elif r["tipo"] == "Residencial":
-                        extra = r["endereco_imovel"] or ""
-                    elif r["tipo"] == "Vida":
-                        extra = f"Benef: {r['beneficiarios'] or ''}"
-                    print(f"#{r['id']} {r['tipo']} | Titular: {r['titular']} | Valor base: R${r['valor_base']:.2f} {extra}")
+                paginar(se_dao.listar_pagina, _fmt_seguro, TAMANHO_PAGINA)
 
             elif op == "3":
-                rows = ap_dao.listar()
                 print("\n— Apólices —")
-                for a in rows:
-                    print(f"Nº {a['numero']} | {a['tipo']} | Titular: {a['titular']} | Mensal: R${a['valor_mensal']:.2f} | {a['status']}")
+                paginar(ap_dao.listar_pagina, _fmt_apolice, TAMANHO_PAGINA)
 
             elif op == "4":
-                rows = si_dao.listar()
                 print("\n— Sinistros —")
-                for s in rows:
-                    print(f"ID {s['id']} | Apólice {s['apolice_numero']} | {s['data']} | {s['status']} | {s['descricao']}")
+                paginar(si_dao.listar_pagina, _fmt_sinistro, TAMANHO_PAGINA)
 
             elif op == "12":
-                _submenu_relatorios()
+                _submenu_relatorios(perfil)
 
             elif op == "0":
                 print("Encerrando...")
@@ -429,6 +503,9 @@ def loop_principal(sessao):
                 except AppError as e:
                     print(e.user_message); _audit(usuario, "editar", "sinistro", sid, False, e.user_message)
 
+            elif perfil == "admin" and op == "22":
+                _apolices_lote_flow(usuario)
+
             else:
                 print("Opção inválida.")
 
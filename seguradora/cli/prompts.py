@@ -11,9 +11,47 @@ def ask(msg: str, required: bool = True) -> str:
             return x
         print("Campo obrigatório.")
 
+def paginar(buscar_pagina, formatar, tamanho: int = 20, **filtros):
+    """
+    Mostra um resultado paginado por keyset: `buscar_pagina(cursor=, limite=, **filtros)`
+    deve retornar (rows, proximo_cursor).
+    """
+    cursor, total = None, 0
+    while True:
+        rows, cursor = buscar_pagina(cursor=cursor, limite=tamanho, **filtros)
+        for r in rows:
+            print(formatar(r))
+        total += len(rows)
+        if cursor is None:
+            if not total:
+                print("Nenhum registro.")
+            return total
+        if input("[Enter] próxima página | [q] parar: ").strip().lower() in ("q", "0"):
+            return total
+
 def buscar_por_cpf() -> str:
     cpf = input("CPF (somente números ou formatado): ").strip()
     return limpar_cpf(cpf)
 
 def buscar_por_numero_apolice() -> str:
     return input("Número da apólice: ").strip()
+
+def ler_lote(entrada: str):
+    """
+    Interpreta a origem de uma operação em lote: um intervalo "ini-fim" de IDs ou o
+    caminho de um arquivo com um valor por linha (CSV: primeira coluna; linhas vazias,
+    começadas por # e o cabeçalho seguro_id/numero são ignorados).
+    Retorna ("intervalo", (ini, fim)) ou ("arquivo", [valores]).
+    """
+    partes = entrada.replace(" ", "").split("-")
+    if len(partes) == 2 and all(p.isdigit() for p in partes):
+        ini, fim = sorted(map(int, partes))
+        return "intervalo", (ini, fim)
+    valores = []
+    with open(entrada, encoding="utf-8-sig") as f:
+        for i, linha in enumerate(f):
+            v = linha.split(",", 1)[0].strip().strip('"')
+            if not v or v.startswith("#") or (i == 0 and v.lower() in ("seguro_id", "numero")):
+                continue
+            valores.append(v)
+    return "arquivo", valores
@@ -0,0 +1,104 @@
+"""
+Cache em processo (LRU + TTL) para leituras avulsas por chave: apólice por número,
+cliente por CPF, usuário por username, seguro por id. Quem lê por ele: as rotas GET da
+API (/apolices/N, /seguros/ID, /clientes/CPF), seguradora.aio e as checagens de
+existência de usuário/cliente das operações administrativas do auth. Emissão,
+cancelamento, sinistros, login e validação de token leem direto do banco, dentro da
+transação ou sem cache de propósito, e não passam por aqui. Read-through: obter(chave, carregar)
+devolve o valor em cache ou chama carregar(chave) e guarda o resultado (inclusive None,
+para "não existe" também não ir ao banco). As funções de escrita das DAOs invalidam as
+chaves que alteram, depois do commit; escritas de outro processo valem após o TTL.
+
+    SEGU_CACHE=0          desliga (obter() sempre carrega), para comparar throughput
+    SEGU_CACHE_TTL_S      validade de cada entrada (padrão 30)
+    SEGU_CACHE_MAX        entradas por cache antes de despejar a menos usada (padrão 4096)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+ATIVO = os.environ.get("SEGU_CACHE", "1") not in ("0", "false", "False")
+TTL_S = float(os.environ.get("SEGU_CACHE_TTL_S", "30"))
+MAX_ITENS = int(os.environ.get("SEGU_CACHE_MAX", "4096"))
+
+_caches: dict = {}
+
+class Cache:
+    def __init__(self, nome: str, max_itens: int = MAX_ITENS, ttl_s: float = TTL_S, negativo: bool = True):
+        self.nome = nome
+        self.negativo = negativo  # False: None (não existe) não fica em cache
+        self.max_itens = max_itens
+        self.ttl_s = ttl_s
+        self._itens = OrderedDict()  # chave -> (expira_em, valor)
+        self._lock = threading.Lock()
+        self._geracao = 0  # muda a cada invalidação: carga que cruzou uma escrita não é guardada
+        self.hits = 0
+        self.misses = 0
+        self.expirados = 0
+        self.despejados = 0
+
+    def obter(self, chave, carregar):
+        if not ATIVO or self.ttl_s <= 0:
+            return carregar(chave)
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                if item[0] > agora:
+                    self._itens.move_to_end(chave)
+                    self.hits += 1
+                    return item[1]
+                del self._itens[chave]
+                self.expirados += 1
+            self.misses += 1
+            geracao = self._geracao
+        valor = carregar(chave)
+        if valor is None and not self.negativo:
+            return None
+        with self._lock:
+            if geracao != self._geracao:
+                return valor
+            self._itens[chave] = (agora + self.ttl_s, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self.despejados += 1
+        return valor
+
+    def invalidar(self, *chaves):
+        """Remove as chaves informadas; sem argumentos, esvazia o cache."""
+        with self._lock:
+            self._geracao += 1
+            if not chaves:
+                self._itens.clear()
+            for chave in chaves:
+                self._itens.pop(chave, None)
+
+    def stats(self) -> dict:
+        consultas = self.hits + self.misses
+        return {
+            "itens": len(self._itens), "hits": self.hits, "misses": self.misses,
+            "hit_rate": round(self.hits / consultas, 4) if consultas else 0.0,
+            "expirados": self.expirados, "despejados": self.despejados,
+        }
+
+def cache(nome: str, **kw) -> Cache:
+    """Cache nomeado do processo (criado no primeiro uso)."""
+    c = _caches.get(nome)
+    if c is None:
+        c = _caches.setdefault(nome, Cache(nome, **kw))
+    return c
+
+def configurar(ativo: bool):
+    global ATIVO
+    ATIVO = ativo
+    if not ativo:
+        limpar()
+
+def limpar():
+    for c in _caches.values():
+        c.invalidar()
+
+def stats() -> dict:
+    return {nome: c.stats() for nome, c in _caches.items()}
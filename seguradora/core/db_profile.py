@@ -0,0 +1,70 @@
+# seguradora/core/db_profile.py
+"""
+Perfis de desempenho do SQLite.
+
+O perfil é escolhido por SEGU_DB_PROFILE ou por um arquivo JSON
+(SEGU_DB_CONFIG, padrão ./seguradora_db.json), por exemplo:
+
+    {"profile": "concorrente", "cache_size": -131072, "retry_tentativas": 10}
+
+Chaves além de "profile" sobrescrevem os valores do perfil base.
+"""
+import os
+from pathlib import Path
+
+PROFILES = {
+    # comportamento original do SQLite (rollback journal), só com busy_timeout
+    "padrao": {
+        "busy_timeout": 5000,
+        "retry_tentativas": 3,
+        "retry_backoff_ms": 50,
+    },
+    # vários operadores no mesmo arquivo: leitores não bloqueiam o escritor
+    "concorrente": {
+        "journal_mode": "WAL",
+        "busy_timeout": 5000,
+        "synchronous": "NORMAL",   # seguro em WAL; fsync só no checkpoint
+        "cache_size": -65536,      # negativo = KiB (64 MiB)
+        "mmap_size": 268435456,    # 256 MiB
+        "temp_store": "MEMORY",
+        "retry_tentativas": 6,
+        "retry_backoff_ms": 25,
+    },
+    # cargas em lote de uma única sessão; troca durabilidade por vazão
+    "bulk": {
+        "journal_mode": "WAL",
+        "busy_timeout": 30000,
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "mmap_size": 1073741824,
+        "temp_store": "MEMORY",
+        "retry_tentativas": 10,
+        "retry_backoff_ms": 50,
+    },
+}
+
+PADRAO = "concorrente"
+CONFIG_FILE = os.environ.get("SEGU_DB_CONFIG", "seguradora_db.json")
+
+# ordem importa: journal_mode antes de synchronous
+_PRAGMAS = ("journal_mode", "busy_timeout", "synchronous", "cache_size", "mmap_size", "temp_store")
+
+def carregar_profile() -> dict:
+    cfg = {}
+    path = Path(CONFIG_FILE)
+    if path.is_file():
+        import json
+        cfg = json.loads(path.read_text(encoding="utf-8"))
+    do_arquivo = cfg.pop("profile", None)
+    nome = os.environ.get("SEGU_DB_PROFILE") or do_arquivo or PADRAO
+    if nome not in PROFILES:
+        raise ValueError(f"Perfil de banco desconhecido: {nome} (use {', '.join(PROFILES)})")
+    profile = dict(PROFILES[nome], **cfg)
+    profile["nome"] = nome
+    return profile
+
+def aplicar_pragmas(conn, profile: dict):
+    for k in _PRAGMAS:
+        v = profile.get(k)
+        if v is not None:
+            conn.execute(f"PRAGMA {k}={v}").fetchall()
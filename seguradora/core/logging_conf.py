@@ -1,11 +1,118 @@
+"""
+Logging sem I/O na thread chamadora: o logger "seguradora" só tem um QueueHandler que
+enfileira numa fila limitada; uma QueueListener em thread própria escreve no console e
+no arquivo rotativo. Fila cheia = registro descartado e contado, nunca bloqueio.
+
+Variáveis de ambiente:
+    SEGU_LOG_FILA      tamanho máximo da fila (padrão 10000)
+    SEGU_LOG_JSON=1    arquivo em JSON, um objeto por linha (console segue em texto)
+    SEGU_LOG_RAJADA    WARNING+ repetidos do mesmo ponto do código aceitos por janela (padrão 10)
+    SEGU_LOG_JANELA_S  tamanho da janela em segundos (padrão 60)
+
+A listener é parada (e a fila drenada) no atexit; parar_logging() faz o mesmo sob demanda.
+"""
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from queue import Queue, Full
 
-LOG_DIR = Path("logs"); LOG_DIR.mkdir(exist_ok=True)
+LOG_DIR = Path("logs")
 LOG_FILE = LOG_DIR / "app.log"
 
+FILA_MAX = int(os.environ.get("SEGU_LOG_FILA", "10000"))
+JSON = os.environ.get("SEGU_LOG_JSON", "0") not in ("0", "false", "False", "")
+RAJADA = int(os.environ.get("SEGU_LOG_RAJADA", "10"))
+JANELA_S = float(os.environ.get("SEGU_LOG_JANELA_S", "60"))
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        d = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            d["exc"] = record.exc_text
+        return json.dumps(d, ensure_ascii=False)
+
+class LimiteRepeticao(logging.Filter):
+    """
+    Deixa passar no máximo `rajada` registros WARNING+ por ponto do código (arquivo:linha)
+    a cada `janela_s`; o resto é suprimido e o primeiro registro aceito depois informa
+    quantos foram. Segura uma enxurrada de logger.exception num laço sem calar o INFO.
+    """
+    def __init__(self, rajada: int = RAJADA, janela_s: float = JANELA_S):
+        super().__init__()
+        self.rajada = rajada
+        self.janela_s = janela_s
+        self.suprimidos = 0
+        self._janelas = {}  # (arquivo, linha) -> [inicio, aceitos, suprimidos]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING or self.rajada <= 0:
+            return True
+        chave = (record.pathname, record.lineno)
+        agora = time.monotonic()
+        with self._lock:
+            j = self._janelas.get(chave)
+            if j is None or agora - j[0] >= self.janela_s:
+                pendentes = j[2] if j else 0
+                self._janelas[chave] = [agora, 1, 0]
+            elif j[1] < self.rajada:
+                j[1] += 1
+                pendentes = 0
+            else:
+                j[2] += 1
+                self.suprimidos += 1
+                return False
+        if pendentes:
+            record.msg = f"{record.msg} (+{pendentes} suprimidos nos últimos {self.janela_s:.0f}s)"
+        return True
+
+class _FilaHandler(QueueHandler):
+    """QueueHandler que nunca bloqueia: com a fila cheia, descarta e conta."""
+    def __init__(self, fila):
+        super().__init__(fila)
+        self.descartados = 0
+
+    def prepare(self, record):
+        # só o necessário para atravessar a thread: mensagem interpolada e traceback em
+        # texto (exc_text, que os formatters usam); a formatação fica com a listener
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.descartados += 1
+
+class _Ouvinte(QueueListener):
+    def enqueue_sentinel(self):
+        # bloqueante: com a fila cheia, espera a thread drenar em vez de perder o stop
+        self.queue.put(self._sentinel)
+
+_handler = None
+_ouvinte = None
+_filtro = None
+
 def setup_logging():
+    global _handler, _ouvinte, _filtro
     logger = logging.getLogger("seguradora")
     if logger.handlers:
         return logger
@@ -17,10 +124,32 @@ def setup_logging():
     ch.setLevel(logging.INFO)
     ch.setFormatter(fmt)
 
+    LOG_DIR.mkdir(exist_ok=True)
     fh = RotatingFileHandler(LOG_FILE, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
     fh.setLevel(logging.INFO)
-    fh.setFormatter(fmt)
+    fh.setFormatter(JsonFormatter() if JSON else fmt)
 
-    logger.addHandler(ch)
-    logger.addHandler(fh)
+    fila = Queue(maxsize=FILA_MAX)
+    _filtro = LimiteRepeticao()
+    _handler = _FilaHandler(fila)
+    _handler.addFilter(_filtro)
+    _ouvinte = _Ouvinte(fila, ch, fh, respect_handler_level=True)
+    _ouvinte.start()
+    atexit.register(parar_logging)
+
+    logger.addHandler(_handler)
     return logger
+
+def parar_logging():
+    """Drena a fila e para a thread de escrita (idempotente)."""
+    global _ouvinte
+    if _ouvinte is not None:
+        ouvinte, _ouvinte = _ouvinte, None
+        ouvinte.stop()
+
+def stats() -> dict:
+    return {
+        "fila": _handler.queue.qsize() if _handler else 0,
+        "descartados": _handler.descartados if _handler else 0,
+        "suprimidos": _filtro.suprimidos if _filtro else 0,
+    }
@@ -1,23 +1,50 @@
-from datetime import datetime
+import operator
+import re
+from datetime import date, datetime
+
+_RE_DATA = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
 
 def validar_data_ddmmaa(s: str) -> bool:
+    """D/M/AAAA com dia e mês de 1 ou 2 dígitos e ano de 4 (data_iso depende disso)."""
+    m = _RE_DATA.fullmatch(s or "")
+    if not m:
+        return False
     try:
-        datetime.strptime(s, "%d/%m/%Y")
+        date(int(m[3]), int(m[2]), int(m[1]))
         return True
     except ValueError:
         return False
 
+def normalizar_data_ddmmaa(s: str) -> str:
+    """'1/2/2024' -> '01/02/2024' (formato gravado no banco; base de sinistros.data_iso)."""
+    return datetime.strptime(s, "%d/%m/%Y").strftime("%d/%m/%Y")
+
+def ym_valido(ym: str) -> bool:
+    try:
+        datetime.strptime(ym, "%Y-%m")
+        return len(ym) == 7
+    except ValueError:
+        return False
+
 def limpar_cpf(cpf: str) -> str:
-    return "".join(ch for ch in cpf if ch.isdigit())
+    return "".join(ch for ch in cpf if "0" <= ch <= "9")
+
+_PESOS1 = tuple(range(10, 1, -1))
+_PESOS2 = tuple(range(11, 1, -1))
 
 def validar_cpf(cpf: str) -> bool:
-    cpf = limpar_cpf(cpf)
-    if len(cpf) != 11 or cpf == cpf[0]*11:
-        return False
-    soma1 = sum(int(cpf[i])*(10-i) for i in range(9))
-    d1 = (soma1*10 % 11) % 10
-    if d1 != int(cpf[9]):
+    d = [ord(ch) - 48 for ch in (cpf or "") if "0" <= ch <= "9"]
+    if len(d) != 11 or d.count(d[0]) == 11:
         return False
-    soma2 = sum(int(cpf[i])*(11-i) for i in range(10))
-    d2 = (soma2*10 % 11) % 10
-    return d2 == int(cpf[10])
+    d1 = (sum(map(operator.mul, d, _PESOS1)) * 10 % 11) % 10
+    d2 = (sum(map(operator.mul, d, _PESOS2)) * 10 % 11) % 10
+    return d1 == d[9] and d2 == d[10]
+
+# -------------------- versões em lote (importação) --------------------
+# As mesmas funções aplicadas a um lote: devolvem uma lista de bool alinhada com a entrada.
+
+def validar_datas_ddmmaa(datas) -> list[bool]:
+    return list(map(validar_data_ddmmaa, datas))
+
+def validar_cpfs(cpfs) -> list[bool]:
+    return list(map(validar_cpf, cpfs))
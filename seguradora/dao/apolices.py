@@ -1,34 +1,107 @@
-from ..db import get_conn
+from ..db import get_conn, com_retry, intervalo_prefixo
+from ..core import cache
 from ..core.exceptions import AppError
+from . import numeracao, paginacao
+from .seguros import CLIENTE_POR_NOME
+from .registros import Apolice, consultar, um
+
+COLUNAS_LISTA = Apolice.COLUNAS
+
+_cache = cache.cache("apolice")  # numero -> Apolice | None
+
+# resultado por item de emitir_apolices / cancelar_apolices
+EMITIDA = "emitida"
+CANCELADA = "cancelada"
+JA_CANCELADA = "ja_cancelada"
+NAO_ENCONTRADA = "nao_encontrada"
+NUMERO_INVALIDO = "numero_invalido"  # dígito verificador não confere: nem chega ao banco
+
+_MAX_PARAMS = 900  # abaixo do limite de variáveis por statement de SQLites antigos
+
+def _em_partes(valores: list):
+    for i in range(0, len(valores), _MAX_PARAMS):
+        parte = valores[i:i + _MAX_PARAMS]
+        yield parte, ",".join("?" * len(parte))
+
+def calcular_valor_mensal(valor_base) -> float:
+    return round(float(valor_base) * 0.03, 2)  # exemplo
+
+def _carregar(numero: str):
+    with get_conn() as conn:
+        return um(conn, Apolice, f"SELECT {Apolice.COLUNAS} FROM apolices WHERE numero=?", (numero,))
+
+def obter(numero: str):
+    """Apólice por número, ou None; via cache (core/cache.py): consultas avulsas (API, aio)."""
+    numero = numeracao.normalizar(numero)
+    if not numeracao.numero_aceito(numero):
+        return None
+    return _cache.obter(numero, _carregar)
 
 def listar():
     with get_conn() as conn:
-        return conn.execute("SELECT * FROM apolices ORDER BY id DESC").fetchall()
+        return consultar(conn, Apolice, f"SELECT {Apolice.COLUNAS} FROM apolices ORDER BY id DESC")
+
+def listar_pagina(cursor=None, limite: int = 50, status: str | None = None,
+                  tipo: str | None = None, titular: str | None = None):
+    """Página de apólices da mais recente à mais antiga; cursor = id da última linha."""
+    filtros = {"status": status, "tipo": tipo, "titular": titular}
+    return paginacao.pagina("apolices", Apolice, ("id",), True, filtros, cursor, limite)
+
+def iterar(status: str | None = None, tipo: str | None = None, titular: str | None = None, lote: int = 500):
+    return paginacao.iterar(listar_pagina, lote, status=status, tipo=tipo, titular=titular)
 
+def buscar_por_numero(prefixo: str, limite: int = 20):
+    """Apólices cujo número começa com `prefixo` (usa o índice UNIQUE de numero)."""
+    prefixo = prefixo.strip().upper()
+    if not prefixo:
+        return []
+    if not prefixo.startswith("AP"):
+        prefixo = f"AP-{prefixo}"
+    ini, fim = intervalo_prefixo(prefixo)
+    with get_conn() as conn:
+        return consultar(
+            conn, Apolice,
+            f"SELECT {Apolice.COLUNAS} FROM apolices WHERE numero >= ? AND numero < ? ORDER BY numero LIMIT ?",
+            (ini, fim, limite)
+        )
+
+@com_retry
 def emitir_apolice(seguro_id:int) -> str | None:
+    # seguro lido na transação do INSERT, não no cache: a cópia de titular/valor_base
+    # precisa ser a do momento da emissão
     with get_conn() as conn:
-        seg = conn.execute("SELECT * FROM seguros WHERE id=?", (seguro_id,)).fetchone()
+        conn.execute("BEGIN IMMEDIATE")
+        seg = conn.execute(
+            "SELECT id, tipo, titular, valor_base, cliente_id FROM seguros WHERE id=?", (seguro_id,)
+        ).fetchone()
         if not seg:
             return None
-        import time
-        numero = f"AP-{seguro_id}-{int(time.time()*1000)}"
-        valor_mensal = round(float(seg["valor_base"]) * 0.03, 2)  # exemplo
+        numero = numeracao.numeros_apolice(conn, (seg["id"],))[0]
         conn.execute(
-            "INSERT INTO apolices (numero,seguro_id,tipo,titular,valor_mensal,status) VALUES (?,?,?,?,?,?)",
-            (numero, seg["id"], seg["tipo"], seg["titular"], valor_mensal, "Ativa")
+            "INSERT INTO apolices (numero,seguro_id,tipo,titular,valor_mensal,status,cliente_id) "
+            "VALUES (?,?,?,?,?,?,?)",
+            (numero, seg["id"], seg["tipo"], seg["titular"], calcular_valor_mensal(seg["valor_base"]),
+             "Ativa", seg["cliente_id"])
         )
-        return numero
+    _cache.invalidar(numero)
+    return numero
 
+@com_retry
 def cancelar(numero:str) -> bool:
+    numero = numeracao.normalizar(numero)
+    numeracao.conferir(numero)
+    # status conferido no próprio UPDATE (o cache de obter() pode estar atrasado)
     with get_conn() as conn:
-        ap = conn.execute("SELECT status FROM apolices WHERE numero=?", (numero,)).fetchone()
-        if not ap:
+        cur = conn.execute("UPDATE apolices SET status='Cancelada' WHERE numero=? AND status='Ativa'", (numero,))
+        if cur.rowcount == 0:
+            if conn.execute("SELECT 1 FROM apolices WHERE numero=?", (numero,)).fetchone():
+                _cache.invalidar(numero)
+                raise AppError("Apólice já cancelada.", user_message="Esta apólice já está cancelada.")
             return False
-        if ap["status"] == "Cancelada":
-            raise AppError("Apólice já cancelada.", user_message="Esta apólice já está cancelada.")
-        cur = conn.execute("UPDATE apolices SET status='Cancelada' WHERE numero=?", (numero,))
-        return cur.rowcount > 0
+    _cache.invalidar(numero)
+    return True
 
+@com_retry
 def editar(numero:str, **campos) -> bool:
     sets, params = [], []
     for k in ("valor_mensal","titular"):
@@ -36,7 +109,89 @@ def editar(numero:str, **campos) -> bool:
             sets.append(f"{k}=?"); params.append(campos[k])
     if not sets:
         return False
+    if campos.get("titular") is not None:
+        sets.append(f"cliente_id={CLIENTE_POR_NOME}"); params.append(campos["titular"])
     params.append(numero)
     with get_conn() as conn:
         cur = conn.execute(f"UPDATE apolices SET {', '.join(sets)} WHERE numero=?", params)
-        return cur.rowcount > 0
+    _cache.invalidar(numero)
+    return cur.rowcount > 0
+
+# -------------------- lotes --------------------
+
+@com_retry
+def emitir_apolices(seguro_ids) -> list[tuple]:
+    """
+    Uma apólice para cada id de `seguro_ids` (repetidos emitem de novo), numa única
+    transação: seguros lidos com IN por partes, uma reserva de numeração, um
+    executemany. Devolve, na ordem da entrada, (seguro_id, EMITIDA, numero) ou
+    (seguro_id, NAO_ENCONTRADA, None).
+    """
+    seguro_ids = [int(s) for s in seguro_ids]
+    resultados, linhas = [], []
+    with get_conn() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        segs = {}
+        for parte, marcas in _em_partes(list(set(seguro_ids))):
+            for s in conn.execute(
+                f"SELECT id, tipo, titular, valor_base, cliente_id FROM seguros WHERE id IN ({marcas})", parte
+            ):
+                segs[s[0]] = s
+        numeros = iter(numeracao.numeros_apolice(conn, [sid for sid in seguro_ids if sid in segs]))
+        for sid in seguro_ids:
+            seg = segs.get(sid)
+            if seg is None:
+                resultados.append((sid, NAO_ENCONTRADA, None))
+                continue
+            numero = next(numeros)
+            linhas.append((numero, sid, seg[1], seg[2], calcular_valor_mensal(seg[3]), "Ativa", seg[4]))
+            resultados.append((sid, EMITIDA, numero))
+        conn.executemany(
+            "INSERT INTO apolices (numero,seguro_id,tipo,titular,valor_mensal,status,cliente_id) "
+            "VALUES (?,?,?,?,?,?,?)", linhas)
+    if linhas:
+        _cache.invalidar(*(l[0] for l in linhas))
+    return resultados
+
+@com_retry
+def cancelar_apolices(numeros) -> list[tuple]:
+    """
+    Cancela as apólices de `numeros` numa única transação (UPDATE ... WHERE numero IN
+    por partes). Devolve, na ordem da entrada, (numero, CANCELADA | JA_CANCELADA |
+    NAO_ENCONTRADA | NUMERO_INVALIDO); um número repetido na entrada conta como JA_CANCELADA.
+    """
+    numeros = [numeracao.normalizar(n) for n in numeros]
+    invalidos = {n for n in numeros if not numeracao.numero_aceito(n)}
+    status = {}
+    with get_conn() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for parte, marcas in _em_partes(list(set(numeros) - invalidos)):
+            for n, st in conn.execute(f"SELECT numero, status FROM apolices WHERE numero IN ({marcas})", parte):
+                status[n] = st
+        ativas = [n for n, st in status.items() if st != "Cancelada"]
+        for parte, marcas in _em_partes(ativas):
+            conn.execute(f"UPDATE apolices SET status='Cancelada' WHERE numero IN ({marcas})", parte)
+    if ativas:
+        _cache.invalidar(*ativas)
+    resultados, feitas = [], set()
+    for n in numeros:
+        if n in invalidos:
+            resultados.append((n, NUMERO_INVALIDO))
+        elif n not in status:
+            resultados.append((n, NAO_ENCONTRADA))
+        elif status[n] == "Cancelada" or n in feitas:
+            resultados.append((n, JA_CANCELADA))
+        else:
+            feitas.add(n)
+            resultados.append((n, CANCELADA))
+    return resultados
+
+def numeros_por_ids(id_ini: int, id_fim: int, status: str | None = "Ativa") -> list[str]:
+    """Números das apólices com id em [id_ini, id_fim] (faixa da PK), para cancelamento por intervalo."""
+    sql = "SELECT numero FROM apolices WHERE id BETWEEN ? AND ?"
+    params = [id_ini, id_fim]
+    if status:
+        sql += " AND status=?"
+        params.append(status)
+    with get_conn() as conn:
+        return [r[0] for r in conn.execute(sql + " ORDER BY id", params)]
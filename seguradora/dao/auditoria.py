@@ -1,10 +1,150 @@
-from ..db import get_conn
+import atexit
+import logging
+import os
+import threading
+import time
+from queue import Queue, Empty, Full
+from ..db import get_conn, com_retry
 
-def registrar(username: str, operacao: str, entidade: str, entidade_id, ok: bool, detalhes: str | None):
+logger = logging.getLogger("seguradora")
+
+# SEGU_AUDIT_ASYNC=0 volta a gravar cada registro na hora (uma transação por linha)
+ASYNC = os.environ.get("SEGU_AUDIT_ASYNC", "1") not in ("0", "false", "False")
+FILA_MAX = int(os.environ.get("SEGU_AUDIT_FILA", "10000"))
+LOTE = int(os.environ.get("SEGU_AUDIT_LOTE", "200"))
+INTERVALO_S = float(os.environ.get("SEGU_AUDIT_INTERVALO_S", "1.0"))
+
+_SQL = ("INSERT INTO auditoria (ts, username, operacao, entidade, entidade_id, ok, detalhes) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+def _linha(username, operacao, entidade, entidade_id, ok, detalhes):
+    # ts capturado no momento do evento (UTC, como CURRENT_TIMESTAMP), não na gravação do lote
+    return (time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()), username, operacao, entidade,
+            str(entidade_id) if entidade_id is not None else None, 1 if ok else 0, detalhes)
+
+@com_retry
+def _gravar(linhas):
     with get_conn() as conn:
-        conn.execute(
-            "INSERT INTO auditoria (username, operacao, entidade, entidade_id, ok, detalhes) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (username, operacao, entidade, str(entidade_id) if entidade_id is not None else None,
-             1 if ok else 0, detalhes)
-        )
+        conn.executemany(_SQL, linhas)
+
+class AuditSink:
+    """
+    Fila limitada + thread escritora: registrar() só enfileira; a thread grava em
+    lotes (executemany, uma transação) quando a fila chega a `lote` itens ou a cada
+    `intervalo_s`. Com a fila cheia o registro é descartado e contado.
+    """
+    def __init__(self, fila_max: int = FILA_MAX, lote: int = LOTE, intervalo_s: float = INTERVALO_S):
+        self.lote = max(1, lote)
+        self.intervalo_s = intervalo_s
+        self._fila = Queue(maxsize=fila_max)
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._cond = threading.Condition()
+        self._pendentes = 0
+        self._thread = None
+        self.gravados = 0
+        self.descartados = 0
+        self.falhas = 0
+        self.lotes = 0
+
+    def registrar(self, linha: tuple):
+        self._iniciar()
+        with self._cond:
+            try:
+                self._fila.put_nowait(linha)
+            except Full:
+                self.descartados += 1
+                return
+            self._pendentes += 1
+        if self._fila.qsize() >= self.lote:
+            self._acordar.set()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Bloqueia até tudo o que foi enfileirado estar gravado (ou estourar o timeout)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._drenar()
+            return self._pendentes == 0
+        self._acordar.set()
+        fim = time.monotonic() + timeout
+        with self._cond:
+            while self._pendentes:
+                restante = fim - time.monotonic()
+                if restante <= 0:
+                    return False
+                self._cond.wait(restante)
+        return True
+
+    def fechar(self, timeout: float = 5.0):
+        self._parar.set()
+        self._acordar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._drenar()
+
+    def stats(self) -> dict:
+        return {
+            "fila": self._fila.qsize(), "pendentes": self._pendentes, "gravados": self.gravados,
+            "descartados": self.descartados, "falhas": self.falhas, "lotes": self.lotes,
+        }
+
+    def _iniciar(self):
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="audit-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.fechar)
+
+    def _loop(self):
+        while not self._parar.is_set():
+            self._acordar.wait(self.intervalo_s)
+            self._acordar.clear()
+            self._drenar()
+
+    def _drenar(self):
+        while True:
+            linhas = []
+            try:
+                while len(linhas) < self.lote:
+                    linhas.append(self._fila.get_nowait())
+            except Empty:
+                pass
+            if not linhas:
+                return
+            try:
+                _gravar(linhas)
+                self.gravados += len(linhas)
+                self.lotes += 1
+            except Exception:
+                self.falhas += len(linhas)
+                logger.exception(f"falha ao gravar {len(linhas)} registro(s) de auditoria")
+            with self._cond:
+                self._pendentes -= len(linhas)
+                self._cond.notify_all()
+
+_sink = AuditSink()
+
+def registrar(username: str, operacao: str, entidade: str, entidade_id, ok: bool, detalhes: str | None):
+    linha = _linha(username, operacao, entidade, entidade_id, ok, detalhes)
+    if ASYNC:
+        _sink.registrar(linha)
+    else:
+        _gravar([linha])
+
+def registrar_lote(username: str, operacao: str, entidade: str, itens):
+    """
+    Auditoria de uma operação em lote: `itens` são (entidade_id, ok, detalhes).
+    Grava na hora, num executemany por transação, em vez de passar pela fila do
+    sink (que é limitada e descartaria parte de um lote grande).
+    """
+    linhas = [_linha(username, operacao, entidade, eid, ok, det) for eid, ok, det in itens]
+    for i in range(0, len(linhas), 10_000):
+        _gravar(linhas[i:i + 10_000])
+    return len(linhas)
+
+def flush(timeout: float = 5.0) -> bool:
+    return _sink.flush(timeout)
+
+def stats() -> dict:
+    return _sink.stats()
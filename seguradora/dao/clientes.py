@@ -1,11 +1,75 @@
-from ..db import get_conn
+import re
+import sqlite3
+from ..db import get_conn, com_retry, intervalo_prefixo
 from ..core.exceptions import AppError, CpfInvalido
-from ..core import validators as val
+from ..core import cache, validators as val
+from . import paginacao
+from .registros import Cliente, consultar
+
+COLUNAS_LISTA = Cliente.COLUNAS
+
+_cache = cache.cache("cliente")  # cpf -> {id, nome, cpf} | None
+
+def _carregar(cpf: str):
+    with get_conn() as conn:
+        row = conn.execute("SELECT id, nome, cpf FROM clientes WHERE cpf=?", (cpf,)).fetchone()
+    return dict(row) if row is not None else None
+
+def obter_por_cpf(cpf: str):
+    """{id, nome, cpf} do cliente, ou None; via cache (core/cache.py)."""
+    return _cache.obter(val.limpar_cpf(cpf), _carregar)
 
 def listar():
     with get_conn() as conn:
-        return conn.execute("SELECT nome, cpf, email, telefone FROM clientes ORDER BY nome").fetchall()
+        return consultar(conn, Cliente, f"SELECT {Cliente.COLUNAS} FROM clientes ORDER BY nome")
+
+def listar_pagina(cursor=None, limite: int = 50):
+    """Página de clientes em ordem de nome; cursor = (nome, id) da última linha."""
+    return paginacao.pagina("clientes", Cliente, ("nome", "id"), False, {}, cursor, limite)
+
+def iterar(lote: int = 500):
+    return paginacao.iterar(listar_pagina, lote)
+
+def buscar_por_cpf(prefixo: str, limite: int = 20):
+    """Clientes cujo CPF começa com `prefixo` (usa o índice UNIQUE de cpf)."""
+    prefixo = val.limpar_cpf(prefixo)
+    if not prefixo:
+        return []
+    ini, fim = intervalo_prefixo(prefixo)
+    with get_conn() as conn:
+        return consultar(
+            conn, Cliente,
+            f"SELECT {Cliente.COLUNAS} FROM clientes WHERE cpf >= ? AND cpf < ? ORDER BY cpf LIMIT ?",
+            (ini, fim, limite)
+        )
+
+def buscar_por_nome(termo: str, limite: int = 20):
+    """
+    Busca full-text por nome, ignorando acentos/caixa; cada palavra vale como prefixo
+    ("jo sil" acha "José da Silva"). Resultados ordenados por relevância (bm25).
+    """
+    palavras = re.findall(r"\w+", termo)
+    if not palavras:
+        return []
+    consulta = " ".join(f'"{p}"*' for p in palavras)
+    with get_conn() as conn:
+        try:
+            return consultar(
+                conn, Cliente,
+                f"SELECT {Cliente.colunas('c')} "
+                "FROM clientes_fts f JOIN clientes c ON c.id = f.rowid "
+                "WHERE clientes_fts MATCH ? ORDER BY f.rank LIMIT ?",
+                (consulta, limite)
+            )
+        except sqlite3.OperationalError:
+            # SQLite sem FTS5: varredura com LIKE (sensível a acentos)
+            return consultar(
+                conn, Cliente,
+                f"SELECT {Cliente.COLUNAS} FROM clientes WHERE nome LIKE ? ORDER BY nome LIMIT ?",
+                (f"%{termo.strip()}%", limite)
+            )
 
+@com_retry
 def criar_cliente(dados: dict) -> int:
     cpf = val.limpar_cpf(dados.get("cpf",""))
     if not val.validar_cpf(cpf):
@@ -17,8 +81,10 @@ def criar_cliente(dados: dict) -> int:
             (dados["nome"], cpf, dados["data_nascimento"], dados.get("endereco"),
              dados.get("telefone"), dados.get("email"))
         )
-        return cur.lastrowid
+    _cache.invalidar(cpf)
+    return cur.lastrowid
 
+@com_retry
 def atualizar_contato(cpf: str, telefone: str | None, email: str | None) -> bool:
     cpf = val.limpar_cpf(cpf)
     with get_conn() as conn:
@@ -28,31 +94,39 @@ def atualizar_contato(cpf: str, telefone: str | None, email: str | None) -> bool
         )
         return cur.rowcount > 0
 
+@com_retry
 def deletar_por_cpf(cpf: str, force=False) -> bool:
     """
-    Se force=True, apaga em cascata: sinistros -> apólices -> seguros do titular.
-    Caso contrário, impede exclusão se houver vínculos.
+    Se force=True, apaga em cascata: sinistros -> apólices -> seguros do cliente.
+    Caso contrário, impede exclusão se houver vínculos. Tudo por cliente_id (indexado),
+    com um DELETE por tabela, não importa quantas apólices o cliente tenha.
     """
     cpf = val.limpar_cpf(cpf)
     with get_conn() as conn:
-        vinc_apolices = conn.execute(
-            "SELECT COUNT(*) AS c FROM apolices WHERE titular IN (SELECT nome FROM clientes WHERE cpf=?)", (cpf,)
-        ).fetchone()["c"]
-        vinc_seguros = conn.execute(
-            "SELECT COUNT(*) AS c FROM seguros WHERE titular IN (SELECT nome FROM clientes WHERE cpf=?)", (cpf,)
-        ).fetchone()["c"]
-
-        if (vinc_apolices or vinc_seguros) and not force:
+        cli = conn.execute("SELECT id FROM clientes WHERE cpf=?", (cpf,)).fetchone()
+        if not cli:
+            return False
+        cid = cli["id"]
+        vinculado = conn.execute(
+            "SELECT EXISTS(SELECT 1 FROM apolices WHERE cliente_id=?) "
+            "OR EXISTS(SELECT 1 FROM seguros WHERE cliente_id=?) AS v", (cid, cid)
+        ).fetchone()["v"]
+
+        if vinculado and not force:
             raise AppError("Cliente possui vínculos.", user_message="Cliente possui apólices/seguros. Use exclusão em cascata.")
 
-        if force:
-            ap_rows = conn.execute(
-                "SELECT numero FROM apolices WHERE titular IN (SELECT nome FROM clientes WHERE cpf=?)", (cpf,)
-            ).fetchall()
-            for r in ap_rows:
-                conn.execute("DELETE FROM sinistros WHERE apolice_numero=?", (r["numero"],))
-            conn.execute("DELETE FROM apolices WHERE titular IN (SELECT nome FROM clientes WHERE cpf=?)", (cpf,))
-            conn.execute("DELETE FROM seguros WHERE titular IN (SELECT nome FROM clientes WHERE cpf=?)", (cpf,))
+        if vinculado:
+            conn.execute(
+                "DELETE FROM sinistros WHERE apolice_numero IN (SELECT numero FROM apolices WHERE cliente_id=?)",
+                (cid,)
+            )
+            conn.execute("DELETE FROM apolices WHERE cliente_id=?", (cid,))
+            conn.execute("DELETE FROM seguros WHERE cliente_id=?", (cid,))
 
-        cur = conn.execute("DELETE FROM clientes WHERE cpf=?", (cpf,))
-        return cur.rowcount > 0
+        cur = conn.execute("DELETE FROM clientes WHERE id=?", (cid,))
+    _cache.invalidar(cpf)
+    if vinculado:
+        # a cascata apagou um conjunto de apólices/seguros: mais barato esvaziar que listar as chaves
+        cache.cache("apolice").invalidar()
+        cache.cache("seguro").invalidar()
+    return cur.rowcount > 0
@@ -0,0 +1,74 @@
+"""
+Numeração de apólices por sequência no banco (tabela `sequencias`), no formato
+AP-<seguro>-<seq><dv>: seq com 8 dígitos (cresce se passar disso) e um dígito
+verificador módulo 11 sobre seguro + seq. As DAOs conferem o número com
+numero_aceito() antes de consultar o banco (apolices.obter/cancelar/cancelar_apolices,
+sinistros.registrar), então um dígito trocado na digitação vira "número inválido" em
+vez de "não encontrada", no menu, na CLI e na API. A busca por prefixo não confere:
+um prefixo não tem dígito verificador.
+
+reservar() avança a sequência em `quantidade` dentro da transação de quem chama:
+a emissão e a reserva entram (ou saem) juntas, e a trava de escrita do SQLite
+serializa processos concorrentes, então os números são únicos e crescentes na
+ordem de commit. Um lote de N apólices custa um UPDATE, não N.
+"""
+import re
+from ..core.exceptions import AppError
+
+APOLICE = "apolice"
+
+_RE_NUMERO = re.compile(r"AP-(\d+)-(\d{8,})(\d)")
+_RE_LEGADO = re.compile(r"AP-\d+-\d{13}")  # emitidos antes da sequência: AP-<seguro>-<epoch em ms>
+
+def digito_verificador(seguro_id: int, seq: int) -> int:
+    soma = 0
+    peso = 2
+    for d in reversed(f"{seguro_id}{seq:08d}"):
+        soma += int(d) * peso
+        peso = 2 if peso == 9 else peso + 1
+    return (soma * 10 % 11) % 10
+
+def formatar(seguro_id: int, seq: int) -> str:
+    return f"AP-{seguro_id}-{seq:08d}{digito_verificador(seguro_id, seq)}"
+
+def numero_valido(numero: str) -> bool:
+    """True se `numero` está no formato atual e o dígito confere (números antigos, AP-<seguro>-<ms>, não)."""
+    m = _RE_NUMERO.fullmatch(numero.strip().upper())
+    return bool(m) and digito_verificador(int(m[1]), int(m[2])) == int(m[3])
+
+def normalizar(numero: str) -> str:
+    """Forma gravada no banco: sem espaços nas pontas, em maiúsculas ("ap-1-..." -> "AP-1-...")."""
+    return numero.strip().upper()
+
+def numero_aceito(numero: str) -> bool:
+    """Número atual com dígito conferido, ou antigo (13 dígitos de epoch em ms, sem dígito)."""
+    n = normalizar(numero)
+    return numero_valido(n) or bool(_RE_LEGADO.fullmatch(n))
+
+def conferir(numero: str):
+    """AppError se numero_aceito() recusar `numero`."""
+    if not numero_aceito(numero):
+        raise AppError(f"Número de apólice inválido: {numero}",
+                       user_message="Número de apólice inválido (confira o dígito verificador).")
+
+def reservar(conn, quantidade: int = 1, nome: str = APOLICE) -> int:
+    """
+    Reserva `quantidade` valores consecutivos da sequência `nome` e devolve o primeiro.
+    Deve rodar na mesma transação que grava os números; se ela for desfeita, a
+    reserva também é.
+    """
+    if quantidade < 1:
+        raise ValueError("quantidade deve ser >= 1")
+    # o UPDATE pega a trava de escrita antes da leitura: ninguém lê o mesmo 'proximo'
+    cur = conn.execute("UPDATE sequencias SET proximo = proximo + ? WHERE nome=?", (quantidade, nome))
+    if cur.rowcount != 1:
+        raise AppError(f"sequência {nome!r} não existe", user_message="Numeração indisponível; rode as migrações.")
+    return conn.execute("SELECT proximo FROM sequencias WHERE nome=?", (nome,)).fetchone()[0] - quantidade
+
+def numeros_apolice(conn, seguro_ids) -> list[str]:
+    """Um número novo para cada seguro de `seguro_ids`, na ordem, com uma única reserva."""
+    seguro_ids = list(seguro_ids)
+    if not seguro_ids:
+        return []
+    inicio = reservar(conn, len(seguro_ids))
+    return [formatar(sid, seq) for seq, sid in enumerate(seguro_ids, start=inicio)]
@@ -0,0 +1,57 @@
+from ..db import get_conn
+from ..core.exceptions import AppError
+from . import registros
+
+def pagina(tabela: str, colunas, chaves: tuple, desc: bool, filtros: dict, cursor, limite: int):
+    """
+    Paginação por keyset: em vez de OFFSET, continua a partir da última chave vista,
+    então cada página custa O(limite) num índice, não importa a profundidade.
+    `chaves` precisa estar em `colunas`; o cursor é o valor da chave (ou tupla, se composta).
+    Filtros são por igualdade; uma chave com operador ("data_iso >=") vira intervalo.
+    `colunas` pode ser uma classe de registros.py: projeta COLUNAS e devolve instâncias dela.
+    Retorna (rows, proximo_cursor); proximo_cursor=None indica a última página.
+    """
+    registro = colunas if isinstance(colunas, type) else None
+    if registro is not None:
+        colunas = registro.COLUNAS
+    where, params = [], []
+    for col, v in filtros.items():
+        if v is not None:
+            where.append(f"{col} ?" if " " in col else f"{col}=?"); params.append(v)
+    if cursor is not None:
+        valores = tuple(cursor) if isinstance(cursor, (tuple, list)) else (cursor,)
+        if len(valores) != len(chaves) or not all(isinstance(v, (str, int, float)) for v in valores):
+            raise AppError(f"Cursor inválido para ({', '.join(chaves)}): {cursor!r}",
+                           user_message="Cursor de paginação inválido.")
+        where.append(f"({', '.join(chaves)}) {'<' if desc else '>'} ({', '.join('?' * len(chaves))})")
+        params.extend(valores)
+    sql = f"SELECT {colunas} FROM {tabela}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    direcao = "DESC" if desc else "ASC"
+    sql += " ORDER BY " + ", ".join(f"{k} {direcao}" for k in chaves) + " LIMIT ?"
+    params.append(limite)
+
+    with get_conn() as conn:
+        if registro is not None:
+            rows = registros.consultar(conn, registro, sql, params)
+        else:
+            rows = conn.execute(sql, params).fetchall()
+
+    proximo = None
+    if len(rows) == limite:
+        ultimo = rows[-1]
+        proximo = ultimo[chaves[0]] if len(chaves) == 1 else tuple(ultimo[k] for k in chaves)
+    return rows, proximo
+
+def iterar(buscar_pagina, lote: int = 500, **filtros):
+    """
+    Gera todas as linhas página a página (memória constante); cada página usa
+    uma conexão emprestada e curta, sem segurar transação de leitura aberta.
+    """
+    cursor = None
+    while True:
+        rows, cursor = buscar_pagina(cursor=cursor, limite=lote, **filtros)
+        yield from rows
+        if cursor is None:
+            return
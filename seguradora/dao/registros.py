@@ -0,0 +1,107 @@
+"""
+Registros tipados devolvidos pelas DAOs: tuplas imutáveis com nome por campo (sem
+__dict__ por linha), montadas direto da tupla do cursor por tuple.__new__, sem __init__
+em Python. Cada classe declara em CAMPOS a projeção que a DAO seleciona (COLUNAS), na
+mesma ordem, então o SELECT nunca traz coluna a mais.
+
+Acesso por atributo (r.nome) é o caminho rápido; r["nome"], keys(), get() e dict(r)
+continuam funcionando para o código escrito contra sqlite3.Row. Imutáveis, podem ser
+compartilhadas pelo cache (core/cache.py) e usadas em sets e como chave de dict.
+"""
+from functools import partial
+from operator import itemgetter
+
+try:
+    from collections import _tuplegetter  # o descritor em C do namedtuple
+except ImportError:  # outras implementações: property sobre itemgetter
+    def _tuplegetter(i, doc):
+        return property(itemgetter(i), doc=doc)
+
+class Registro(tuple):
+    __slots__ = ()
+    CAMPOS = ()
+    CAMPOS: tuple = ()
+    COLUNAS = ""
+
+    def __init_subclass__(cls, **kw):
+        super().__init_subclass__(**kw)
+        cls.COLUNAS = ", ".join(cls.CAMPOS)
+        cls._indice = {c: i for i, c in enumerate(cls.CAMPOS)}
+        cls._da_linha = partial(tuple.__new__, cls)  # tupla do cursor -> registro, sem conferir
+        for i, campo in enumerate(cls.CAMPOS):
+            setattr(cls, campo, _tuplegetter(i, f"Coluna {campo}"))
+
+    def __new__(cls, *valores):
+        """Posicional, na ordem de CAMPOS: cls(*tupla_do_cursor)."""
+        if len(valores) != len(cls.CAMPOS):
+            raise TypeError(f"{cls.__name__} espera {len(cls.CAMPOS)} valores, recebeu {len(valores)}")
+        return tuple.__new__(cls, valores)
+
+    def __getnewargs__(self):  # pickle/copy: __new__ é posicional
+        return tuple(self)
+
+    @classmethod
+    def colunas(cls, alias: str) -> str:
+        """Projeção com prefixo de tabela, para JOINs ("c.id, c.nome, ...")."""
+        return ", ".join(f"{alias}.{c}" for c in cls.CAMPOS)
+
+    def __getitem__(self, chave):
+        if isinstance(chave, str):
+            try:
+                chave = self._indice[chave]
+            except KeyError:
+                raise IndexError(f"{type(self).__name__} não tem a coluna {chave!r}") from None
+        return tuple.__getitem__(self, chave)
+
+    def get(self, chave, padrao=None):
+        i = self._indice.get(chave)
+        return padrao if i is None else tuple.__getitem__(self, i)
+
+    def keys(self):
+        return list(self.CAMPOS)
+
+    def __eq__(self, outro):
+        return type(outro) is type(self) and tuple.__eq__(self, outro)
+
+    def __ne__(self, outro):
+        return not self == outro
+
+    def __hash__(self):
+        return hash((type(self), tuple(self)))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{c}={v!r}' for c, v in zip(self.CAMPOS, self))})"
+
+class Cliente(Registro):
+    __slots__ = ()
+    CAMPOS = ("id", "nome", "cpf", "email", "telefone")
+
+class Seguro(Registro):
+    __slots__ = ()
+    CAMPOS = ("id", "tipo", "titular", "valor_base", "modelo", "ano", "placa",
+              "endereco_imovel", "beneficiarios", "criado_em", "cliente_id")
+
+class Apolice(Registro):
+    __slots__ = ()
+    CAMPOS = ("id", "numero", "seguro_id", "tipo", "titular", "valor_mensal", "status",
+              "criado_em", "cliente_id")
+
+class Sinistro(Registro):
+    __slots__ = ()
+    CAMPOS = ("id", "apolice_numero", "descricao", "data", "data_iso", "status", "criado_em")
+
+class Usuario(Registro):
+    __slots__ = ()
+    CAMPOS = ("username", "perfil", "cliente_cpf", "ativo")
+
+def consultar(conn, cls, sql: str, params=()) -> list:
+    """Executa `sql` (que deve projetar cls.COLUNAS, na ordem) e devolve instâncias de cls."""
+    cur = conn.cursor()
+    cur.row_factory = None  # tuplas: pula a construção do sqlite3.Row
+    return list(map(cls._da_linha, cur.execute(sql, params)))
+
+def um(conn, cls, sql: str, params=()):
+    cur = conn.cursor()
+    cur.row_factory = None
+    row = cur.execute(sql, params).fetchone()
+    return cls._da_linha(row) if row is not None else None
@@ -1,34 +1,70 @@
-from ..db import get_conn
+from ..db import get_conn, com_retry
+from ..core import cache
 from ..core.exceptions import AppError
+from . import paginacao
+from .registros import Seguro, consultar, um
+
+COLUNAS_LISTA = Seguro.COLUNAS
+
+# titular é o nome digitado; o vínculo real é cliente_id (homônimos: menor id)
+CLIENTE_POR_NOME = "(SELECT MIN(id) FROM clientes WHERE nome=?)"
+
+_cache = cache.cache("seguro")  # id -> Seguro | None
+
+def _carregar(seguro_id: int):
+    with get_conn() as conn:
+        return um(conn, Seguro, f"SELECT {Seguro.COLUNAS} FROM seguros WHERE id=?", (seguro_id,))
+
+def obter(seguro_id: int):
+    """Seguro por id, ou None; via cache (core/cache.py): consultas avulsas (API, aio)."""
+    return _cache.obter(int(seguro_id), _carregar)
 
 def listar():
     with get_conn() as conn:
-        return conn.execute("SELECT * FROM seguros ORDER BY id DESC").fetchall()
+        return consultar(conn, Seguro, f"SELECT {Seguro.COLUNAS} FROM seguros ORDER BY id DESC")
+
+def listar_pagina(cursor=None, limite: int = 50, tipo: str | None = None, titular: str | None = None):
+    """Página de seguros do mais recente ao mais antigo; cursor = id da última linha."""
+    filtros = {"tipo": tipo, "titular": titular}
+    return paginacao.pagina("seguros", Seguro, ("id",), True, filtros, cursor, limite)
+
+def iterar(tipo: str | None = None, titular: str | None = None, lote: int = 500):
+    return paginacao.iterar(listar_pagina, lote, tipo=tipo, titular=titular)
 
+@com_retry
 def criar_seguro_automovel(titular:str, valor:float, modelo:str, ano:int, placa:str) -> int:
     with get_conn() as conn:
         cur = conn.execute(
-            "INSERT INTO seguros (tipo,titular,valor_base,modelo,ano,placa) VALUES (?,?,?,?,?,?)",
-            ("Automóvel", titular, valor, modelo, ano, placa)
+            "INSERT INTO seguros (tipo,titular,valor_base,modelo,ano,placa,cliente_id) "
+            f"VALUES (?,?,?,?,?,?,{CLIENTE_POR_NOME})",
+            ("Automóvel", titular, valor, modelo, ano, placa, titular)
         )
-        return cur.lastrowid
+    _cache.invalidar(cur.lastrowid)
+    return cur.lastrowid
 
+@com_retry
 def criar_seguro_residencial(titular:str, valor:float, endereco_imovel:str) -> int:
     with get_conn() as conn:
         cur = conn.execute(
-            "INSERT INTO seguros (tipo,titular,valor_base,endereco_imovel) VALUES (?,?,?,?)",
-            ("Residencial", titular, valor, endereco_imovel)
+            "INSERT INTO seguros (tipo,titular,valor_base,endereco_imovel,cliente_id) "
+            f"VALUES (?,?,?,?,{CLIENTE_POR_NOME})",
+            ("Residencial", titular, valor, endereco_imovel, titular)
         )
-        return cur.lastrowid
+    _cache.invalidar(cur.lastrowid)
+    return cur.lastrowid
 
+@com_retry
 def criar_seguro_vida(titular:str, valor:float, beneficiarios:str) -> int:
     with get_conn() as conn:
         cur = conn.execute(
-            "INSERT INTO seguros (tipo,titular,valor_base,beneficiarios) VALUES (?,?,?,?)",
-            ("Vida", titular, valor, beneficiarios)
+            "INSERT INTO seguros (tipo,titular,valor_base,beneficiarios,cliente_id) "
+            f"VALUES (?,?,?,?,{CLIENTE_POR_NOME})",
+            ("Vida", titular, valor, beneficiarios, titular)
         )
-        return cur.lastrowid
+    _cache.invalidar(cur.lastrowid)
+    return cur.lastrowid
 
+@com_retry
 def editar_seguro(seguro_id:int, **campos) -> bool:
     sets, params = [], []
     for k in ("titular","valor_base","modelo","ano","placa","endereco_imovel","beneficiarios"):
@@ -36,15 +72,20 @@ def editar_seguro(seguro_id:int, **campos) -> bool:
             sets.append(f"{k}=?"); params.append(campos[k])
     if not sets:
         return False
+    if campos.get("titular") is not None:
+        sets.append(f"cliente_id={CLIENTE_POR_NOME}"); params.append(campos["titular"])
     params.append(seguro_id)
     with get_conn() as conn:
         cur = conn.execute(f"UPDATE seguros SET {', '.join(sets)} WHERE id=?", params)
-        return cur.rowcount > 0
+    _cache.invalidar(int(seguro_id))
+    return cur.rowcount > 0
 
+@com_retry
 def deletar_seguro(seguro_id:int) -> bool:
     with get_conn() as conn:
         ap = conn.execute("SELECT COUNT(*) c FROM apolices WHERE seguro_id=?", (seguro_id,)).fetchone()["c"]
         if ap:
             raise AppError("Seguro vinculado a apólice.", user_message="Existe apólice para esse seguro. Cancele/exclua antes.")
         cur = conn.execute("DELETE FROM seguros WHERE id=?", (seguro_id,))
-        return cur.rowcount > 0
+    _cache.invalidar(int(seguro_id))
+    return cur.rowcount > 0
@@ -1,24 +1,55 @@
-from ..db import get_conn
+from ..db import get_conn, com_retry
 from ..core.exceptions import AppError
 from ..core import validators as val
+from . import numeracao, paginacao
+from .registros import Sinistro, consultar
+
+COLUNAS_LISTA = Sinistro.COLUNAS
 
 def listar():
     with get_conn() as conn:
-        return conn.execute("SELECT * FROM sinistros ORDER BY id DESC").fetchall()
+        return consultar(conn, Sinistro, f"SELECT {Sinistro.COLUNAS} FROM sinistros ORDER BY id DESC")
+
+def listar_pagina(cursor=None, limite: int = 50, status: str | None = None,
+                  apolice_numero: str | None = None):
+    """Página de sinistros do mais recente ao mais antigo; cursor = id da última linha."""
+    filtros = {"status": status, "apolice_numero": apolice_numero}
+    return paginacao.pagina("sinistros", Sinistro, ("id",), True, filtros, cursor, limite)
+
+def iterar(status: str | None = None, apolice_numero: str | None = None, lote: int = 500):
+    return paginacao.iterar(listar_pagina, lote, status=status, apolice_numero=apolice_numero)
+
+def listar_por_data(data_ini: str, data_fim: str, cursor=None, limite: int = 50, status: str | None = None):
+    """
+    Sinistros ocorridos entre data_ini e data_fim (DD/MM/AAAA, inclusive), do mais recente
+    ao mais antigo. Faz range scan em idx_sinistros_data_iso; cursor = (data_iso, id).
+    """
+    for d in (data_ini, data_fim):
+        if not val.validar_data_ddmmaa(d):
+            raise AppError("Data inválida.", user_message="Data inválida. Use DD/MM/AAAA.")
+    filtros = {"data_iso >=": _iso(data_ini), "data_iso <=": _iso(data_fim), "status": status}
+    return paginacao.pagina("sinistros", Sinistro, ("data_iso", "id"), True, filtros, cursor, limite)
+
+def _iso(ddmmaa: str) -> str:
+    d = val.normalizar_data_ddmmaa(ddmmaa)
+    return f"{d[6:]}-{d[3:5]}-{d[:2]}"
 
+@com_retry
 def registrar(apolice_numero:str, descricao:str, data_ddmmaa:str) -> int | None:
     if not val.validar_data_ddmmaa(data_ddmmaa):
         raise AppError("Data inválida.", user_message="Data inválida. Use DD/MM/AAAA.")
+    apolice_numero = numeracao.normalizar(apolice_numero)
+    numeracao.conferir(apolice_numero)
+    # status conferido no próprio INSERT (o cache de apolices.obter() pode estar atrasado)
     with get_conn() as conn:
-        ap = conn.execute("SELECT numero,status FROM apolices WHERE numero=?", (apolice_numero,)).fetchone()
-        if not ap or ap["status"] != "Ativa":
-            return None
         cur = conn.execute(
-            "INSERT INTO sinistros (apolice_numero, descricao, data, status) VALUES (?,?,?, 'Aberto')",
-            (apolice_numero, descricao, data_ddmmaa)
+            "INSERT INTO sinistros (apolice_numero, descricao, data, status) "
+            "SELECT numero, ?, ?, 'Aberto' FROM apolices WHERE numero=? AND status='Ativa'",
+            (descricao, val.normalizar_data_ddmmaa(data_ddmmaa), apolice_numero)
         )
-        return cur.lastrowid
+        return cur.lastrowid if cur.rowcount else None
 
+@com_retry
 def fechar(apolice_numero:str) -> bool:
     with get_conn() as conn:
         abertos = conn.execute(
@@ -32,6 +63,7 @@ def fechar(apolice_numero:str) -> bool:
         )
         return cur.rowcount > 0
 
+@com_retry
 def editar(sinistro_id:int, **campos) -> bool:
     """
     Campos: descricao, data (DD/MM/AAAA), status ('Aberto'|'Fechado')
@@ -42,7 +74,7 @@ def editar(sinistro_id:int, **campos) -> bool:
     if "data" in campos and campos["data"] is not None:
         if not val.validar_data_ddmmaa(campos["data"]):
             raise AppError("Data inválida.", user_message="Data inválida. Use DD/MM/AAAA.")
-        sets.append("data=?"); params.append(campos["data"])
+        sets.append("data=?"); params.append(val.normalizar_data_ddmmaa(campos["data"]))
     if "status" in campos and campos["status"] is not None:
         if campos["status"] not in ("Aberto","Fechado"):
             raise AppError("Status inválido.", user_message="Status deve ser Aberto ou Fechado.")
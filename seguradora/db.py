@@ -1,110 +1,213 @@
 # seguradora/db.py
+import atexit
+import functools
 import os
 import sqlite3
+import threading
+import time
+from queue import LifoQueue, Empty, Full
+
+from .core.db_profile import carregar_profile, aplicar_pragmas
 
 DB_PATH = os.environ.get("SEGU_DB", "seguradora.db")
+# quantas conexões ociosas o pool mantém abertas (as excedentes são fechadas ao devolver)
+POOL_SIZE = int(os.environ.get("SEGU_DB_POOL_SIZE", "4"))
+# conexão ociosa há mais que isso (segundos) passa por "SELECT 1" antes de ser reutilizada
+HEALTH_CHECK_S = float(os.environ.get("SEGU_DB_HEALTH_CHECK_S", "30"))
+# statements preparados mantidos por conexão (o padrão do sqlite3 é 128); as DAOs montam
+# poucas dezenas de SQLs distintos, mas filtros opcionais multiplicam as variações
+STMT_CACHE = int(os.environ.get("SEGU_DB_STMT_CACHE", "256"))
+
+_profile: dict | None = None
+
+def get_profile() -> dict:
+    global _profile
+    if _profile is None:
+        _profile = carregar_profile()
+    return _profile
 
-def get_conn():
-    conn = sqlite3.connect(DB_PATH)
+def _connect(path):
+    # check_same_thread=False: a conexão pode ser devolvida ao pool por uma thread
+    # e emprestada por outra; o pool garante que só uma thread a usa por vez
+    conn = sqlite3.connect(path, check_same_thread=False, cached_statements=STMT_CACHE)
     conn.row_factory = sqlite3.Row
     # Cascatas são controladas via DAO (mantenha OFF aqui para evitar efeitos colaterais)
     conn.execute("PRAGMA foreign_keys=OFF")
+    # pragmas do perfil valem por conexão; como o pool reaproveita, rodam uma vez só
+    aplicar_pragmas(conn, get_profile())
     return conn
 
+def _is_busy(e: sqlite3.OperationalError) -> bool:
+    code = getattr(e, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    msg = str(e).lower()
+    return "locked" in msg or "busy" in msg
+
+def com_retry(fn):
+    """
+    Reexecuta a função inteira (a transação já sofreu rollback) quando o SQLite
+    responde SQLITE_BUSY/"database is locked", com backoff exponencial + jitter.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile = get_profile()
+        tentativas = max(1, int(profile.get("retry_tentativas", 1)))
+        base = profile.get("retry_backoff_ms", 50) / 1000
+        for i in range(tentativas):
+            try:
+                return fn(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e) or i == tentativas - 1:
+                    raise
+                import random  # só no caminho de contenção; random puxa hashlib no import
+                time.sleep(base * (2 ** i) * (0.5 + random.random()))
+    return wrapper
+
+class ConnectionPool:
+    """
+    Pool thread-safe de conexões SQLite para um mesmo arquivo.
+    Conexões ociosas ficam numa pilha (LIFO, reaproveita a mais "quente");
+    se não houver nenhuma ociosa, abre uma nova, então nunca bloqueia.
+    """
+    def __init__(self, path: str, size: int = POOL_SIZE, health_check_s: float = HEALTH_CHECK_S):
+        self.path = path
+        self.size = max(0, size)
+        self.health_check_s = health_check_s
+        self._idle = LifoQueue(maxsize=self.size) if self.size else None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.criadas = 0
+        self.reusadas = 0
+        self.descartadas = 0
+
+    def acquire(self) -> sqlite3.Connection:
+        while self._idle is not None:
+            try:
+                conn, devolvida_em = self._idle.get_nowait()
+            except Empty:
+                break
+            if time.monotonic() - devolvida_em < self.health_check_s or self._saudavel(conn):
+                with self._lock:
+                    self.reusadas += 1
+                return conn
+            self._descartar(conn)
+        conn = _connect(self.path)
+        with self._lock:
+            self.criadas += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._descartar(conn)
+            return
+        if self._closed or self._idle is None:
+            self._descartar(conn)
+            return
+        try:
+            self._idle.put_nowait((conn, time.monotonic()))
+        except Full:
+            self._descartar(conn)
+
+    def close(self):
+        self._closed = True
+        while self._idle is not None:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except Empty:
+                break
+            self._descartar(conn)
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path, "size": self.size,
+            "ociosas": self._idle.qsize() if self._idle is not None else 0,
+            "criadas": self.criadas, "reusadas": self.reusadas, "descartadas": self.descartadas,
+        }
+
+    def _saudavel(self, conn) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _descartar(self, conn):
+        with self._lock:
+            self.descartadas += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+class PooledConnection:
+    """
+    Conexão emprestada do pool. Mantém a semântica de `with get_conn() as conn:`
+    (commit no sucesso, rollback na exceção) e devolve a conexão ao sair do bloco.
+    """
+    __slots__ = ("_pool", "_conn")
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+        self._conn = pool.acquire()
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        conn, self._conn = self._conn, None
+        try:
+            conn.__exit__(exc_type, exc, tb)
+        finally:
+            self._pool.release(conn)
+        return False
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    pool = _pool
+    if pool is None or pool.path != DB_PATH:
+        with _pool_lock:
+            if _pool is None or _pool.path != DB_PATH:
+                if _pool is not None:
+                    _pool.close()
+                _pool = ConnectionPool(DB_PATH, POOL_SIZE)  # lido aqui: quem sobe N threads pode ajustar antes
+            pool = _pool
+    return pool
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+atexit.register(close_pool)
+
+def get_conn() -> PooledConnection:
+    return PooledConnection(get_pool())
+
+def intervalo_prefixo(prefixo: str) -> tuple[str, str]:
+    """
+    Converte uma busca por prefixo em intervalo [ini, fim) para que o SQLite
+    use o índice da coluna (LIKE 'x%' não usa índice com a colação padrão).
+    """
+    return prefixo, prefixo[:-1] + chr(ord(prefixo[-1]) + 1)
+
 def init_schema():
-    with get_conn() as conn:
-        conn.executescript("""
-        -- =========================
-        -- CLIENTES
-        -- =========================
-        CREATE TABLE IF NOT EXISTS clientes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL,
-            cpf TEXT NOT NULL UNIQUE,
-            data_nascimento TEXT NOT NULL, -- DD/MM/AAAA
-            endereco TEXT,
-            telefone TEXT,
-            email TEXT,
-            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-
-        -- =========================
-        -- SEGUROS
-        -- =========================
-        CREATE TABLE IF NOT EXISTS seguros (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tipo TEXT NOT NULL CHECK(tipo IN ('Automóvel','Residencial','Vida')),
-            titular TEXT NOT NULL,           -- nome do cliente (display)
-            valor_base REAL NOT NULL,
-
-            -- específicos
-            modelo TEXT,
-            ano INTEGER,
-            placa TEXT,           -- Automóvel
-            endereco_imovel TEXT, -- Residencial
-            beneficiarios TEXT,   -- Vida
-
-            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-
-        -- =========================
-        -- APÓLICES
-        -- =========================
-        CREATE TABLE IF NOT EXISTS apolices (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            numero TEXT NOT NULL UNIQUE,
-            seguro_id INTEGER NOT NULL,
-            tipo TEXT NOT NULL,
-            titular TEXT NOT NULL,
-            valor_mensal REAL NOT NULL,
-            status TEXT NOT NULL CHECK(status IN ('Ativa','Cancelada')),
-            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-
-        -- =========================
-        -- SINISTROS
-        -- =========================
-        CREATE TABLE IF NOT EXISTS sinistros (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            apolice_numero TEXT NOT NULL,
-            descricao TEXT NOT NULL,
-            data TEXT NOT NULL,   -- DD/MM/AAAA
-            status TEXT NOT NULL CHECK(status IN ('Aberto','Fechado')) DEFAULT 'Aberto',
-            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-
-        -- =========================
-        -- AUDITORIA
-        -- =========================
-        CREATE TABLE IF NOT EXISTS auditoria (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ts TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            username TEXT NOT NULL,
-            operacao TEXT NOT NULL,
-            entidade TEXT NOT NULL,
-            entidade_id TEXT,
-            ok INTEGER NOT NULL,          -- 1=ok, 0=erro
-            detalhes TEXT
-        );
-
-        -- =========================
-        -- USUÁRIOS (AUTENTICAÇÃO)
-        -- =========================
-        -- Importante: o services/auth.py espera PRIMARY KEY em 'username'
-        CREATE TABLE IF NOT EXISTS usuarios (
-            username    TEXT PRIMARY KEY,
-            senha_hash  TEXT NOT NULL,
-            perfil      TEXT NOT NULL CHECK (perfil IN ('admin','comum','cliente')),
-            cliente_cpf TEXT,                               -- se perfil='cliente', vincula a clientes.cpf
-            ativo       INTEGER NOT NULL DEFAULT 1,         -- 1=ativo, 0=inativo
-            criado_em   TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
-        );
-
-        -- =========================
-        -- ÍNDICES
-        -- =========================
-        CREATE INDEX IF NOT EXISTS idx_apolices_status   ON apolices(status);
-        CREATE INDEX IF NOT EXISTS idx_sinistros_status  ON sinistros(status);
-        CREATE INDEX IF NOT EXISTS idx_sinistros_apolice ON sinistros(apolice_numero);
-        CREATE INDEX IF NOT EXISTS idx_usuarios_perfil   ON usuarios(perfil);
-        """)
+    """Aplica as migrações pendentes (ver migracoes.py); com o schema em dia não roda DDL."""
+    from .migracoes import migrar
+    migrar()
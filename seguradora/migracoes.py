@@ -0,0 +1,443 @@
+# seguradora/migracoes.py
+"""
+Migrações de schema numeradas. A versão aplicada fica em PRAGMA user_version (cabeçalho
+do arquivo), então com o banco em dia init_schema() custa uma leitura de pragma por
+processo e nenhum DDL. Cada migração roda na sua própria transação junto com a troca
+de user_version: ou entra inteira, ou não entra.
+
+Para mudar o schema, acrescente uma função ao fim de MIGRACOES; nunca edite nem
+reordene as que já existem. As primeiras são idempotentes (IF NOT EXISTS / checagem
+de colunas) porque bancos anteriores a este mecanismo já podem ter parte do schema.
+"""
+import logging
+import sqlite3
+from . import db
+from .db import get_conn, com_retry
+
+logger = logging.getLogger("seguradora")
+
+def _script(conn, sql: str):
+    """executescript() faz COMMIT antes de rodar; aqui cada comando vai na transação aberta."""
+    atual = ""
+    for linha in sql.splitlines(keepends=True):
+        atual += linha
+        if sqlite3.complete_statement(atual):
+            conn.execute(atual)
+            atual = ""
+    if atual.strip():
+        conn.execute(atual)
+
+# -------------------- 1: schema base --------------------
+
+_DDL_BASE = """
+    -- =========================
+    -- CLIENTES
+    -- =========================
+    CREATE TABLE IF NOT EXISTS clientes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL,
+        cpf TEXT NOT NULL UNIQUE,
+        data_nascimento TEXT NOT NULL, -- DD/MM/AAAA
+        endereco TEXT,
+        telefone TEXT,
+        email TEXT,
+        criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- =========================
+    -- SEGUROS
+    -- =========================
+    CREATE TABLE IF NOT EXISTS seguros (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tipo TEXT NOT NULL CHECK(tipo IN ('Automóvel','Residencial','Vida')),
+        titular TEXT NOT NULL,           -- nome do cliente (display)
+        valor_base REAL NOT NULL,
+
+        -- específicos
+        modelo TEXT,
+        ano INTEGER,
+        placa TEXT,           -- Automóvel
+        endereco_imovel TEXT, -- Residencial
+        beneficiarios TEXT,   -- Vida
+
+        criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- =========================
+    -- APÓLICES
+    -- =========================
+    CREATE TABLE IF NOT EXISTS apolices (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        numero TEXT NOT NULL UNIQUE,
+        seguro_id INTEGER NOT NULL,
+        tipo TEXT NOT NULL,
+        titular TEXT NOT NULL,
+        valor_mensal REAL NOT NULL,
+        status TEXT NOT NULL CHECK(status IN ('Ativa','Cancelada')),
+        criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- =========================
+    -- SINISTROS
+    -- =========================
+    CREATE TABLE IF NOT EXISTS sinistros (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        apolice_numero TEXT NOT NULL,
+        descricao TEXT NOT NULL,
+        data TEXT NOT NULL,   -- DD/MM/AAAA
+        status TEXT NOT NULL CHECK(status IN ('Aberto','Fechado')) DEFAULT 'Aberto',
+        criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- =========================
+    -- AUDITORIA
+    -- =========================
+    CREATE TABLE IF NOT EXISTS auditoria (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        username TEXT NOT NULL,
+        operacao TEXT NOT NULL,
+        entidade TEXT NOT NULL,
+        entidade_id TEXT,
+        ok INTEGER NOT NULL,          -- 1=ok, 0=erro
+        detalhes TEXT
+    );
+
+    -- =========================
+    -- USUÁRIOS (AUTENTICAÇÃO)
+    -- =========================
+    -- Importante: o services/auth.py espera PRIMARY KEY em 'username'
+    CREATE TABLE IF NOT EXISTS usuarios (
+        username    TEXT PRIMARY KEY,
+        senha_hash  TEXT NOT NULL,
+        perfil      TEXT NOT NULL CHECK (perfil IN ('admin','comum','cliente')),
+        cliente_cpf TEXT,                               -- se perfil='cliente', vincula a clientes.cpf
+        ativo       INTEGER NOT NULL DEFAULT 1,         -- 1=ativo, 0=inativo
+        criado_em   TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- =========================
+    -- ÍNDICES
+    -- =========================
+    CREATE INDEX IF NOT EXISTS idx_apolices_status   ON apolices(status);
+    CREATE INDEX IF NOT EXISTS idx_sinistros_status  ON sinistros(status);
+    CREATE INDEX IF NOT EXISTS idx_sinistros_apolice ON sinistros(apolice_numero);
+    CREATE INDEX IF NOT EXISTS idx_usuarios_perfil   ON usuarios(perfil);
+"""
+
+def _m001_schema_base(conn):
+    _script(conn, _DDL_BASE)
+
+# -------------------- 2: usuarios de bancos antigos --------------------
+
+def _m002_usuarios_legado(conn):
+    """
+    Bancos criados pela versão antiga do auth têm usuarios só com (username, senha_hash,
+    perfil) e/ou CHECK sem o perfil 'cliente'.
+    """
+    cols = {r["name"] for r in conn.execute("PRAGMA table_info(usuarios)")}
+    if "cliente_cpf" not in cols:
+        conn.execute("ALTER TABLE usuarios ADD COLUMN cliente_cpf TEXT")
+    if "ativo" not in cols:
+        conn.execute("ALTER TABLE usuarios ADD COLUMN ativo INTEGER NOT NULL DEFAULT 1")
+
+    ddl_row = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='usuarios'").fetchone()
+    ddl = ddl_row["sql"] if ddl_row and ddl_row["sql"] else ""
+    check_antigo = "CHECK" in ddl and "perfil IN ('admin','comum')" in ddl and "cliente" not in ddl
+    # ALTER TABLE não aceita DEFAULT CURRENT_TIMESTAMP: sem criado_em, recria a tabela
+    if check_antigo or "criado_em" not in cols:
+        criado_em = "COALESCE(criado_em, CURRENT_TIMESTAMP)" if "criado_em" in cols else "CURRENT_TIMESTAMP"
+        _script(conn, f"""
+            CREATE TABLE usuarios__new (
+                username    TEXT PRIMARY KEY,
+                senha_hash  TEXT NOT NULL,
+                perfil      TEXT NOT NULL,
+                cliente_cpf TEXT,
+                ativo       INTEGER NOT NULL DEFAULT 1,
+                criado_em   TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                CHECK (perfil IN ('admin','comum','cliente'))
+            );
+            INSERT INTO usuarios__new (username, senha_hash, perfil, cliente_cpf, ativo, criado_em)
+            SELECT username, senha_hash, perfil,
+                   cliente_cpf, COALESCE(ativo,1), {criado_em}
+            FROM usuarios;
+            DROP TABLE usuarios;
+            ALTER TABLE usuarios__new RENAME TO usuarios;
+        """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_perfil ON usuarios(perfil)")
+
+# -------------------- 3: busca de clientes por nome --------------------
+
+def _m003_clientes_fts(conn):
+    """
+    Índice full-text (FTS5) sobre clientes.nome, sem acentos e sem caixa,
+    mantido por triggers. Se o SQLite não tiver FTS5, a busca por nome cai no LIKE.
+    """
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='clientes_fts'"
+    ).fetchone()
+    if existe:
+        return
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE clientes_fts USING fts5("
+            "nome, content='clientes', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+    except sqlite3.OperationalError:
+        return
+    _script(conn, """
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_ai AFTER INSERT ON clientes BEGIN
+            INSERT INTO clientes_fts(rowid, nome) VALUES (new.id, new.nome);
+        END;
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_ad AFTER DELETE ON clientes BEGIN
+            INSERT INTO clientes_fts(clientes_fts, rowid, nome) VALUES ('delete', old.id, old.nome);
+        END;
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_au AFTER UPDATE OF nome ON clientes BEGIN
+            INSERT INTO clientes_fts(clientes_fts, rowid, nome) VALUES ('delete', old.id, old.nome);
+            INSERT INTO clientes_fts(rowid, nome) VALUES (new.id, new.nome);
+        END;
+        -- popula com os clientes já existentes
+        INSERT INTO clientes_fts(clientes_fts) VALUES ('rebuild');
+    """)
+
+# -------------------- 4: índices das listagens --------------------
+
+def _m004_indices_listagem(conn):
+    # listagens paginadas (keyset) e filtros por titular
+    _script(conn, """
+        CREATE INDEX IF NOT EXISTS idx_clientes_nome     ON clientes(nome);
+        CREATE INDEX IF NOT EXISTS idx_seguros_titular   ON seguros(titular);
+        CREATE INDEX IF NOT EXISTS idx_apolices_titular  ON apolices(titular);
+    """)
+
+# -------------------- 5: agregados materializados (relatórios) --------------------
+# Mantidos por triggers, então qualquer caminho de escrita (DAO, importação em lote,
+# SQL manual) os atualiza. reconstruir_agregados() recalcula tudo se houver desvio.
+
+_DDL_AGREGADOS = """
+    CREATE TABLE IF NOT EXISTS agg_receita_mensal (
+        ym      TEXT PRIMARY KEY,             -- YYYY-MM de apolices.criado_em
+        receita REAL NOT NULL DEFAULT 0,      -- soma de valor_mensal das apólices Ativas
+        qtd     INTEGER NOT NULL DEFAULT 0    -- nº de apólices Ativas (0 = mês some do relatório)
+    );
+    CREATE TABLE IF NOT EXISTS agg_sinistros_status (
+        status TEXT PRIMARY KEY,
+        qtd    INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS agg_sinistros_mes (
+        ym  TEXT PRIMARY KEY,                 -- YYYY-MM de sinistros.criado_em
+        qtd INTEGER NOT NULL DEFAULT 0
+    );
+
+    -- apólices -> receita mensal
+    CREATE TRIGGER IF NOT EXISTS agg_apolices_ai AFTER INSERT ON apolices WHEN new.status='Ativa' BEGIN
+        INSERT INTO agg_receita_mensal (ym, receita, qtd) VALUES (strftime('%Y-%m', new.criado_em), new.valor_mensal, 1)
+        ON CONFLICT(ym) DO UPDATE SET receita=receita+excluded.receita, qtd=qtd+1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS agg_apolices_au AFTER UPDATE OF status, valor_mensal, criado_em ON apolices BEGIN
+        UPDATE agg_receita_mensal SET receita=receita-old.valor_mensal, qtd=qtd-1
+         WHERE old.status='Ativa' AND ym=strftime('%Y-%m', old.criado_em);
+        INSERT INTO agg_receita_mensal (ym, receita, qtd)
+        SELECT strftime('%Y-%m', new.criado_em), new.valor_mensal, 1 WHERE new.status='Ativa'
+        ON CONFLICT(ym) DO UPDATE SET receita=receita+excluded.receita, qtd=qtd+1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS agg_apolices_ad AFTER DELETE ON apolices WHEN old.status='Ativa' BEGIN
+        UPDATE agg_receita_mensal SET receita=receita-old.valor_mensal, qtd=qtd-1
+         WHERE ym=strftime('%Y-%m', old.criado_em);
+    END;
+
+    -- sinistros -> por status e por mês
+    CREATE TRIGGER IF NOT EXISTS agg_sinistros_ai AFTER INSERT ON sinistros BEGIN
+        INSERT INTO agg_sinistros_status (status, qtd) VALUES (new.status, 1)
+        ON CONFLICT(status) DO UPDATE SET qtd=qtd+1;
+        INSERT INTO agg_sinistros_mes (ym, qtd) VALUES (strftime('%Y-%m', new.criado_em), 1)
+        ON CONFLICT(ym) DO UPDATE SET qtd=qtd+1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS agg_sinistros_au_status AFTER UPDATE OF status ON sinistros
+    WHEN old.status IS NOT new.status BEGIN
+        UPDATE agg_sinistros_status SET qtd=qtd-1 WHERE status=old.status;
+        INSERT INTO agg_sinistros_status (status, qtd) VALUES (new.status, 1)
+        ON CONFLICT(status) DO UPDATE SET qtd=qtd+1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS agg_sinistros_au_mes AFTER UPDATE OF criado_em ON sinistros
+    WHEN strftime('%Y-%m', old.criado_em) IS NOT strftime('%Y-%m', new.criado_em) BEGIN
+        UPDATE agg_sinistros_mes SET qtd=qtd-1 WHERE ym=strftime('%Y-%m', old.criado_em);
+        INSERT INTO agg_sinistros_mes (ym, qtd) VALUES (strftime('%Y-%m', new.criado_em), 1)
+        ON CONFLICT(ym) DO UPDATE SET qtd=qtd+1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS agg_sinistros_ad AFTER DELETE ON sinistros BEGIN
+        UPDATE agg_sinistros_status SET qtd=qtd-1 WHERE status=old.status;
+        UPDATE agg_sinistros_mes SET qtd=qtd-1 WHERE ym=strftime('%Y-%m', old.criado_em);
+    END;
+"""
+
+def _m005_agregados(conn):
+    _script(conn, _DDL_AGREGADOS)
+    reconstruir_agregados(conn)
+
+def reconstruir_agregados(conn):
+    """Recalcula os agregados a partir das tabelas base (idempotente, na transação de `conn`)."""
+    conn.execute("DELETE FROM agg_receita_mensal")
+    conn.execute(
+        "INSERT INTO agg_receita_mensal (ym, receita, qtd) "
+        "SELECT strftime('%Y-%m', criado_em), SUM(valor_mensal), COUNT(*) "
+        "FROM apolices WHERE status='Ativa' GROUP BY 1"
+    )
+    conn.execute("DELETE FROM agg_sinistros_status")
+    conn.execute(
+        "INSERT INTO agg_sinistros_status (status, qtd) SELECT status, COUNT(*) FROM sinistros GROUP BY status"
+    )
+    conn.execute("DELETE FROM agg_sinistros_mes")
+    conn.execute(
+        "INSERT INTO agg_sinistros_mes (ym, qtd) "
+        "SELECT strftime('%Y-%m', criado_em), COUNT(*) FROM sinistros GROUP BY 1"
+    )
+
+# -------------------- 6: data ISO dos sinistros --------------------
+
+def _m006_sinistros_data_iso(conn):
+    """
+    sinistros.data (DD/MM/AAAA) não ordena nem permite range scan. data_iso é uma coluna
+    gerada (YYYY-MM-DD) indexada; a DAO grava data sempre com zero à esquerda, e aqui
+    normalizamos linhas antigas no formato D/M/AAAA antes de criar a coluna.
+    """
+    cols = {r["name"] for r in conn.execute("PRAGMA table_xinfo(sinistros)")}
+    if "data_iso" not in cols:
+        from .core.validators import normalizar_data_ddmmaa
+        legado = conn.execute(
+            "SELECT id, data FROM sinistros WHERE data NOT GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]'"
+        ).fetchall()
+        for r in legado:
+            try:
+                conn.execute("UPDATE sinistros SET data=? WHERE id=?", (normalizar_data_ddmmaa(r["data"]), r["id"]))
+            except ValueError:
+                pass  # data inválida fica como está (data_iso sai inconsistente, mas não quebra)
+        conn.execute(
+            "ALTER TABLE sinistros ADD COLUMN data_iso TEXT GENERATED ALWAYS AS "
+            "(substr(data,7,4) || '-' || substr(data,4,2) || '-' || substr(data,1,2)) VIRTUAL"
+        )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sinistros_data_iso ON sinistros(data_iso)")
+
+# -------------------- 7: checkpoints da importação em lote --------------------
+
+def _m007_import_checkpoints(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            chave      TEXT PRIMARY KEY,   -- entidade:caminho absoluto do arquivo
+            registros  INTEGER NOT NULL,   -- registros do arquivo já consumidos
+            inseridos  INTEGER NOT NULL,
+            rejeitados INTEGER NOT NULL,
+            concluido  INTEGER NOT NULL DEFAULT 0,
+            atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+# -------------------- 8: admin padrão --------------------
+
+def _m008_admin_padrao(conn):
+    from .services import senhas
+    cur = conn.execute(
+        "INSERT OR IGNORE INTO usuarios (username, senha_hash, perfil, ativo, criado_em) "
+        "VALUES ('admin', ?, 'admin', 1, CURRENT_TIMESTAMP)",
+        (senhas.gerar_hash("admin123"),)
+    )
+    if cur.rowcount:
+        logger.info("Admin criado: admin / admin123")
+
+# -------------------- 9: vínculo por chave com o cliente --------------------
+
+def _m009_cliente_id(conn):
+    """
+    seguros/apolices apontavam para o cliente só pelo nome (titular), sem índice.
+    cliente_id é preenchido pelo nome (o menor id, se houver homônimos); apólices
+    herdam do seguro. titular continua como nome de exibição.
+    """
+    for tabela in ("seguros", "apolices"):
+        cols = {r["name"] for r in conn.execute(f"PRAGMA table_info({tabela})")}
+        if "cliente_id" not in cols:
+            conn.execute(f"ALTER TABLE {tabela} ADD COLUMN cliente_id INTEGER REFERENCES clientes(id)")
+    _script(conn, """
+        UPDATE seguros SET cliente_id = (SELECT MIN(c.id) FROM clientes c WHERE c.nome = seguros.titular)
+         WHERE cliente_id IS NULL;
+        UPDATE apolices SET cliente_id = (SELECT s.cliente_id FROM seguros s WHERE s.id = apolices.seguro_id)
+         WHERE cliente_id IS NULL;
+        UPDATE apolices SET cliente_id = (SELECT MIN(c.id) FROM clientes c WHERE c.nome = apolices.titular)
+         WHERE cliente_id IS NULL;
+        CREATE INDEX IF NOT EXISTS idx_seguros_cliente  ON seguros(cliente_id);
+        CREATE INDEX IF NOT EXISTS idx_apolices_cliente ON apolices(cliente_id);
+        CREATE INDEX IF NOT EXISTS idx_apolices_seguro  ON apolices(seguro_id);
+    """)
+
+# -------------------- 10: sequências (numeração de apólices) --------------------
+
+def _m010_sequencias(conn):
+    """
+    Contador para dao/numeracao.py. Os números novos têm 8+1 dígitos depois do seguro;
+    os antigos (AP-<seguro>-<ms>) têm 13, então as duas faixas não colidem.
+    """
+    _script(conn, """
+        CREATE TABLE IF NOT EXISTS sequencias (
+            nome    TEXT PRIMARY KEY,
+            proximo INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        INSERT OR IGNORE INTO sequencias (nome, proximo) VALUES ('apolice', 1);
+    """)
+
+# -------------------- 11: segredo dos tokens de sessão --------------------
+
+def _m011_segredos(conn):
+    """Chave HMAC dos tokens (services/auth.emitir_token), gerada uma vez por banco."""
+    import secrets
+    conn.execute("CREATE TABLE IF NOT EXISTS segredos (nome TEXT PRIMARY KEY, valor TEXT NOT NULL) WITHOUT ROWID")
+    conn.execute("INSERT OR IGNORE INTO segredos (nome, valor) VALUES ('token', ?)", (secrets.token_hex(32),))
+
+# -------------------- runner --------------------
+
+MIGRACOES = (
+    _m001_schema_base,
+    _m002_usuarios_legado,
+    _m003_clientes_fts,
+    _m004_indices_listagem,
+    _m005_agregados,
+    _m006_sinistros_data_iso,
+    _m007_import_checkpoints,
+    _m008_admin_padrao,
+    _m009_cliente_id,
+    _m010_sequencias,
+    _m011_segredos,
+)
+VERSAO = len(MIGRACOES)
+
+# bancos (DB_PATH) já conferidos neste processo: daí em diante nem o pragma é lido
+_em_dia: set = set()
+
+def versao_atual() -> int:
+    with get_conn() as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+@com_retry
+def _aplicar(numero: int, migracao) -> bool:
+    with get_conn() as conn:
+        # BEGIN IMMEDIATE serializa processos migrando ao mesmo tempo; quem chegar
+        # depois relê a versão e pula o que o outro já aplicou
+        conn.execute("BEGIN IMMEDIATE")
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= numero:
+            return False
+        migracao(conn)
+        conn.execute(f"PRAGMA user_version = {int(numero)}")
+    return True
+
+def migrar() -> int:
+    """Aplica as migrações pendentes e retorna a versão do schema."""
+    path = db.DB_PATH
+    if path in _em_dia:
+        return VERSAO
+    versao = versao_atual()
+    if versao > VERSAO:
+        logger.warning(f"schema na versão {versao}, mais nova que a deste código ({VERSAO})")
+    for numero, migracao in enumerate(MIGRACOES, start=1):
+        if numero > versao and _aplicar(numero, migracao):
+            logger.info(f"migração {numero} aplicada ({migracao.__name__.split('_', 2)[2]})")
+    _em_dia.add(path)
+    return max(versao, VERSAO)
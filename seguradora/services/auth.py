@@ -1,83 +1,52 @@
+import base64
 import hashlib
-import sqlite3
-from ..db import get_conn
+import hmac
+import json
+import os
+import time
+from .. import db
+from ..db import get_conn, com_retry
+from ..core import cache
 from ..core.exceptions import AppError
+from ..dao import clientes as cli_dao
+from ..dao.registros import Usuario, consultar
+from . import senhas
 
-# -------------------- bootstrap/migração de tabela (idempotente) --------------------
-
-def _ensure_table():
-    with get_conn() as conn:
-        # 1) tabela mínima
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS usuarios (
-                username   TEXT PRIMARY KEY,
-                senha_hash TEXT NOT NULL,
-                perfil     TEXT NOT NULL
-            )
-        """)
-
-        # 2) colunas ausentes
-        cols = {r["name"] for r in conn.execute("PRAGMA table_info(usuarios)").fetchall()}
-        if "cliente_cpf" not in cols:
-            conn.execute("ALTER TABLE usuarios ADD COLUMN cliente_cpf TEXT")
-        if "ativo" not in cols:
-            conn.execute("ALTER TABLE usuarios ADD COLUMN ativo INTEGER NOT NULL DEFAULT 1")
-        if "criado_em" not in cols:
-            conn.execute("ALTER TABLE usuarios ADD COLUMN criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
-
-        # 3) CHECK antigo?
-        ddl_row = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='usuarios'").fetchone()
-        ddl = ddl_row["sql"] if ddl_row and ddl_row["sql"] else ""
-        has_bad_check = ("CHECK" in ddl) and ("perfil IN ('admin','comum')" in ddl) and ("cliente" not in ddl)
-        if has_bad_check:
-            _migrate_perfil_check()
-
-        # 4) índice
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_perfil ON usuarios(perfil)")
-
-def _migrate_perfil_check():
-    with get_conn() as conn:
-        conn.executescript("""
-            PRAGMA foreign_keys=OFF;
-
-            CREATE TABLE IF NOT EXISTS usuarios__new (
-                username    TEXT PRIMARY KEY,
-                senha_hash  TEXT NOT NULL,
-                perfil      TEXT NOT NULL,
-                cliente_cpf TEXT,
-                ativo       INTEGER NOT NULL DEFAULT 1,
-                criado_em   TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                CHECK (perfil IN ('admin','comum','cliente'))
-            );
-
-            INSERT INTO usuarios__new (username, senha_hash, perfil, cliente_cpf, ativo, criado_em)
-            SELECT
-                username, senha_hash, perfil,
-                cliente_cpf, COALESCE(ativo,1), COALESCE(criado_em, CURRENT_TIMESTAMP)
-            FROM usuarios;
+# -------------------- helpers internos --------------------
 
-            DROP TABLE usuarios;
-            ALTER TABLE usuarios__new RENAME TO usuarios;
+def _hash_senha(senha: str) -> str:
+    return senhas.gerar_hash(senha)
 
-            PRAGMA foreign_keys=ON;
-        """)
+# registros de usuário em cache (core/cache.py) para as checagens administrativas
+# (existe?, perfil atual ao editar). Invalidado por criar/editar/excluir; entre processos
+# vale o TTL. autenticar() e validar_token() não usam o cache: leem ativo/senha_hash/perfil
+# direto do banco (uma busca por PK), para inativação e troca de senha valerem na hora
+# também em outro processo (API, CLI).
+CACHE_TTL_S = float(os.environ.get("SEGU_AUTH_CACHE_TTL", "60"))
+_usuarios = cache.cache("usuario", ttl_s=CACHE_TTL_S, negativo=False)
 
-_ensure_table()
+def _carregar_usuario(username: str):
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT username, senha_hash, perfil, cliente_cpf, ativo FROM usuarios WHERE username=?",
+            (username,)
+        ).fetchone()
+    return dict(row) if row is not None else None
 
-# -------------------- helpers internos --------------------
+def _usuario_cache(username: str):
+    return _usuarios.obter(username, _carregar_usuario)
 
-def _hash_senha(senha: str) -> str:
-    return hashlib.sha256(senha.encode("utf-8")).hexdigest()
+def invalidar_cache(username: str | None = None):
+    if username is None:
+        _usuarios.invalidar()
+    else:
+        _usuarios.invalidar(username)
 
 def _usuario_existe(username: str) -> bool:
-    with get_conn() as conn:
-        row = conn.execute("SELECT 1 FROM usuarios WHERE username=?", (username,)).fetchone()
-        return row is not None
+    return _usuario_cache(username) is not None
 
 def _cliente_existe(cpf: str) -> bool:
-    with get_conn() as conn:
-        row = conn.execute("SELECT 1 FROM clientes WHERE cpf=?", (cpf,)).fetchone()
-        return row is not None
+    return cli_dao.obter_por_cpf(cpf) is not None
 
 def _perfil_valido(perfil: str) -> bool:
     return perfil in ("admin", "comum", "cliente")
@@ -85,24 +54,39 @@ def _perfil_valido(perfil: str) -> bool:
 # -------------------- API pública --------------------
 
 def autenticar(username: str, senha: str):
+    row = _conferir_senha(username, senha)
+    return {"username": row["username"], "perfil": row["perfil"]}
+
+def _conferir_senha(username: str, senha: str) -> dict:
+    """Registro atual do usuário (lido sem cache) se as credenciais conferem; senão AppError."""
     if not username or not senha:
         raise AppError("Credenciais vazias.", user_message="Informe usuário e senha.")
 
-    with get_conn() as conn:
-        row = conn.execute(
-            "SELECT username, senha_hash, perfil, ativo FROM usuarios WHERE username=?",
-            (username,)
-        ).fetchone()
+    row = _carregar_usuario(username)
 
     if not row:
         raise AppError("Usuário não encontrado.", user_message="Usuário ou senha inválidos.")
     if row["ativo"] in (0, "0", False):
         raise AppError("Usuário inativo.", user_message="Este usuário está inativo.")
-    if _hash_senha(senha) != row["senha_hash"]:
+    if not senhas.verificar(senha, row["senha_hash"]):
         raise AppError("Senha inválida.", user_message="Usuário ou senha inválidos.")
 
-    return {"username": row["username"], "perfil": row["perfil"]}
+    if senhas.precisa_rehash(row["senha_hash"]):
+        _rehash(username, senha, row["senha_hash"])
+        row = _carregar_usuario(username) or row
+
+    return row
+
+@com_retry
+def _rehash(username: str, senha: str, hash_antigo: str):
+    """Troca hash legado (SHA-256) ou de custo antigo pelo KDF atual, no login."""
+    with get_conn() as conn:
+        # só troca se ninguém alterou a senha nesse meio tempo
+        conn.execute("UPDATE usuarios SET senha_hash=? WHERE username=? AND senha_hash=?",
+                     (_hash_senha(senha), username, hash_antigo))
+    invalidar_cache(username)
 
+@com_retry
 def criar_usuario(username: str, senha: str, perfil: str = "comum", cliente_cpf: str = None) -> bool:
     if not username or not senha:
         raise AppError("Username/senha obrigatórios.", user_message="Informe username e senha.")
@@ -122,16 +106,9 @@ def criar_usuario(username: str, senha: str, perfil: str = "comum", cliente_cpf:
            "VALUES (?,?,?,?,1, CURRENT_TIMESTAMP)")
     args = (username, senha_hash, perfil, cliente_cpf if perfil == "cliente" else None)
 
-    try:
-        with get_conn() as conn:
-            conn.execute(sql, args)
-    except sqlite3.IntegrityError as e:
-        if "CHECK constraint failed" in str(e) and "perfil" in str(e):
-            _migrate_perfil_check()
-            with get_conn() as conn:
-                conn.execute(sql, args)
-        else:
-            raise
+    with get_conn() as conn:
+        conn.execute(sql, args)
+    invalidar_cache(username)
     return True
 
 def criar_usuario_cliente(username: str, senha: str, cpf: str) -> bool:
@@ -139,11 +116,9 @@ def criar_usuario_cliente(username: str, senha: str, cpf: str) -> bool:
 
 def listar_usuarios():
     with get_conn() as conn:
-        rows = conn.execute(
-            "SELECT username, perfil, cliente_cpf, ativo FROM usuarios ORDER BY username"
-        ).fetchall()
-    return rows
+        return consultar(conn, Usuario, f"SELECT {Usuario.COLUNAS} FROM usuarios ORDER BY username")
 
+@com_retry
 def editar_usuario(username: str, **campos) -> bool:
     if not _usuario_existe(username):
         return False
@@ -152,8 +127,7 @@ def editar_usuario(username: str, **campos) -> bool:
     if "senha" in campos and campos["senha"]:
         sets.append("senha_hash=?"); params.append(_hash_senha(campos["senha"]))
 
-    with get_conn() as conn:
-        row = conn.execute("SELECT perfil, cliente_cpf FROM usuarios WHERE username=?", (username,)).fetchone()
+    row = _usuario_cache(username)
     perfil_atual = row["perfil"] if row else None
     cliente_cpf_atual = row["cliente_cpf"] if row else None
 
@@ -189,13 +163,75 @@ def editar_usuario(username: str, **campos) -> bool:
     params.append(username)
     with get_conn() as conn:
         cur = conn.execute(f"UPDATE usuarios SET {', '.join(sets)} WHERE username=?", params)
-        return cur.rowcount > 0
+    invalidar_cache(username)
+    return cur.rowcount > 0
 
+@com_retry
 def excluir_usuario(username: str) -> bool:
     with get_conn() as conn:
         cur = conn.execute("DELETE FROM usuarios WHERE username=?", (username,))
-        return cur.rowcount > 0
-
-# compat com app.py antigo
-def _hash(senha: str) -> str:
-    return _hash_senha(senha)
+    invalidar_cache(username)
+    return cur.rowcount > 0
+
+# -------------------- tokens --------------------
+# Para scripts e API: autentica uma vez (KDF) e reusa o token nas chamadas seguintes.
+# Formato <payload>.<assinatura>, ambos base64url; payload = {"u": username, "exp": epoch,
+# "h": digest da senha_hash}. O perfil não vai no token: validar_token() relê o usuário
+# no banco (sem cache), então inativação e troca de perfil valem na hora e troca de
+# senha invalida os tokens emitidos antes dela.
+
+TOKEN_TTL_S = int(os.environ.get("SEGU_TOKEN_TTL_S", str(8 * 3600)))
+_segredos: dict = {}  # DB_PATH -> chave; SEGU_TOKEN_SEGREDO tem precedência
+
+def _segredo_tokens() -> bytes:
+    env = os.environ.get("SEGU_TOKEN_SEGREDO")
+    if env:
+        return env.encode()
+    chave = _segredos.get(db.DB_PATH)
+    if chave is None:
+        with get_conn() as conn:
+            row = conn.execute("SELECT valor FROM segredos WHERE nome='token'").fetchone()
+        if row is None:
+            raise AppError("Segredo de tokens ausente.", user_message="Tokens indisponíveis; rode as migrações.")
+        chave = _segredos[db.DB_PATH] = bytes.fromhex(row[0])
+    return chave
+
+def _b64(b: bytes) -> str:
+    return base64.urlsafe_b64encode(b).rstrip(b"=").decode()
+
+def _de_b64(s: str) -> bytes:
+    return base64.urlsafe_b64decode(s + "=" * (-len(s) % 4))
+
+def _assinar(dados: bytes) -> str:
+    return _b64(hmac.new(_segredo_tokens(), dados, hashlib.sha256).digest())
+
+def _digest_senha(senha_hash: str) -> str:
+    return _assinar(senha_hash.encode())[:12]
+
+def emitir_token(username: str, senha: str, validade_s: int | None = None) -> str:
+    """Autentica e devolve um token assinado (HMAC-SHA256) válido por validade_s segundos."""
+    row = _conferir_senha(username, senha)
+    exp = int(time.time()) + (validade_s or TOKEN_TTL_S)
+    payload = _b64(json.dumps({"u": row["username"], "exp": exp, "h": _digest_senha(row["senha_hash"])},
+                              separators=(",", ":")).encode())
+    return f"{payload}.{_assinar(payload.encode())}"
+
+def validar_token(token: str) -> dict:
+    """Sessão ({username, perfil}) do token, ou AppError se inválido, expirado ou revogado."""
+    invalido = AppError("Token inválido.", user_message="Token inválido ou expirado; autentique de novo.")
+    try:
+        payload, assinatura = token.strip().split(".")
+        dados = json.loads(_de_b64(payload))
+    except ValueError:
+        raise invalido from None
+    if not isinstance(dados, dict):
+        raise invalido
+    if not hmac.compare_digest(assinatura, _assinar(payload.encode())):
+        raise invalido
+    if dados.get("exp", 0) < time.time():
+        raise invalido
+    row = _carregar_usuario(str(dados.get("u", "")))
+    if not row or row["ativo"] in (0, "0", False) or not hmac.compare_digest(dados.get("h", ""),
+                                                                         _digest_senha(row["senha_hash"])):
+        raise invalido
+    return {"username": row["username"], "perfil": row["perfil"]}
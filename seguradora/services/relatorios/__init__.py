@@ -0,0 +1,342 @@
+import csv, io, json
+from itertools import chain, islice
+from pathlib import Path
+from datetime import datetime
+from ... import db
+from ...db import get_conn, com_retry
+from ...core import validators as val
+from ...core.exceptions import AppError
+
+EXPORT_DIR = Path("exports")  # criado no primeiro export, não no import
+
+# Relatórios 1, 3 e 4 leem os agregados materializados (migracoes._DDL_AGREGADOS),
+# mantidos por triggers: custo proporcional ao nº de meses/status, não de linhas.
+
+def receita_mensal_prevista():
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT ym, ROUND(receita, 2) AS receita FROM agg_receita_mensal "
+            "WHERE qtd > 0 ORDER BY ym DESC"
+        ).fetchall()
+    return rows
+
+def top_clientes_por_valor_segurado(limit=5, workers: int | None = None):
+    """
+    Titulares com maior soma de valor_base nas apólices ativas. Com workers > 1, o
+    cálculo é particionado por faixa de titular em processos (ver particionado.py)
+    e devolve dicts com as mesmas chaves.
+    """
+    if workers and workers > 1:
+        return _top_clientes_particionado(limit, workers)
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT s.titular AS cliente, SUM(s.valor_base) AS total "
+            "FROM apolices a JOIN seguros s ON s.id=a.seguro_id "
+            "WHERE a.status='Ativa' GROUP BY s.titular ORDER BY total DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+    return rows
+
+def _top_clientes_particionado(limit: int, workers: int):
+    import heapq
+    from .. import particionado
+    # fatias por faixa de s.titular (a chave do GROUP BY, com índice): cada titular cai
+    # numa fatia só, então o top-K de cada uma basta e o merge é exato
+    with get_conn() as conn:
+        cortes = particionado.cortes(conn, "seguros", "titular", workers * particionado.FATIAS_POR_WORKER)
+    consultas = []
+    for ini, fim in particionado.intervalos(cortes):
+        cond, params = particionado.filtro("s.titular", ini, fim)
+        consultas.append((
+            "SELECT s.titular, SUM(s.valor_base) AS total FROM seguros s "
+            f"JOIN apolices a ON a.seguro_id = s.id AND a.status = 'Ativa' WHERE {cond} "
+            "GROUP BY s.titular ORDER BY total DESC LIMIT ?", (*params, limit)))
+    parciais = particionado.mapear(consultas, workers)
+    melhores = heapq.nlargest(limit, (r for parte in parciais for r in parte), key=lambda r: r[1])
+    return [{"cliente": titular, "total": total} for titular, total in melhores]
+
+def sinistros_por_status():
+    with get_conn() as conn:
+        return conn.execute(
+            "SELECT status, qtd FROM agg_sinistros_status WHERE qtd > 0 ORDER BY status"
+        ).fetchall()
+
+def sinistros_por_periodo(ym_ini: str, ym_fim: str, por: str = "registro"):
+    """
+    por="registro": mês em que o sinistro foi lançado (criado_em), via agregado.
+    por="ocorrencia": mês da data do sinistro (data), range scan em idx_sinistros_data_iso.
+    """
+    for ym in (ym_ini, ym_fim):
+        if not val.ym_valido(ym):
+            raise AppError(f"Período inválido: {ym}", user_message="Período inválido. Use YYYY-MM.")
+    with get_conn() as conn:
+        if por == "ocorrencia":
+            return conn.execute(
+                "SELECT substr(data_iso, 1, 7) AS ym, COUNT(*) AS qtd FROM sinistros "
+                "WHERE data_iso >= ? AND data_iso < ? GROUP BY ym ORDER BY ym",
+                (f"{ym_ini}-01", _proximo_mes(ym_fim) + "-01")
+            ).fetchall()
+        return conn.execute(
+            "SELECT ym, qtd FROM agg_sinistros_mes "
+            "WHERE ym BETWEEN ? AND ? AND qtd > 0 ORDER BY ym",
+            (ym_ini, ym_fim)
+        ).fetchall()
+
+def _proximo_mes(ym: str) -> str:
+    ano, mes = int(ym[:4]), int(ym[5:7])
+    return f"{ano + mes // 12:04d}-{mes % 12 + 1:02d}"
+
+@com_retry
+def reconstruir_agregados():
+    """Recalcula os agregados a partir das tabelas base (use se suspeitar de desvio)."""
+    with get_conn() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        from ... import migracoes
+        migracoes.reconstruir_agregados(conn)
+
+# -------------------- exportação (streaming) --------------------
+# rows pode ser lista, gerador ou cursor sqlite3: as linhas são consumidas em blocos
+# (fetchmany) e escritas através de um buffer fixo, então a memória não cresce com o
+# tamanho do resultado. compressao: None | "gzip" | "zstd" (zstd requer 'zstandard').
+
+LOTE_EXPORT = 5000
+BUFFER_EXPORT = 1 << 20  # 1 MiB
+_SUFIXOS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+TABELAS_EXPORTAVEIS = ("clientes", "seguros", "apolices", "sinistros", "auditoria")
+
+def _destino(arquivo: str) -> Path:
+    EXPORT_DIR.mkdir(exist_ok=True)
+    return EXPORT_DIR / arquivo
+
+def _abrir(path: Path, compressao: str | None):
+    if compressao not in _SUFIXOS:
+        raise AppError(f"Compressão inválida: {compressao}", user_message="Compressão deve ser gzip ou zstd.")
+    if compressao == "gzip":
+        import gzip
+        raw = io.BufferedWriter(gzip.open(path, "wb", compresslevel=6), BUFFER_EXPORT)
+    elif compressao == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise AppError("zstandard não instalado.",
+                           user_message="Compressão zstd requer o pacote 'zstandard' (pip install zstandard).")
+        raw = io.BufferedWriter(zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb")), BUFFER_EXPORT)
+    else:
+        raw = open(path, "wb", buffering=BUFFER_EXPORT)
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+def _blocos(rows, n: int = LOTE_EXPORT):
+    """Gera listas de até n linhas; usa fetchmany quando rows é um cursor."""
+    if hasattr(rows, "fetchmany"):
+        while True:
+            bloco = rows.fetchmany(n)
+            if not bloco:
+                return
+            yield bloco
+    it = iter(rows)
+    while True:
+        bloco = list(islice(it, n))
+        if not bloco:
+            return
+        yield bloco
+
+def _cabecalho(rows, first):
+    if isinstance(first, dict) or hasattr(first, "keys"):
+        return list(first.keys())
+    desc = getattr(rows, "description", None)
+    return [d[0] for d in desc] if desc else None
+
+def _primeiro(blocos):
+    for bloco in blocos:
+        return bloco[0], chain([bloco], blocos)
+    return None, iter(())
+
+def export_csv(nome: str, rows, compressao: str | None = None):
+    path = _destino(f"{nome}.csv{_SUFIXOS.get(compressao, '')}")
+    first, blocos = _primeiro(_blocos(rows))
+    with _abrir(path, compressao) as f:
+        if first is None:
+            return str(path)
+        w = csv.writer(f)
+        headers = _cabecalho(rows, first)
+        if isinstance(first, dict):
+            w.writerow(headers)
+            for bloco in blocos:
+                w.writerows([r.get(h) for h in headers] for r in bloco)
+        elif headers is not None:
+            w.writerow(headers)
+            for bloco in blocos:
+                w.writerows(bloco)  # sqlite3.Row / tupla já iteram na ordem das colunas
+        elif isinstance(first, (tuple, list)):
+            for bloco in blocos:
+                w.writerows(bloco)
+        else:
+            for bloco in blocos:
+                w.writerows([r] for r in bloco)
+    return str(path)
+
+def export_json(nome: str, rows, compressao: str | None = None):
+    """Exporta em JSON Lines (um objeto por linha), escrito incrementalmente."""
+    path = _destino(f"{nome}.jsonl{_SUFIXOS.get(compressao, '')}")
+    first, blocos = _primeiro(_blocos(rows))
+    dumps = json.JSONEncoder(ensure_ascii=False, default=str).encode
+    with _abrir(path, compressao) as f:
+        if first is None:
+            return str(path)
+        headers = None if isinstance(first, dict) else _cabecalho(rows, first)
+        for bloco in blocos:
+            if headers is not None:
+                f.write("".join(dumps(dict(zip(headers, r))) + "\n" for r in bloco))
+            else:
+                f.write("".join(dumps(r) + "\n" for r in bloco))
+    return str(path)
+
+# -------------------- exportação colunar (Parquet / Arrow IPC) --------------------
+# Dependência opcional: pyarrow. Colunas tipadas (datas, REAL, categorias com
+# dictionary encoding), um row group por bloco lido do cursor.
+
+LINHAS_POR_GRUPO = 65536
+FORMATOS_COLUNARES = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# tipos: int, float, str, cat (dictionary), data (DD/MM/AAAA -> date32), ts (timestamp), bool
+ESQUEMAS_COLUNARES = {
+    "clientes": [("id", "int"), ("nome", "str"), ("cpf", "str"), ("data_nascimento", "data"),
+                 ("endereco", "str"), ("telefone", "str"), ("email", "str"), ("criado_em", "ts")],
+    "seguros": [("id", "int"), ("tipo", "cat"), ("titular", "str"), ("valor_base", "float"),
+                ("modelo", "str"), ("ano", "int"), ("placa", "str"), ("endereco_imovel", "str"),
+                ("beneficiarios", "str"), ("criado_em", "ts")],
+    "apolices": [("id", "int"), ("numero", "str"), ("seguro_id", "int"), ("tipo", "cat"),
+                 ("titular", "str"), ("valor_mensal", "float"), ("status", "cat"), ("criado_em", "ts")],
+    "sinistros": [("id", "int"), ("apolice_numero", "str"), ("descricao", "str"), ("data", "data"),
+                  ("status", "cat"), ("criado_em", "ts")],
+    "auditoria": [("id", "int"), ("ts", "ts"), ("username", "str"), ("operacao", "cat"),
+                  ("entidade", "cat"), ("entidade_id", "str"), ("ok", "bool"), ("detalhes", "str")],
+}
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        raise AppError("pyarrow não instalado.",
+                       user_message="Exportação Parquet/Arrow requer o pacote 'pyarrow' (pip install pyarrow).")
+    return pa, pc
+
+def _tipo_arrow(pa, tipo: str):
+    return {
+        "int": pa.int64(), "float": pa.float64(), "str": pa.string(), "bool": pa.bool_(),
+        "cat": pa.dictionary(pa.int32(), pa.string()), "data": pa.date32(), "ts": pa.timestamp("s"),
+    }[tipo]
+
+def _coluna(pa, pc, valores, tipo: str, dicionario: list | None = None):
+    if tipo == "data":
+        return pc.cast(pc.strptime(pa.array(valores, pa.string()), format="%d/%m/%Y", unit="s",
+                                   error_is_null=True), pa.date32())
+    if tipo == "ts":
+        return pc.strptime(pa.array(valores, pa.string()), format="%Y-%m-%d %H:%M:%S", unit="s",
+                           error_is_null=True)
+    if tipo == "cat":
+        arr = pa.array(valores, pa.string())
+        if dicionario is None:
+            return arr.dictionary_encode()
+        # um dicionário por arquivo que só cresce: os índices já gravados continuam
+        # valendo e o writer IPC emite só o delta (o formato de arquivo não aceita
+        # trocar o dicionário entre record batches)
+        vistos = set(dicionario)
+        dicionario.extend(v for v in pc.unique(arr.drop_null()).to_pylist() if v not in vistos)
+        valores_dic = pa.array(dicionario, pa.string())
+        return pa.DictionaryArray.from_arrays(pc.index_in(arr, value_set=valores_dic), valores_dic)
+    if tipo == "bool":
+        return pa.array(valores, pa.int8()).cast(pa.bool_())  # SQLite guarda 0/1
+    return pa.array(valores, _tipo_arrow(pa, tipo))
+
+def export_colunar(nome: str, rows, formato: str = "parquet", esquema: list | None = None,
+                   linhas_por_grupo: int = LINHAS_POR_GRUPO):
+    """
+    Exporta em Parquet (zstd) ou Arrow IPC. `esquema` = [(coluna, tipo)] na ordem das
+    colunas de `rows`; sem esquema, os tipos são inferidos do primeiro bloco.
+    """
+    if formato not in FORMATOS_COLUNARES:
+        raise AppError(f"Formato inválido: {formato}", user_message="Formato deve ser parquet ou arrow.")
+    pa, pc = _pyarrow()
+    path = _destino(f"{nome}{FORMATOS_COLUNARES[formato]}")
+    if hasattr(rows, "fetchmany"):
+        rows.arraysize = linhas_por_grupo
+
+    writer = None
+    schema = pa.schema([(c, _tipo_arrow(pa, t)) for c, t in esquema]) if esquema else None
+    dicionarios = [[] for _ in esquema or ()]  # um por coluna "cat", mantido entre blocos
+    try:
+        for bloco in _blocos(rows, linhas_por_grupo):
+            first = bloco[0]
+            if isinstance(first, dict):
+                nomes = list(first.keys()) if esquema is None else [c for c, _ in esquema]
+                colunas = [[r.get(c) for r in bloco] for c in nomes]
+            else:
+                nomes = [c for c, _ in esquema] if esquema else \
+                    (_cabecalho(rows, first) or [f"col{i}" for i in range(len(first))])
+                colunas = [list(c) for c in zip(*bloco)]
+            if esquema:
+                arrays = [_coluna(pa, pc, v, t, d) for v, (_, t), d in zip(colunas, esquema, dicionarios)]
+            else:
+                arrays = [pa.array(v) for v in colunas]
+            tabela = pa.Table.from_arrays(arrays, names=nomes)
+            if schema is None:
+                schema = tabela.schema
+            elif tabela.schema != schema:
+                tabela = tabela.cast(schema)
+            if writer is None:
+                writer = _novo_writer(pa, path, formato, schema)
+            # parquet: cada bloco vira um row group; arrow: um record batch
+            writer.write_table(tabela, row_group_size=linhas_por_grupo) if formato == "parquet" \
+                else writer.write_table(tabela)
+        if writer is None:
+            writer = _novo_writer(pa, path, formato, schema or pa.schema([]))  # arquivo válido, sem linhas
+    finally:
+        if writer is not None:
+            writer.close()
+    return str(path)
+
+def _novo_writer(pa, path, formato, schema):
+    if formato == "parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(path, schema, compression="zstd")
+    return pa.ipc.new_file(str(path), schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+
+def export_tabela(tabela: str, formato: str = "csv", compressao: str | None = None, nome: str | None = None):
+    """Exporta uma tabela inteira direto do cursor, sem materializar as linhas."""
+    if tabela not in TABELAS_EXPORTAVEIS:
+        raise AppError(f"Tabela não exportável: {tabela}",
+                       user_message=f"Tabela deve ser uma de: {', '.join(TABELAS_EXPORTAVEIS)}.")
+    nome = nome or f"{tabela}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    if formato in FORMATOS_COLUNARES:
+        esquema = ESQUEMAS_COLUNARES[tabela]
+        with get_conn() as conn:
+            cur = conn.execute(f"SELECT {', '.join(c for c, _ in esquema)} FROM {tabela} ORDER BY id")
+            return export_colunar(nome, cur, formato, esquema)
+    exportar = {"csv": export_csv, "jsonl": export_json, "json": export_json}.get(formato)
+    if exportar is None:
+        raise AppError(f"Formato inválido: {formato}", user_message="Formato deve ser csv, jsonl, parquet ou arrow.")
+    with get_conn() as conn:
+        cur = conn.execute(f"SELECT * FROM {tabela} ORDER BY id")
+        cur.arraysize = LOTE_EXPORT
+        return exportar(nome, cur, compressao)
+
+def _main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(prog="python -m seguradora.services.relatorios")
+    sub = ap.add_subparsers(dest="comando", required=True)
+    sub.add_parser("rebuild", help="recalcula os agregados materializados")
+    exp = sub.add_parser("export", help="exporta uma tabela inteira")
+    exp.add_argument("tabela", choices=TABELAS_EXPORTAVEIS)
+    exp.add_argument("--formato", choices=("csv", "jsonl", *FORMATOS_COLUNARES), default="csv")
+    exp.add_argument("--compressao", choices=("gzip", "zstd"), help="só para csv/jsonl")
+    exp.add_argument("--nome", help="nome do arquivo (sem extensão)")
+    args = ap.parse_args(argv)
+
+    db.init_schema()
+    if args.comando == "rebuild":
+        reconstruir_agregados()
+        print("Agregados reconstruídos.")
+    else:
+        print(export_tabela(args.tabela, args.formato, args.compressao, args.nome))
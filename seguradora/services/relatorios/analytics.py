@@ -0,0 +1,217 @@
+"""
+Análises vetorizadas (NumPy) que não cabem num GROUP BY: projeção de prêmios,
+sinistralidade por tipo e percentis de valor_base / valor_mensal.
+
+    from seguradora.services.relatorios import analytics
+    analytics.projecao_premios(meses=12)
+    analytics.sinistralidade_por_tipo()
+    analytics.distribuicao_valores(percentis=(50, 90, 99))
+
+As colunas de apolices, seguros e sinistros são lidas em blocos (fetchmany) para arrays
+pré-alocados, numa conexão própria somente leitura e num snapshot só; a memória fica
+nas colunas finais (~22 bytes por apólice) mais um bloco. O que foi lido fica em cache
+até o banco mudar: a chave é o PRAGMA data_version dessa conexão, que muda a cada
+commit de qualquer outra. data_version é do banco, não da tabela, então qualquer
+escrita invalida as três.
+
+Dependência opcional: numpy.
+"""
+import os
+import sqlite3
+import threading
+from datetime import date
+
+from ... import db
+from ...core.exceptions import AppError
+
+LOTE = 65536
+TIPOS = ("Automóvel", "Residencial", "Vida")
+PERCENTIS = (5, 25, 50, 75, 90, 95, 99)
+
+# tipo/status viram códigos no próprio SQL: cada bloco chega só com números e vira
+# uma matriz de uma vez (np.array), sem laço por linha em Python
+_TIPO_SQL = "CASE tipo " + " ".join(f"WHEN '{t}' THEN {i}" for i, t in enumerate(TIPOS)) + " ELSE -1 END"
+_MES_SQL = ("COALESCE(CAST(substr(criado_em, 1, 4) AS INTEGER) * 12 "
+            "+ CAST(substr(criado_em, 6, 2) AS INTEGER) - 1, -1)")  # meses desde o ano 0; -1 = sem data
+
+# tabela -> (SELECT, [(coluna, dtype)])
+_CARGAS = {
+    "apolices": (f"SELECT id, {_TIPO_SQL}, status = 'Ativa', valor_mensal, {_MES_SQL} FROM apolices ORDER BY id",
+                 (("id", "i8"), ("tipo", "i1"), ("ativa", "?"), ("valor_mensal", "f8"), ("mes", "i4"))),
+    "seguros": (f"SELECT {_TIPO_SQL}, valor_base FROM seguros ORDER BY id",
+                (("tipo", "i1"), ("valor_base", "f8"))),
+    "sinistros": ("SELECT COALESCE(a.id, 0), s.status = 'Aberto' FROM sinistros s "
+                  "LEFT JOIN apolices a ON a.numero = s.apolice_numero ORDER BY s.id",
+                  (("apolice_id", "i8"), ("aberto", "?"))),
+}
+
+_lock = threading.Lock()
+_conn: sqlite3.Connection | None = None
+_conn_path: str | None = None
+_versao: int | None = None
+_cache: dict[str, dict] = {}
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise AppError("numpy não instalado.",
+                       user_message="As análises vetorizadas requerem o pacote 'numpy' (pip install numpy).")
+    return np
+
+def _conexao() -> sqlite3.Connection:
+    global _conn, _conn_path
+    path = os.path.abspath(db.DB_PATH)
+    if _conn is None or _conn_path != path:
+        if _conn is not None:
+            _conn.close()
+        _conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False,
+                                isolation_level=None)
+        _conn_path = path
+        _cache.clear()
+    return _conn
+
+def _carregar(np, conn, tabela: str) -> dict:
+    sql, colunas = _CARGAS[tabela]
+    n = conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+    saida = {nome: np.empty(n, dtype=dt) for nome, dt in colunas}
+    cur = conn.execute(sql)
+    i = 0
+    while True:
+        bloco = cur.fetchmany(LOTE)
+        if not bloco:
+            break
+        m = np.array(bloco, dtype=np.float64)  # ids < 2**53: exatos em float64
+        for j, (nome, _) in enumerate(colunas):
+            saida[nome][i:i + len(bloco)] = m[:, j]
+        i += len(bloco)
+    return saida
+
+def colunas(*tabelas: str) -> dict[str, dict]:
+    """
+    {tabela: {coluna: ndarray}} conforme _CARGAS, do cache se o banco não mudou.
+    Os arrays são compartilhados entre chamadas: não altere.
+    """
+    global _versao
+    np = _numpy()
+    with _lock:
+        conn = _conexao()
+        conn.execute("BEGIN")
+        try:
+            conn.execute("SELECT 1 FROM sqlite_master LIMIT 1")  # abre o snapshot de leitura
+            versao = conn.execute("PRAGMA data_version").fetchone()[0]
+            if versao != _versao:
+                _cache.clear()
+                _versao = versao
+            for tabela in tabelas:
+                if tabela not in _cache:
+                    _cache[tabela] = _carregar(np, conn, tabela)
+        finally:
+            conn.execute("COMMIT")
+        return {t: _cache[t] for t in tabelas}
+
+def limpar_cache():
+    """Solta os arrays e fecha a conexão de leitura."""
+    global _conn, _conn_path, _versao
+    with _lock:
+        _cache.clear()
+        _versao = None
+        if _conn is not None:
+            _conn.close()
+        _conn = _conn_path = None
+
+def _mes_atual() -> int:
+    hoje = date.today()
+    return hoje.year * 12 + hoje.month - 1
+
+def _ym(mes: int) -> str:
+    return f"{mes // 12:04d}-{mes % 12 + 1:02d}"
+
+def projecao_premios(meses: int = 12, janela: int = 12) -> list[dict]:
+    """
+    Prêmio mensal previsto por tipo nos próximos `meses`, partindo da carteira ativa:
+    P(k) = P(k-1) * (1 - c) + N, onde c = cancelamentos por apólice-mês de exposição
+    desde a emissão e N = prêmio médio emitido por mês nos últimos `janela` meses
+    completos. Sem data de cancelamento, a exposição das canceladas é um teto e c sai
+    otimista. Linhas (ym, tipo, premio); tipo "Total" soma os três.
+    """
+    if meses < 1 or janela < 1:
+        raise AppError(f"Parâmetros inválidos: meses={meses}, janela={janela}",
+                       user_message="Meses e janela devem ser maiores que zero.")
+    np = _numpy()
+    ap = colunas("apolices")["apolices"]
+    k = len(TIPOS)
+    ok = ap["tipo"] >= 0
+    tipo, ativa, valor, mes = ap["tipo"][ok], ap["ativa"][ok], ap["valor_mensal"][ok], ap["mes"][ok]
+    atual = _mes_atual()
+
+    p0 = np.bincount(tipo[ativa], weights=valor[ativa], minlength=k)
+    datado = mes >= 0
+    exposicao = np.bincount(tipo[datado], weights=np.maximum(atual - mes[datado] + 1, 1), minlength=k)
+    canceladas = np.bincount(tipo[datado & ~ativa], minlength=k)
+    c = np.divide(canceladas, exposicao, out=np.zeros(k), where=exposicao > 0)
+    recentes = datado & (mes >= atual - janela) & (mes < atual)
+    novos = np.bincount(tipo[recentes], weights=valor[recentes], minlength=k) / janela
+
+    passos = np.arange(1, meses + 1)[:, None]  # (meses, 1) x (k,) -> (meses, k)
+    q = (1.0 - c) ** passos
+    soma_geometrica = np.where(c > 0, (1.0 - q) / np.where(c > 0, c, 1.0), passos)
+    premio = p0 * q + novos * soma_geometrica
+
+    linhas = []
+    for i in range(meses):
+        ym = _ym(atual + i + 1)
+        linhas.extend({"ym": ym, "tipo": t, "premio": round(float(premio[i, j]), 2)} for j, t in enumerate(TIPOS))
+        linhas.append({"ym": ym, "tipo": "Total", "premio": round(float(premio[i].sum()), 2)})
+    return linhas
+
+def sinistralidade_por_tipo() -> list[dict]:
+    """
+    Por tipo: apólices, sinistros, abertos, sinistros por apólice e % de apólices com
+    ao menos um sinistro. Sinistros de apólice inexistente ficam de fora.
+    """
+    np = _numpy()
+    d = colunas("apolices", "sinistros")
+    ap, si = d["apolices"], d["sinistros"]
+    k = len(TIPOS)
+    ids = ap["id"]  # ORDER BY id: ordenado, então o join é um searchsorted
+    pos = np.searchsorted(ids, si["apolice_id"])
+    casado = pos < ids.size
+    casado[casado] = ids[pos[casado]] == si["apolice_id"][casado]
+    pos, aberto = pos[casado], si["aberto"][casado]
+    tipo_sin = ap["tipo"][pos]
+    ok = tipo_sin >= 0
+
+    apolices = np.bincount(ap["tipo"][ap["tipo"] >= 0], minlength=k)
+    sinistros = np.bincount(tipo_sin[ok], minlength=k)
+    abertos = np.bincount(tipo_sin[ok & aberto], minlength=k)
+    com_sinistro = np.bincount(ap["tipo"][np.unique(pos[ok])], minlength=k)
+    por_apolice = np.divide(sinistros, apolices, out=np.zeros(k), where=apolices > 0)
+    pct = np.divide(100.0 * com_sinistro, apolices, out=np.zeros(k), where=apolices > 0)
+    return [{"tipo": t, "apolices": int(apolices[j]), "sinistros": int(sinistros[j]), "abertos": int(abertos[j]),
+             "sinistros_por_apolice": round(float(por_apolice[j]), 4),
+             "apolices_com_sinistro_pct": round(float(pct[j]), 2)}
+            for j, t in enumerate(TIPOS)]
+
+def distribuicao_valores(percentis=PERCENTIS) -> list[dict]:
+    """
+    Percentis de seguros.valor_base (todos os seguros) e de apolices.valor_mensal (só as
+    ativas), no geral ("Todos") e por tipo. Linhas (coluna, tipo, n, media, p5, p25, ...).
+    """
+    np = _numpy()
+    p = np.asarray(percentis, dtype=np.float64)
+    if p.ndim != 1 or p.size == 0 or ((p < 0) | (p > 100)).any():
+        raise AppError(f"Percentis inválidos: {percentis}", user_message="Percentis devem estar entre 0 e 100.")
+    d = colunas("seguros", "apolices")
+    se, ap = d["seguros"], d["apolices"]
+    series = (("valor_base", se["tipo"], se["valor_base"]),
+              ("valor_mensal", ap["tipo"][ap["ativa"]], ap["valor_mensal"][ap["ativa"]]))
+    linhas = []
+    for coluna, tipo, valores in series:
+        for nome, v in (("Todos", valores), *((t, valores[tipo == j]) for j, t in enumerate(TIPOS))):
+            linha = {"coluna": coluna, "tipo": nome, "n": int(v.size),
+                     "media": round(float(v.mean()), 2) if v.size else None}
+            q = np.percentile(v, p) if v.size else [None] * p.size
+            linha.update({f"p{x:g}": None if y is None else round(float(y), 2) for x, y in zip(p, q)})
+            linhas.append(linha)
+    return linhas
@@ -0,0 +1,121 @@
+"""
+Hash de senhas com KDF do hashlib (scrypt por padrão, PBKDF2-SHA256 como alternativa),
+com sal aleatório e custo ajustável. Formatos gravados em usuarios.senha_hash:
+
+    scrypt$<n>$<r>$<p>$<sal>$<hash>          (sal/hash em base64)
+    pbkdf2_sha256$<iteracoes>$<sal>$<hash>
+    <64 hex>                                  legado: SHA-256 sem sal
+
+O custo vem de SEGU_KDF / SEGU_SCRYPT_N / SEGU_SCRYPT_R / SEGU_SCRYPT_P /
+SEGU_PBKDF2_ITER. Hashes legados ou com custo diferente do atual são refeitos
+no próximo login bem-sucedido (ver auth.autenticar). calibrar() acha o maior
+custo que cabe num orçamento de latência.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import time
+
+ALGORITMOS = ("scrypt", "pbkdf2_sha256")
+
+config = {
+    "algoritmo": os.environ.get("SEGU_KDF", "scrypt"),
+    "n": int(os.environ.get("SEGU_SCRYPT_N", str(2 ** 14))),
+    "r": int(os.environ.get("SEGU_SCRYPT_R", "8")),
+    "p": int(os.environ.get("SEGU_SCRYPT_P", "1")),
+    "iteracoes": int(os.environ.get("SEGU_PBKDF2_ITER", "200000")),
+}
+
+_SAL_BYTES = 16
+_DKLEN = 32
+
+def configurar(**custo):
+    for k, v in custo.items():
+        if k not in config:
+            raise ValueError(f"parâmetro de KDF desconhecido: {k}")
+        config[k] = v
+    if config["algoritmo"] not in ALGORITMOS:
+        raise ValueError(f"algoritmo deve ser um de: {', '.join(ALGORITMOS)}")
+
+def _b64(b: bytes) -> str:
+    return base64.b64encode(b).decode("ascii").rstrip("=")
+
+def _unb64(s: str) -> bytes:
+    return base64.b64decode(s + "=" * (-len(s) % 4))
+
+def _scrypt(senha: str, sal: bytes, n: int, r: int, p: int) -> bytes:
+    # maxmem com folga: o scrypt precisa de ~128*n*r bytes
+    return hashlib.scrypt(senha.encode("utf-8"), salt=sal, n=n, r=r, p=p,
+                          maxmem=256 * n * r + (1 << 20), dklen=_DKLEN)
+
+def _pbkdf2(senha: str, sal: bytes, iteracoes: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", senha.encode("utf-8"), sal, iteracoes, dklen=_DKLEN)
+
+def gerar_hash(senha: str, **custo) -> str:
+    c = dict(config, **custo)
+    sal = os.urandom(_SAL_BYTES)
+    if c["algoritmo"] == "scrypt":
+        dk = _scrypt(senha, sal, c["n"], c["r"], c["p"])
+        return f"scrypt${c['n']}${c['r']}${c['p']}${_b64(sal)}${_b64(dk)}"
+    if c["algoritmo"] == "pbkdf2_sha256":
+        dk = _pbkdf2(senha, sal, c["iteracoes"])
+        return f"pbkdf2_sha256${c['iteracoes']}${_b64(sal)}${_b64(dk)}"
+    raise ValueError(f"algoritmo deve ser um de: {', '.join(ALGORITMOS)}")
+
+def eh_legado(armazenado: str) -> bool:
+    return "$" not in (armazenado or "")
+
+def verificar(senha: str, armazenado: str) -> bool:
+    if not armazenado:
+        return False
+    partes = armazenado.split("$")
+    try:
+        if partes[0] == "scrypt" and len(partes) == 6:
+            n, r, p = int(partes[1]), int(partes[2]), int(partes[3])
+            calculado = _scrypt(senha, _unb64(partes[4]), n, r, p)
+            return hmac.compare_digest(calculado, _unb64(partes[5]))
+        if partes[0] == "pbkdf2_sha256" and len(partes) == 4:
+            calculado = _pbkdf2(senha, _unb64(partes[2]), int(partes[1]))
+            return hmac.compare_digest(calculado, _unb64(partes[3]))
+    except ValueError:
+        return False
+    if eh_legado(armazenado):
+        calculado = hashlib.sha256(senha.encode("utf-8")).hexdigest()
+        return hmac.compare_digest(calculado, armazenado)
+    return False
+
+def precisa_rehash(armazenado: str) -> bool:
+    """True para hash legado ou gerado com algoritmo/custo diferente da config atual."""
+    if eh_legado(armazenado):
+        return True
+    partes = armazenado.split("$")
+    if partes[0] != config["algoritmo"]:
+        return True
+    if partes[0] == "scrypt":
+        return (int(partes[1]), int(partes[2]), int(partes[3])) != (config["n"], config["r"], config["p"])
+    return int(partes[1]) != config["iteracoes"]
+
+def medir_ms(repeticoes: int = 3, **custo) -> float:
+    """Latência média (ms) de um hash com o custo informado."""
+    h = gerar_hash("calibracao", **custo)
+    t = time.perf_counter()
+    for _ in range(repeticoes):
+        verificar("calibracao", h)
+    return (time.perf_counter() - t) * 1000 / repeticoes
+
+def calibrar(orcamento_ms: float, algoritmo: str | None = None) -> dict:
+    """
+    Maior custo (dobrando n do scrypt ou as iterações do PBKDF2) cuja verificação
+    cabe em `orcamento_ms` nesta máquina. Retorna o dict para configurar(**...).
+    """
+    algoritmo = algoritmo or config["algoritmo"]
+    if algoritmo == "scrypt":
+        n = 2 ** 10
+        while n < 2 ** 20 and medir_ms(algoritmo="scrypt", n=n * 2) <= orcamento_ms:
+            n *= 2
+        return {"algoritmo": "scrypt", "n": n, "r": config["r"], "p": config["p"]}
+    it = 10_000
+    while it < 10_000_000 and medir_ms(algoritmo="pbkdf2_sha256", iteracoes=it * 2) <= orcamento_ms:
+        it *= 2
+    return {"algoritmo": "pbkdf2_sha256", "iteracoes": it}
@@ -0,0 +1,81 @@
+"""
+Custo por linha de decodificar e formatar resultados: sqlite3.Row + acesso por chave
+(como as DAOs faziam) contra tupla + registro imutável (dao/registros.py).
+
+    python -m seguradora.tools.bench_registros [--linhas 1000000]
+
+Gera uma tabela apolices sintética num banco temporário e mede, separadamente,
+o fetch/decodificação de todas as linhas e a formatação com menu._fmt_apolice.
+"""
+import argparse
+import gc
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+def _gerar(conn, linhas: int):
+    conn.execute(
+        "CREATE TABLE apolices (id INTEGER PRIMARY KEY, numero TEXT, seguro_id INTEGER, tipo TEXT, "
+        "titular TEXT, valor_mensal REAL, status TEXT, criado_em TEXT, cliente_id INTEGER, extra TEXT)"
+    )
+    conn.execute(
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i+1 FROM n WHERE i < ?) "
+        "INSERT INTO apolices SELECT i, 'AP-' || (i % 5000) || '-' || i, i % 5000, "
+        "CASE i % 3 WHEN 0 THEN 'Vida' WHEN 1 THEN 'Automóvel' ELSE 'Residencial' END, "
+        "'Cliente ' || (i % 20000), (i % 997) * 1.5, CASE WHEN i % 10 THEN 'Ativa' ELSE 'Cancelada' END, "
+        "'2024-01-01 00:00:00', i % 20000, hex(randomblob(32)) FROM n",
+        (linhas,)
+    )
+    conn.commit()
+
+def _fmt_chave(a):
+    # o formatador antigo do menu, por chave
+    return f"Nº {a['numero']} | {a['tipo']} | Titular: {a['titular']} | Mensal: R${a['valor_mensal']:.2f} | {a['status']}"
+
+def _medir(fn):
+    # sem o GC: com 1M objetos vivos as coletas de geração dominam o tempo e variam entre
+    # execuções; o que interessa aqui é o custo por linha de cada representação
+    gc.collect()
+    gc.disable()
+    try:
+        t = time.perf_counter()
+        r = fn()
+        return r, time.perf_counter() - t
+    finally:
+        gc.enable()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m seguradora.tools.bench_registros")
+    ap.add_argument("--linhas", type=int, default=1_000_000)
+    args = ap.parse_args(argv)
+
+    from seguradora.dao.registros import Apolice
+    from seguradora.cli.menu import _fmt_apolice
+
+    path = os.path.join(tempfile.mkdtemp(prefix="segu_reg_"), "bench.db")
+    conn = sqlite3.connect(path)
+    print(f"gerando {args.linhas:,} apólices...", file=sys.stderr)
+    _gerar(conn, args.linhas)
+
+    antes_conn = sqlite3.connect(path)
+    antes_conn.row_factory = sqlite3.Row
+    rows, t_antes = _medir(lambda: antes_conn.execute("SELECT * FROM apolices").fetchall())
+    _, f_antes = _medir(lambda: [_fmt_chave(r) for r in rows])
+    del rows
+
+    depois_conn = sqlite3.connect(path)
+    sql = f"SELECT {Apolice.COLUNAS} FROM apolices"
+    regs, t_depois = _medir(lambda: list(map(Apolice._da_linha, depois_conn.execute(sql))))
+    _, f_depois = _medir(lambda: [_fmt_apolice(r) for r in regs])
+
+    n = args.linhas
+    print(f"{'':<28} {'decodificar':>12} {'formatar':>10} {'total':>10}   (ns/linha)")
+    for rotulo, t, f in (("SELECT * + sqlite3.Row", t_antes, f_antes),
+                         ("projeção + registro", t_depois, f_depois)):
+        print(f"{rotulo:<28} {t / n * 1e9:12.0f} {f / n * 1e9:10.0f} {(t + f) / n * 1e9:10.0f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
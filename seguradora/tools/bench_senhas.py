@@ -0,0 +1,66 @@
+"""
+Logins por segundo em cada custo de KDF, com logins concorrentes.
+
+    python -m seguradora.tools.bench_senhas [--threads 8] [--segundos 2] [--orcamento-ms 50]
+
+Roda auth.autenticar de ponta a ponta (cache de usuário + verificação) num banco
+temporário; o hash do KDF libera o GIL, então as threads medem concorrência real.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m seguradora.tools.bench_senhas")
+    ap.add_argument("--threads", type=int, default=os.cpu_count() or 4)
+    ap.add_argument("--segundos", type=float, default=2.0)
+    ap.add_argument("--orcamento-ms", type=float, default=None,
+                    help="além da grade fixa, calibra e mede o maior custo dentro do orçamento")
+    args = ap.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="segu_bench_")
+    os.environ["SEGU_DB"] = os.path.join(tmp, "bench.db")
+    from seguradora import db
+    db.init_schema()
+    from seguradora.services import auth, senhas
+
+    grade = [{"algoritmo": "scrypt", "n": 2 ** k, "r": 8, "p": 1} for k in (12, 13, 14, 15, 16)]
+    grade += [{"algoritmo": "pbkdf2_sha256", "iteracoes": it} for it in (50_000, 100_000, 200_000, 600_000)]
+    if args.orcamento_ms:
+        grade.append(senhas.calibrar(args.orcamento_ms))
+
+    print(f"{'custo':<40} {'ms/hash':>8} {'logins/s':>10}  ({args.threads} threads)")
+    for i, custo in enumerate(grade):
+        senhas.configurar(**custo)
+        username = f"bench{i}"
+        auth.criar_usuario(username, "senha-bench", perfil="comum")
+        ms = senhas.medir_ms(**custo)
+
+        total = [0]
+        lock = threading.Lock()
+        fim = time.perf_counter() + args.segundos
+
+        def worker():
+            n = 0
+            while time.perf_counter() < fim:
+                auth.autenticar(username, "senha-bench")
+                n += 1
+            with lock:
+                total[0] += n
+
+        ts = [threading.Thread(target=worker) for _ in range(args.threads)]
+        inicio = time.perf_counter()
+        for t in ts:
+            t.start()
+        for t in ts:
+            t.join()
+        taxa = total[0] / (time.perf_counter() - inicio)
+        rotulo = " ".join(f"{k}={v}" for k, v in custo.items())
+        print(f"{rotulo:<40} {ms:8.1f} {taxa:10.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
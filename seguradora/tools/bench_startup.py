@@ -0,0 +1,112 @@
+"""
+Tempo de inicialização do CLI, para pegar regressões (import pesado, DDL no startup).
+
+    python -m seguradora.tools.bench_startup [--repeticoes 10] [--orcamento-ms 400] [--top 15]
+
+Mede, num banco temporário já migrado:
+  - import de seguradora.app a frio (sem .pyc) e a quente, com o detalhamento de
+    `python -X importtime` (os módulos mais caros, tempo acumulado);
+  - tempo até o prompt "Usuário:" de `python -m seguradora.app` (mediana das repetições).
+
+Sai com código 1 se a mediana até o prompt passar de --orcamento-ms (ou o import a
+quente passar de --orcamento-import-ms), para rodar em CI ou antes de um release.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[2]
+
+def _ambiente(tmp: str, pycache: str | None) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(RAIZ) + os.pathsep + env.get("PYTHONPATH", "")
+    env["SEGU_DB"] = os.path.join(tmp, "bench.db")
+    env["PYTHONUNBUFFERED"] = "1"
+    if pycache:
+        # cache de bytecode separado: "frio" = diretório vazio, "quente" = já populado
+        env["PYTHONPYCACHEPREFIX"] = pycache
+    return env
+
+def _importtime(env: dict, cwd: str) -> list[tuple[int, int, str]]:
+    """Roda `python -X importtime -c 'import seguradora.app'`; retorna (self_us, cumul_us, módulo)."""
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", "import seguradora.app"],
+                       env=env, cwd=cwd, capture_output=True, text=True, check=True)
+    linhas = []
+    for linha in r.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|")
+        linhas.append((int(proprio), int(acumulado), nome.rstrip()))
+    return linhas
+
+def _ate_prompt(env: dict, cwd: str, timeout_s: float = 30.0) -> float:
+    """ms entre o exec de `python -m seguradora.app` e o prompt de usuário no stdout."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "seguradora.app"], env=env, cwd=cwd,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        saida = b""
+        fd = proc.stdout.fileno()
+        while "Usuário:".encode() not in saida:
+            if time.perf_counter() - t0 > timeout_s:
+                raise RuntimeError("timeout esperando o prompt de login")
+            bloco = os.read(fd, 4096)
+            if not bloco:
+                raise RuntimeError(f"processo terminou antes do prompt: {saida.decode(errors='replace')}")
+            saida += bloco
+        return (time.perf_counter() - t0) * 1000
+    finally:
+        proc.kill()
+        proc.wait()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m seguradora.tools.bench_startup")
+    ap.add_argument("--repeticoes", type=int, default=10)
+    ap.add_argument("--orcamento-ms", type=float, default=400.0, help="mediana máxima até o prompt de login")
+    ap.add_argument("--orcamento-import-ms", type=float, default=None,
+                    help="máximo para o import a quente de seguradora.app")
+    ap.add_argument("--top", type=int, default=15, help="módulos listados no detalhamento")
+    args = ap.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="segu_startup_")
+    pycache = os.path.join(tmp, "pycache")
+    env = _ambiente(tmp, pycache)
+
+    # banco migrado antes de medir: o caso normal é o schema já em dia
+    subprocess.run([sys.executable, "-c", "from seguradora.db import init_schema; init_schema()"],
+                   env=env, cwd=tmp, check=True)
+
+    frio = _importtime(_ambiente(tmp, os.path.join(tmp, "pycache_frio")), tmp)
+    _importtime(env, tmp)  # popula o cache de bytecode
+    quente = _importtime(env, tmp)
+
+    def total(linhas):
+        return next((c for _, c, n in linhas if n.strip() == "seguradora.app"), 0) / 1000
+
+    print(f"import seguradora.app: frio {total(frio):.1f} ms | quente {total(quente):.1f} ms")
+    print(f"\n{'acumulado ms':>12} {'próprio ms':>10}  módulo (quente)")
+    for proprio, acumulado, nome in sorted(quente, key=lambda x: -x[1])[:args.top]:
+        print(f"{acumulado / 1000:12.1f} {proprio / 1000:10.1f}  {nome}")
+
+    tempos = [_ate_prompt(env, tmp) for _ in range(max(1, args.repeticoes))]
+    mediana = statistics.median(tempos)
+    print(f"\naté o prompt de login: mediana {mediana:.1f} ms | min {min(tempos):.1f} | "
+          f"max {max(tempos):.1f} ({len(tempos)} execuções)")
+
+    falhou = False
+    if mediana > args.orcamento_ms:
+        print(f"REGRESSÃO: {mediana:.1f} ms > orçamento de {args.orcamento_ms:.0f} ms", file=sys.stderr)
+        falhou = True
+    if args.orcamento_import_ms is not None and total(quente) > args.orcamento_import_ms:
+        print(f"REGRESSÃO: import {total(quente):.1f} ms > orçamento de {args.orcamento_import_ms:.0f} ms",
+              file=sys.stderr)
+        falhou = True
+    return 1 if falhou else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
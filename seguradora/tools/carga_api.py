@@ -0,0 +1,150 @@
+"""
+Gerador de carga para a API HTTP (seguradora/api.py): N processos clientes, cada um com
+uma conexão keep-alive, disparando uma mistura de leituras por T segundos. Reporta
+requisições/s e latência p50/p99 por rota e no total.
+
+    python -m seguradora.tools.carga_api --subir [--workers 8] [--clientes 8] [--segundos 10]
+    python -m seguradora.tools.carga_api --url http://127.0.0.1:8080 [--usuario admin]
+
+--subir sobe o servidor num subprocesso (porta livre, banco de SEGU_DB) e derruba no fim.
+Os clientes são processos, não threads, para o próprio gerador não disputar o GIL.
+Senha em SEGU_SENHA (padrão admin123). Para um banco com volume: python -m seguradora.bench.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import quote, urlsplit
+
+# (rota no relatório, peso, montador do caminho a partir das amostras)
+MISTURA = (
+    ("GET /apolices/<numero>", 35, lambda a, r: f"/apolices/{quote(r.choice(a['numeros']))}"),
+    ("GET /clientes/<cpf>", 25, lambda a, r: f"/clientes/{r.choice(a['cpfs'])}"),
+    ("GET /apolices?limite=20", 15, lambda a, r: "/apolices?limite=20&status=Ativa"),
+    ("GET /relatorios/sinistros-status", 10, lambda a, r: "/relatorios/sinistros-status"),
+    ("GET /relatorios/receita", 10, lambda a, r: "/relatorios/receita"),
+    ("GET /saude", 5, lambda a, r: "/saude"),
+)
+
+def _pedir(conn, caminho, token=None, metodo="GET", corpo=None):
+    cabecalhos = {"Authorization": f"Bearer {token}"} if token else {}
+    if corpo is not None:
+        corpo = json.dumps(corpo).encode()
+        cabecalhos["Content-Type"] = "application/json"
+    conn.request(metodo, caminho, body=corpo, headers=cabecalhos)
+    resp = conn.getresponse()
+    return resp.status, resp.read()
+
+def _cliente(args):
+    host, porta, token, amostras, segundos, semente = args
+    rng = random.Random(semente)
+    rotas = [m[0] for m in MISTURA]
+    pesos = [m[1] for m in MISTURA]
+    montar = {m[0]: m[2] for m in MISTURA}
+    tempos = {r: [] for r in rotas}
+    erros = {r: 0 for r in rotas}
+    conn = http.client.HTTPConnection(host, porta, timeout=30)
+    fim = time.perf_counter() + segundos
+    while True:
+        rota = rng.choices(rotas, pesos)[0]
+        t = time.perf_counter()
+        if t >= fim:
+            break
+        try:
+            status, _ = _pedir(conn, montar[rota](amostras, rng), token)
+        except (OSError, http.client.HTTPException):
+            status = 0
+            conn.close()
+            conn = http.client.HTTPConnection(host, porta, timeout=30)
+        tempos[rota].append(time.perf_counter() - t)
+        if status != 200:
+            erros[rota] += 1
+    conn.close()
+    return tempos, erros
+
+def _percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))] * 1000 if ordenados else 0.0
+
+def _subir(workers: int):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "seguradora.api", "--porta", "0", "--workers", str(workers)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    linha = proc.stdout.readline().strip()  # "ouvindo em http://host:porta"
+    if not linha.startswith("ouvindo em "):
+        proc.kill()
+        raise SystemExit(f"servidor não subiu: {linha!r}")
+    return proc, linha.split()[-1]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m seguradora.tools.carga_api")
+    ap.add_argument("--url", default="http://127.0.0.1:8080")
+    ap.add_argument("--subir", action="store_true", help="sobe o servidor num subprocesso")
+    ap.add_argument("--workers", type=int, default=8, help="workers do servidor (com --subir)")
+    ap.add_argument("--clientes", type=int, default=8, help="processos clientes (conexões simultâneas)")
+    ap.add_argument("--segundos", type=float, default=10.0)
+    ap.add_argument("--usuario", default="admin")
+    ap.add_argument("--json", help="grava o resultado também neste arquivo")
+    args = ap.parse_args(argv)
+
+    proc = None
+    url = args.url
+    if args.subir:
+        proc, url = _subir(args.workers)
+    try:
+        alvo = urlsplit(url)
+        conn = http.client.HTTPConnection(alvo.hostname, alvo.port, timeout=30)
+        status, corpo = _pedir(conn, "/token", metodo="POST",
+                               corpo={"username": args.usuario, "senha": os.environ.get("SEGU_SENHA", "admin123")})
+        if status != 200:
+            raise SystemExit(f"login falhou ({status}): {corpo.decode()}")
+        token = json.loads(corpo)["token"]
+        _, corpo = _pedir(conn, "/apolices?limite=500", token)
+        numeros = [a["numero"] for a in json.loads(corpo)["itens"]]
+        _, corpo = _pedir(conn, "/clientes?limite=500", token)
+        cpfs = [c["cpf"] for c in json.loads(corpo)["itens"]]
+        conn.close()
+        if not numeros or not cpfs:
+            raise SystemExit("banco sem apólices/clientes; gere dados com python -m seguradora.bench")
+        amostras = {"numeros": numeros, "cpfs": cpfs}
+
+        print(f"{args.clientes} cliente(s) x {args.segundos:g}s contra {url}"
+              + (f" ({args.workers} workers)" if args.subir else ""), file=sys.stderr)
+        with multiprocessing.Pool(args.clientes) as pool:
+            partes = pool.map(_cliente, [(alvo.hostname, alvo.port, token, amostras, args.segundos, i)
+                                         for i in range(args.clientes)])
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(10)
+
+    linhas, todos, total_erros = [], [], 0
+    for rota, _, _ in MISTURA:
+        tempos = sorted(t for tp, _ in partes for t in tp[rota])
+        erros = sum(e[rota] for _, e in partes)
+        todos.extend(tempos)
+        total_erros += erros
+        linhas.append({"rota": rota, "requisicoes": len(tempos), "req_s": round(len(tempos) / args.segundos, 1),
+                       "p50_ms": round(_percentil(tempos, 0.50), 3), "p99_ms": round(_percentil(tempos, 0.99), 3),
+                       "erros": erros})
+    todos.sort()
+    linhas.append({"rota": "TOTAL", "requisicoes": len(todos), "req_s": round(len(todos) / args.segundos, 1),
+                    "p50_ms": round(_percentil(todos, 0.50), 3), "p99_ms": round(_percentil(todos, 0.99), 3),
+                    "erros": total_erros})
+
+    print(f"{'rota':<36} {'req':>8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'erros':>6}")
+    for l in linhas:
+        print(f"{l['rota']:<36} {l['requisicoes']:>8} {l['req_s']:>9.1f} {l['p50_ms']:>9.3f} {l['p99_ms']:>9.3f} {l['erros']:>6}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"clientes": args.clientes, "segundos": args.segundos, "workers": args.workers if args.subir else None,
+                       "rotas": linhas}, f, ensure_ascii=False, indent=2)
+    return 1 if total_erros else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
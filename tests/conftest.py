@@ -0,0 +1,43 @@
+import pytest
+
+from seguradora import db
+from seguradora.core import cache
+
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    """Banco novo com o schema em dia, num diretório temporário; devolve o caminho."""
+    path = str(tmp_path / "seguradora.db")
+    monkeypatch.setattr(db, "DB_PATH", path)
+    cache.limpar()
+    db.init_schema()
+    yield path
+    db.close_pool()
+    cache.limpar()
+
+
+@pytest.fixture
+def seguros(banco):
+    """Insere n seguros (tipos alternados) e devolve os ids."""
+    def inserir(n: int, valor_base: float = 1000.0) -> list[int]:
+        tipos = ("Automóvel", "Residencial", "Vida")
+        with db.get_conn() as conn:
+            conn.executemany(
+                "INSERT INTO seguros (tipo, titular, valor_base) VALUES (?, ?, ?)",
+                [(tipos[i % 3], f"Titular {i}", valor_base + i) for i in range(n)],
+            )
+            return [r[0] for r in conn.execute("SELECT id FROM seguros ORDER BY id")]
+    return inserir
+
+
+@pytest.fixture
+def outra_conexao(banco):
+    """Executa SQL numa conexão fora do pool e dos caches deste processo (outro processo, na prática)."""
+    import sqlite3
+
+    def executar(sql: str, *params):
+        conn = sqlite3.connect(banco)
+        with conn:
+            conn.execute(sql, params)
+        conn.close()
+    return executar
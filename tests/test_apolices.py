@@ -0,0 +1,68 @@
+import pytest
+
+from seguradora.core.exceptions import AppError
+from seguradora.dao import apolices, seguros as seguros_dao, sinistros
+
+
+@pytest.fixture
+def apolice(seguros):
+    seguros(1)
+    return apolices.emitir_apolice(1)
+
+
+def test_cancelar_e_ja_cancelada(apolice):
+    assert apolices.cancelar(apolice) is True
+    assert apolices.obter(apolice)["status"] == "Cancelada"
+    with pytest.raises(AppError, match="já cancelada"):
+        apolices.cancelar(apolice)
+
+
+def test_cancelar_inexistente(banco):
+    assert apolices.cancelar("AP-1-1759279614785") is False
+
+
+def test_cancelada_por_outro_processo_com_cache_quente(apolice, outra_conexao):
+    assert apolices.obter(apolice)["status"] == "Ativa"  # fica no cache
+    outra_conexao("UPDATE apolices SET status='Cancelada' WHERE numero=?", apolice)
+
+    assert sinistros.registrar(apolice, "batida", "01/02/2024") is None
+    with pytest.raises(AppError, match="já cancelada"):
+        apolices.cancelar(apolice)
+
+
+def test_registrar_sinistro(apolice):
+    sid = sinistros.registrar(apolice, "batida", "1/2/2024")
+    assert sid
+    rows, _ = sinistros.listar_pagina(apolice_numero=apolice)
+    assert [(r.id, r.status, r.data) for r in rows] == [(sid, "Aberto", "01/02/2024")]
+    assert sinistros.registrar("AP-1-1759279614785", "x", "01/02/2024") is None
+    with pytest.raises(AppError, match="Data"):
+        sinistros.registrar(apolice, "x", "31/02/2024")
+
+
+def test_emitir_copia_o_seguro_atual(seguros, outra_conexao):
+    seguros(1)
+    assert seguros_dao.obter(1)["titular"] == "Titular 0"  # fica no cache
+    outra_conexao("UPDATE seguros SET titular='Novo Titular', valor_base=2000 WHERE id=1")
+
+    ap = apolices.obter(apolices.emitir_apolice(1))
+    assert (ap["titular"], ap["valor_mensal"]) == ("Novo Titular", 60.0)
+    assert apolices.emitir_apolice(999) is None
+
+
+def test_cancelar_em_lote(seguros):
+    emitidas = [n for _, _, n in apolices.emitir_apolices(seguros(3))]
+    apolices.cancelar(emitidas[0])
+    res = apolices.cancelar_apolices([emitidas[0], emitidas[1], emitidas[1], "AP-1-1759279614785"])
+    assert res == [(emitidas[0], apolices.JA_CANCELADA), (emitidas[1], apolices.CANCELADA),
+                   (emitidas[1], apolices.JA_CANCELADA), ("AP-1-1759279614785", apolices.NAO_ENCONTRADA)]
+    assert apolices.obter(emitidas[2])["status"] == "Ativa"
+
+
+def test_numero_digitado_em_minusculas_e_com_espacos(apolice):
+    digitado = f"  {apolice.lower()} "
+    assert apolices.obter(digitado)["numero"] == apolice
+    assert sinistros.registrar(digitado, "batida", "01/02/2024")
+    assert apolices.cancelar(digitado) is True
+    assert apolices.cancelar_apolices([digitado]) == [(apolice, apolices.JA_CANCELADA)]
+    assert apolices.obter(apolice)["status"] == "Cancelada"
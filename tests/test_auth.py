@@ -0,0 +1,45 @@
+import pytest
+
+from seguradora.core.exceptions import AppError
+from seguradora.services import auth
+
+
+@pytest.fixture
+def usuario(banco):
+    auth.criar_usuario("ana", "senha-ana", "admin")
+    return "ana"
+
+
+def test_token_valido(usuario):
+    token = auth.emitir_token(usuario, "senha-ana")
+    assert auth.validar_token(token) == {"username": "ana", "perfil": "admin"}
+
+
+def test_token_adulterado(usuario):
+    token = auth.emitir_token(usuario, "senha-ana")
+    with pytest.raises(AppError):
+        auth.validar_token(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
+
+
+def test_inativacao_em_outro_processo_revoga_na_hora(outra_conexao, usuario):
+    token = auth.emitir_token(usuario, "senha-ana")
+    auth.autenticar(usuario, "senha-ana")  # aquece o cache de usuários
+    outra_conexao("UPDATE usuarios SET ativo=0 WHERE username=?", usuario)
+    with pytest.raises(AppError):
+        auth.validar_token(token)
+    with pytest.raises(AppError):
+        auth.autenticar(usuario, "senha-ana")
+
+
+def test_troca_de_perfil_e_senha_em_outro_processo(outra_conexao, usuario):
+    token = auth.emitir_token(usuario, "senha-ana")
+    outra_conexao("UPDATE usuarios SET perfil='comum' WHERE username=?", usuario)
+    assert auth.validar_token(token)["perfil"] == "comum"
+
+    novo_hash = auth._hash_senha("outra")
+    outra_conexao("UPDATE usuarios SET senha_hash=? WHERE username=?", novo_hash, usuario)
+    with pytest.raises(AppError):
+        auth.validar_token(token)
+    with pytest.raises(AppError):
+        auth.autenticar(usuario, "senha-ana")
+    assert auth.autenticar(usuario, "outra")["perfil"] == "comum"
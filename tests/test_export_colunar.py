@@ -0,0 +1,55 @@
+import pytest
+
+from seguradora import db
+from seguradora.dao import apolices
+from seguradora.services import relatorios
+
+pa = pytest.importorskip("pyarrow")
+
+LOTE = 1000  # bem abaixo de LINHAS_POR_GRUPO, para o teste cruzar vários blocos com poucas linhas
+
+
+@pytest.fixture
+def exports(tmp_path, monkeypatch):
+    monkeypatch.setattr(relatorios, "EXPORT_DIR", tmp_path / "exports")
+
+
+def _ler(path, formato):
+    if formato == "arrow":
+        return pa.ipc.open_file(path).read_all()
+    import pyarrow.parquet as pq
+    return pq.read_table(path)
+
+
+@pytest.mark.parametrize("formato", ["arrow", "parquet"])
+def test_round_trip_em_varios_blocos(banco, seguros, exports, formato):
+    apolices.emitir_apolices(seguros(2500))
+    canceladas = apolices.numeros_por_ids(1, 2500)[::7]
+    apolices.cancelar_apolices(canceladas)
+
+    esquema = relatorios.ESQUEMAS_COLUNARES["apolices"]
+    with db.get_conn() as conn:
+        cur = conn.execute(f"SELECT {', '.join(c for c, _ in esquema)} FROM apolices ORDER BY id")
+        path = relatorios.export_colunar("apolices", cur, formato, esquema, linhas_por_grupo=LOTE)
+        esperado = conn.execute("SELECT numero, tipo, status FROM apolices ORDER BY id").fetchall()
+
+    tabela = _ler(path, formato)
+    assert tabela.num_rows == 2500
+    assert tabela.column("numero").to_pylist() == [r[0] for r in esperado]
+    assert tabela.column("tipo").to_pylist() == [r[1] for r in esperado]
+    assert tabela.column("status").to_pylist().count("Cancelada") == len(canceladas)
+
+
+def test_arrow_categoria_nova_em_bloco_posterior(exports):
+    linhas = [(i, "A" if i < 1000 else "B" if i < 2000 else "C") for i in range(3000)]
+    path = relatorios.export_colunar("cat", linhas, "arrow", [("id", "int"), ("cat", "cat")],
+                                     linhas_por_grupo=LOTE)
+    leitor = pa.ipc.open_file(path)
+    assert leitor.num_record_batches == 3
+    assert leitor.read_all().column("cat").to_pylist() == [c for _, c in linhas]
+
+
+def test_export_tabela_arrow(banco, seguros, exports):
+    seguros(10)
+    path = relatorios.export_tabela("seguros", "arrow", nome="seguros")
+    assert _ler(path, "arrow").column("tipo").to_pylist()[:3] == ["Automóvel", "Residencial", "Vida"]
@@ -0,0 +1,77 @@
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from seguradora import db, migracoes
+from seguradora.core import cache
+from seguradora.dao import apolices, clientes, numeracao, sinistros
+from seguradora.services import relatorios
+
+BANCO_V0 = Path(__file__).resolve().parent.parent / "seguradora.db"  # o banco distribuído, sem user_version
+
+
+@pytest.fixture
+def banco_v0(tmp_path, monkeypatch):
+    path = tmp_path / "v0.db"
+    shutil.copy(BANCO_V0, path)
+    monkeypatch.setattr(db, "DB_PATH", str(path))
+    cache.limpar()
+    yield str(path)
+    db.close_pool()
+    cache.limpar()
+
+
+def _contagens(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                for t in ("clientes", "seguros", "apolices", "sinistros", "usuarios")}
+    finally:
+        conn.close()
+
+
+def test_v0_ate_a_versao_atual(banco_v0):
+    antes = _contagens(banco_v0)
+    assert migracoes.versao_atual() == 0
+
+    assert migracoes.migrar() == migracoes.VERSAO == 11
+    assert migracoes.versao_atual() == 11
+
+    with db.get_conn() as conn:
+        tabelas = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        assert {"agg_receita_mensal", "agg_sinistros_status", "agg_sinistros_mes", "import_checkpoints",
+                "sequencias", "segredos"} <= tabelas
+        assert conn.execute("SELECT COUNT(*) FROM apolices WHERE cliente_id IS NULL").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM sinistros WHERE data_iso IS NULL").fetchone()[0] == 0
+    depois = _contagens(banco_v0)
+    assert {t: depois[t] for t in depois if t != "usuarios"} == {t: antes[t] for t in antes if t != "usuarios"}
+
+
+def test_migrar_de_novo_nao_faz_nada(banco_v0):
+    migracoes.migrar()
+    migracoes._em_dia.clear()  # força reler user_version, como um processo novo
+    assert [migracoes._aplicar(n, m) for n, m in enumerate(migracoes.MIGRACOES, start=1)] == [False] * 11
+
+
+def test_agregados_batem_com_as_tabelas_base(banco_v0):
+    migracoes.migrar()
+    antes = [list(map(tuple, f())) for f in (relatorios.receita_mensal_prevista, relatorios.sinistros_por_status)]
+    relatorios.reconstruir_agregados()
+    depois = [list(map(tuple, f())) for f in (relatorios.receita_mensal_prevista, relatorios.sinistros_por_status)]
+    assert antes == depois
+
+
+def test_dados_antigos_seguem_utilizaveis(banco_v0):
+    migracoes.migrar()
+    with db.get_conn() as conn:
+        numero, cpf = conn.execute(
+            "SELECT a.numero, c.cpf FROM apolices a JOIN clientes c ON c.id = a.cliente_id LIMIT 1").fetchone()
+    assert numeracao.numero_aceito(numero)  # número antigo, AP-<seguro>-<ms>
+    assert apolices.obter(numero)["numero"] == numero
+    assert clientes.obter_por_cpf(cpf) is not None
+
+    novo = apolices.emitir_apolice(apolices.obter(numero)["seguro_id"])
+    assert numeracao.numero_valido(novo)
+    assert sinistros.registrar(novo, "teste", "01/02/2024")
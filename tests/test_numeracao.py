@@ -0,0 +1,75 @@
+import multiprocessing
+import time
+
+import pytest
+
+from seguradora import db
+from seguradora.core.exceptions import AppError
+from seguradora.dao import apolices, numeracao, sinistros
+
+
+def _trocar_digito(numero: str) -> str:
+    return numero[:-1] + str((int(numero[-1]) + 1) % 10)
+
+
+def test_formato_e_digito():
+    numero = numeracao.formatar(12, 1237)
+    assert numero.startswith("AP-12-00001237")
+    assert numeracao.numero_valido(numero)
+    assert not numeracao.numero_valido(_trocar_digito(numero))
+
+
+def test_numeros_antigos_seguem_aceitos():
+    assert numeracao.numero_aceito("AP-1-1759279614785")  # AP-<seguro>-<epoch em ms>
+    assert not numeracao.numero_aceito("AP-1-12345678")  # curto demais para o formato atual
+    assert not numeracao.numero_aceito("XYZ")
+
+
+def test_digito_errado_nao_chega_ao_banco(banco, seguros):
+    seguros(1)
+    numero = apolices.emitir_apolice(1)
+    errado = _trocar_digito(numero)
+    assert apolices.obter(errado) is None
+    with pytest.raises(AppError, match="inválido"):
+        apolices.cancelar(errado)
+    with pytest.raises(AppError, match="inválido"):
+        sinistros.registrar(errado, "batida", "01/02/2024")
+    assert apolices.cancelar_apolices([errado, numero]) == [
+        (errado, apolices.NUMERO_INVALIDO), (numero, apolices.CANCELADA)]
+
+
+def _reservar_em_processo(args):
+    path, transacoes, por_transacao = args
+    db.DB_PATH = path
+
+    @db.com_retry
+    def uma():
+        with db.get_conn() as conn:
+            inicio = numeracao.reservar(conn, por_transacao)
+            time.sleep(0.001)  # segura a transação aberta: os outros processos esperam a trava
+            return inicio
+
+    return [uma() for _ in range(transacoes)]
+
+
+def test_reservar_unico_entre_processos(banco):
+    processos, transacoes, por_transacao = 4, 25, 3
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processos) as pool:
+        inicios = pool.map(_reservar_em_processo, [(banco, transacoes, por_transacao)] * processos)
+
+    numeros = [i + k for parte in inicios for i in parte for k in range(por_transacao)]
+    assert len(numeros) == len(set(numeros)) == processos * transacoes * por_transacao
+    assert sorted(numeros) == list(range(min(numeros), min(numeros) + len(numeros)))  # sem buracos
+    assert all(a < b for parte in inicios for a, b in zip(parte, parte[1:]))  # crescente em cada processo
+
+
+def test_reserva_desfeita_junto_com_a_transacao(banco):
+    with db.get_conn() as conn:
+        primeiro = numeracao.reservar(conn, 3)
+    with pytest.raises(RuntimeError):
+        with db.get_conn() as conn:
+            numeracao.reservar(conn, 5)
+            raise RuntimeError("emissão falhou")
+    with db.get_conn() as conn:
+        assert numeracao.reservar(conn) == primeiro + 3
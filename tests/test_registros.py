@@ -0,0 +1,37 @@
+import pytest
+
+from seguradora.dao import apolices
+from seguradora.dao.registros import Apolice, Cliente
+
+
+def test_construcao_posicional_e_acesso():
+    c = Cliente(1, "Ana", "12345678909", "ana@x.com", None)
+    assert c.nome == c["nome"] == c[1] == "Ana"
+    assert dict(c) == {"id": 1, "nome": "Ana", "cpf": "12345678909", "email": "ana@x.com", "telefone": None}
+    assert Cliente.COLUNAS == "id, nome, cpf, email, telefone"
+    with pytest.raises(TypeError):
+        Cliente(1, "Ana")
+
+
+def test_igualdade_e_hash():
+    a = Cliente(1, "Ana", "1", None, None)
+    b = Cliente(1, "Ana", "1", None, None)
+    assert a == b and hash(a) == hash(b)
+    assert len({a, b, Cliente(2, "Bia", "2", None, None)}) == 2
+    assert a != (1, "Ana", "1", None, None)  # só com o mesmo tipo
+
+
+def test_imutavel_e_copiavel():
+    import copy, pickle
+    a = Cliente(1, "Ana", "1", None, None)
+    with pytest.raises(AttributeError):
+        a.nome = "Bia"
+    assert pickle.loads(pickle.dumps(a)) == copy.copy(a) == a
+
+
+def test_registros_das_daos_sao_hashable(banco, seguros):
+    apolices.emitir_apolices(seguros(3))
+    rows, _ = apolices.listar_pagina(limite=2)
+    assert all(isinstance(r, Apolice) for r in rows)
+    assert len(set(rows)) == 2
+    assert len(set(rows[0])) > 0
@@ -0,0 +1,11 @@
+from seguradora.core import validators as val
+
+
+def test_lote_segue_as_mesmas_regras_da_funcao_unitaria():
+    datas = ["1/2/2024", "01/02/2024", "29/02/2023", "1/2/24", " 1/2/2024", "", None]
+    assert val.validar_datas_ddmmaa(datas) == [val.validar_data_ddmmaa(d) for d in datas]
+    assert val.validar_datas_ddmmaa(datas) == [True, True, False, False, False, False, False]
+
+    cpfs = ["529.982.247-25", "52998224725", "52998224724", "11111111111", "5299822472", "", None]
+    assert val.validar_cpfs(cpfs) == [val.validar_cpf(c) for c in cpfs]
+    assert val.validar_cpfs(cpfs) == [True, True, False, False, False, False, False]